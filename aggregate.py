@@ -0,0 +1,169 @@
+"""Накопительные итоги тренировок по пользователям и периодам.
+
+Каждый результат `show_training_info` добавляется к итогам по ключу
+(пользователь, вид тренировки, период) за O(1). Память зависит только
+от числа ключей. Агрегаторы можно объединять, чтобы сложить частичные
+итоги, посчитанные разными процессами.
+"""
+from datetime import date, datetime, timezone
+from typing import (Any, Callable, Dict, Hashable, Iterator, List, Optional,
+                    Tuple, Union)
+
+from homework import InfoMessage
+
+Moment = Union[date, datetime, float, int]
+Key = Tuple[Hashable, str, Optional[str]]
+
+
+def to_date(moment: Moment) -> date:
+    """Дата момента времени; число - это Unix-время в секундах (UTC)."""
+    if isinstance(moment, datetime):
+        return moment.date()
+    if isinstance(moment, date):
+        return moment
+    return datetime.fromtimestamp(moment, timezone.utc).date()
+
+
+def day_bucket(moment: Moment) -> str:
+    """Период - календарный день, например `2022-09-30`."""
+    return to_date(moment).isoformat()
+
+
+def week_bucket(moment: Moment) -> str:
+    """Период - неделя по ISO 8601, например `2022-W39`."""
+    year, week, _ = to_date(moment).isocalendar()
+    return '{}-W{:02d}'.format(year, week)
+
+
+def month_bucket(moment: Moment) -> str:
+    """Период - календарный месяц, например `2022-09`."""
+    return to_date(moment).isoformat()[:7]
+
+
+class Totals:
+    """Итоги по одному ключу."""
+
+    __slots__ = ('count', 'duration', 'distance', 'speed_sum', 'calories')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.distance = 0.0
+        self.speed_sum = 0.0
+        self.calories = 0.0
+
+    def add(self, info: InfoMessage) -> None:
+        """Добавить результат одной тренировки."""
+        self.count += 1
+        self.duration += info.duration
+        self.distance += info.distance
+        self.speed_sum += info.speed
+        self.calories += info.calories
+
+    def merge(self, other: 'Totals') -> None:
+        """Прибавить итоги другого ключа."""
+        self.count += other.count
+        self.duration += other.duration
+        self.distance += other.distance
+        self.speed_sum += other.speed_sum
+        self.calories += other.calories
+
+    @property
+    def mean_speed(self) -> float:
+        """Средняя из средних скоростей тренировок, км/ч."""
+        return self.speed_sum / self.count if self.count else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'duration': self.duration,
+            'distance': self.distance,
+            'speed_sum': self.speed_sum,
+            'calories': self.calories,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, float]) -> 'Totals':
+        totals = cls()
+        for name in cls.__slots__:
+            setattr(totals, name, data[name])
+        return totals
+
+
+class Aggregator:
+    """Накопитель итогов по пользователю, виду тренировки и периоду."""
+
+    def __init__(self,
+                 bucket: Optional[Callable[[Moment], str]] = day_bucket
+                 ) -> None:
+        self.bucket = bucket
+        self.totals: Dict[Key, Totals] = {}
+
+    def __len__(self) -> int:
+        return len(self.totals)
+
+    def add(self, info: InfoMessage, user: Hashable = None,
+            moment: Optional[Moment] = None) -> None:
+        """Добавить результат тренировки пользователя `user`.
+
+        Без `moment` или без функции периода результат попадает
+        в итоги за всё время (период `None`).
+        """
+        period = None
+        if moment is not None and self.bucket is not None:
+            period = self.bucket(moment)
+        key = (user, info.training_type, period)
+        totals = self.totals.get(key)
+        if totals is None:
+            totals = self.totals[key] = Totals()
+        totals.add(info)
+
+    def merge(self, other: 'Aggregator') -> 'Aggregator':
+        """Прибавить итоги другого агрегатора и вернуть себя."""
+        for key, totals in other.totals.items():
+            own = self.totals.get(key)
+            if own is None:
+                own = self.totals[key] = Totals()
+            own.merge(totals)
+        return self
+
+    def select(self, user: Hashable = None,
+               training_type: Optional[str] = None,
+               period: Optional[str] = None) -> Iterator[Tuple[Key, Totals]]:
+        """Перебрать итоги, подходящие под заданные значения ключа."""
+        for key, totals in self.totals.items():
+            key_user, key_type, key_period = key
+            if user is not None and key_user != user:
+                continue
+            if training_type is not None and key_type != training_type:
+                continue
+            if period is not None and key_period != period:
+                continue
+            yield key, totals
+
+    def total(self, user: Hashable = None,
+              training_type: Optional[str] = None,
+              period: Optional[str] = None) -> Totals:
+        """Сумма итогов по всем подходящим ключам."""
+        result = Totals()
+        for _, totals in self.select(user, training_type, period):
+            result.merge(totals)
+        return result
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Итоги в виде, пригодном для JSON."""
+        return [dict(user=user, training_type=training_type, period=period,
+                     **totals.as_dict())
+                for (user, training_type, period), totals
+                in self.totals.items()]
+
+    @classmethod
+    def from_list(cls, rows: List[Dict[str, Any]],
+                  bucket: Optional[Callable[[Moment], str]] = day_bucket
+                  ) -> 'Aggregator':
+        """Восстановить агрегатор из результата `to_list`."""
+        aggregator = cls(bucket)
+        for row in rows:
+            key = (row['user'], row['training_type'], row['period'])
+            aggregator.totals[key] = Totals.from_dict(row)
+        return aggregator
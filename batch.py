@@ -0,0 +1,227 @@
+"""Пакетный (колоночный) расчёт результатов тренировок.
+
+Вместо создания объекта `Training` на каждый пакет данных расчёт
+выполняется сразу для всего столбца значений. Формулы и константы
+берутся из классов модуля `homework`, поэтому результат совпадает
+с `Training.show_training_info` для тех же данных.
+"""
+from array import array
+from typing import (Callable, Dict, Iterable, Iterator, List, Mapping,
+                    Sequence, Tuple, Type)
+
+from homework import (WORKOUT_TYPES, InfoMessage, Running, SportsWalking,
+                      Swimming, Training, WorkoutType, read_package)
+
+Columns = Mapping[str, Sequence[float]]
+Metrics = Tuple[List[float], List[float], List[float]]
+
+
+class InfoBatch:
+    """Результаты тренировок, хранящиеся по столбцам."""
+
+    __slots__ = ('training_type', 'duration', 'distance', 'speed',
+                 'calories')
+
+    def __init__(self) -> None:
+        self.training_type: List[str] = []
+        self.duration = array('d')
+        self.distance = array('d')
+        self.speed = array('d')
+        self.calories = array('d')
+
+    def __len__(self) -> int:
+        return len(self.duration)
+
+    def __getitem__(self, index: int) -> InfoMessage:
+        return InfoMessage(self.training_type[index],
+                           self.duration[index],
+                           self.distance[index],
+                           self.speed[index],
+                           self.calories[index])
+
+    def __iter__(self) -> Iterator[InfoMessage]:
+        return map(InfoMessage, self.training_type, self.duration,
+                   self.distance, self.speed, self.calories)
+
+    def append(self, info: InfoMessage) -> None:
+        """Добавить результат тренировки в конец столбцов."""
+        self.training_type.append(info.training_type)
+        self.duration.append(info.duration)
+        self.distance.append(info.distance)
+        self.speed.append(info.speed)
+        self.calories.append(info.calories)
+
+    def extend(self, messages: Iterable[InfoMessage]) -> None:
+        """Добавить несколько результатов тренировок."""
+        for info in messages:
+            self.append(info)
+
+
+class TrainingBatch:
+    """Пакеты данных одного вида тренировки, хранящиеся по столбцам.
+
+    Занимает несколько байт на значение вместо отдельного объекта
+    `Training` на каждый пакет. Объект тренировки создаётся только
+    при обращении по индексу.
+    """
+
+    __slots__ = ('workout_type', 'fields', 'columns')
+
+    def __init__(self, workout_type: str,
+                 packages: Iterable[Sequence[float]] = ()) -> None:
+        self.workout_type = workout_type
+        self.fields = get_workout(workout_type).fields
+        self.columns = {name: array('d') for name in self.fields}
+        self.extend(packages)
+
+    def __len__(self) -> int:
+        return len(self.columns['action'])
+
+    def __getitem__(self, index: int) -> Training:
+        return read_package(self.workout_type,
+                            [self.columns[name][index]
+                             for name in self.fields])
+
+    def append(self, data: Sequence[float]) -> None:
+        """Добавить пакет данных от датчиков."""
+        if len(data) != len(self.fields):
+            raise ValueError("{} expects {} values, got {}".format(
+                self.workout_type, len(self.fields), len(data)))
+        for name, value in zip(self.fields, data):
+            self.columns[name].append(value)
+
+    def extend(self, packages: Iterable[Sequence[float]]) -> None:
+        """Добавить несколько пакетов данных."""
+        for data in packages:
+            self.append(data)
+
+    def show_training_info(self) -> InfoBatch:
+        """Рассчитать результаты для всех пакетов."""
+        return process_batch(self.workout_type, self.columns)
+
+
+def _get_distance(action: Sequence[float], len_step: float,
+                  m_in_km: float) -> List[float]:
+    """Дистанция в км для столбца шагов или гребков."""
+    return [value * len_step / m_in_km for value in action]
+
+
+def _running(columns: Columns) -> Metrics:
+    """Расчёт по формулам `Running`."""
+    distance = _get_distance(columns['action'], Running.LEN_STEP,
+                             Running.M_IN_KM)
+    speed = [dist / dur for dist, dur in zip(distance, columns['duration'])]
+    multiplier = Running.CALORIES_MEAN_SPEED_MULTIPLIER
+    shift = Running.CALORIES_MEAN_SPEED_SHIFT
+    m_in_km = Running.M_IN_KM
+    min_in_h = Running.MIN_IN_H
+    calories = [
+        (multiplier * spd + shift) * weight / m_in_km * (dur * min_in_h)
+        for spd, weight, dur in zip(speed, columns['weight'],
+                                    columns['duration'])
+    ]
+    return distance, speed, calories
+
+
+def _sports_walking(columns: Columns) -> Metrics:
+    """Расчёт по формулам `SportsWalking`."""
+    distance = _get_distance(columns['action'], SportsWalking.LEN_STEP,
+                             SportsWalking.M_IN_KM)
+    speed = [dist / dur for dist, dur in zip(distance, columns['duration'])]
+    gravity = SportsWalking.GRAVITY_CONSTANT
+    weight_constant = SportsWalking.WEIGHT_CONSTANT
+    speed_constant = SportsWalking.SPEED_CONSTANT
+    conversion = SportsWalking.SPEED_CONVERSION_CONSTANT
+    min_in_h = SportsWalking.MIN_IN_H
+    calories = [
+        (gravity * weight
+         + ((spd * conversion) ** 2 / (height / weight_constant))
+         * speed_constant * weight) * dur * min_in_h
+        for spd, weight, height, dur in zip(speed, columns['weight'],
+                                            columns['height'],
+                                            columns['duration'])
+    ]
+    return distance, speed, calories
+
+
+def _swimming(columns: Columns) -> Metrics:
+    """Расчёт по формулам `Swimming`."""
+    distance = _get_distance(columns['action'], Swimming.LEN_STEP,
+                             Swimming.M_IN_KM)
+    m_in_km = Swimming.M_IN_KM
+    speed = [
+        length * count / m_in_km / dur
+        for length, count, dur in zip(columns['length_pool'],
+                                      columns['count_pool'],
+                                      columns['duration'])
+    ]
+    konst_1 = Swimming.KONST_1
+    konst_2 = Swimming.KONST_2
+    calories = [
+        (spd + konst_1) * konst_2 * weight * dur
+        for spd, weight, dur in zip(speed, columns['weight'],
+                                    columns['duration'])
+    ]
+    return distance, speed, calories
+
+
+def _training_objects(workout: WorkoutType, columns: Columns) -> Metrics:
+    """Расчёт через объекты для видов без пакетных формул."""
+    distance: List[float] = []
+    speed: List[float] = []
+    calories: List[float] = []
+    training_class = workout.training_class
+    for data in zip(*(columns[name] for name in workout.fields)):
+        metrics = training_class(*data).compute_metrics()
+        distance.append(metrics[0])
+        speed.append(metrics[1])
+        calories.append(metrics[2])
+    return distance, speed, calories
+
+
+# Пакетные формулы для встроенных классов. Для остальных
+# зарегистрированных видов тренировок используются объекты.
+BATCH_CALCULATIONS: Dict[Type[Training], Callable[[Columns], Metrics]] = {
+    Swimming: _swimming,
+    Running: _running,
+    SportsWalking: _sports_walking,
+}
+
+
+def get_workout(workout_type: str) -> WorkoutType:
+    """Найти зарегистрированный вид тренировки по коду."""
+    if workout_type not in WORKOUT_TYPES:
+        raise ValueError("Unknown workout type: {}".format(workout_type))
+    return WORKOUT_TYPES[workout_type]
+
+
+def process_batch(workout_type: str, columns: Columns) -> InfoBatch:
+    """Рассчитать результаты для столбцов данных одного вида тренировки.
+
+    `columns` сопоставляет имя параметра конструктора тренировки
+    (`action`, `duration`, `weight`, `height`, `length_pool`,
+    `count_pool`) с последовательностью значений: списком, `array`
+    или массивом NumPy.
+    """
+    workout = get_workout(workout_type)
+    fields = workout.fields
+    missing = [name for name in fields if name not in columns]
+    if missing:
+        raise ValueError("Missing columns for {}: {}".format(
+            workout_type, ', '.join(missing)))
+    size = len(columns['action'])
+    if any(len(columns[name]) != size for name in fields):
+        raise ValueError("Columns must have the same length")
+
+    calculate = BATCH_CALCULATIONS.get(workout.training_class)
+    if calculate is None:
+        distance, speed, calories = _training_objects(workout, columns)
+    else:
+        distance, speed, calories = calculate(columns)
+    batch = InfoBatch()
+    batch.training_type = [workout.training_class.__name__] * size
+    batch.duration.extend(float(value) for value in columns['duration'])
+    batch.distance.extend(distance)
+    batch.speed.extend(speed)
+    batch.calories.extend(calories)
+    return batch
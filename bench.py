@@ -0,0 +1,206 @@
+"""Замеры производительности модуля `homework`.
+
+Каждый сценарий выполняется на нескольких объёмах входных данных,
+результат - число операций в секунду, медиана из `REPEAT` повторов.
+Замеры сохраняются в JSON и сравниваются с сохранённым эталоном: если
+производительность упала больше допустимого порога, команда
+завершается с ненулевым кодом.
+
+    python bench.py --output bench_baseline.json
+    python bench.py --baseline bench_baseline.json --threshold 0.2
+
+Эталон зависит от машины и не хранится в репозитории: его
+записывают на той же машине, где проводится сравнение, на версии
+кода, принятой за образец.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import homework
+
+SIZES = (1000, 10000, 100000)
+REPEAT = 11
+THRESHOLD = 0.2
+MIN_TIME = 0.05
+BASELINE = 'bench_baseline.json'
+
+PACKAGES = {
+    'SWM': [720, 1, 80, 25, 40],
+    'RUN': [15000, 1, 75],
+    'WLK': [9000, 1, 75, 180],
+}
+
+Case = Callable[[int], Callable[[], None]]
+
+
+def packages(size: int) -> List[Tuple[str, List[float]]]:
+    """Набор из `size` пакетов всех видов по очереди."""
+    items = list(PACKAGES.items())
+    return [items[index % len(items)] for index in range(size)]
+
+
+def case_read_package(size: int) -> Callable[[], None]:
+    data = packages(size)
+    read_package = homework.read_package
+
+    def run() -> None:
+        for workout_type, values in data:
+            read_package(workout_type, values)
+    return run
+
+
+def case_show_training_info(workout_type: str) -> Case:
+    def case(size: int) -> Callable[[], None]:
+        trainings = [homework.read_package(workout_type,
+                                           PACKAGES[workout_type])
+                     for _ in range(size)]
+
+        def run() -> None:
+            for training in trainings:
+                training.show_training_info()
+        return run
+    return case
+
+
+def case_get_message(size: int) -> Callable[[], None]:
+    messages = [homework.read_package(*package).show_training_info()
+                for package in packages(size)]
+
+    def run() -> None:
+        for info in messages:
+            info.get_message()
+    return run
+
+
+def case_main(size: int) -> Callable[[], None]:
+    data = packages(size)
+
+    def run() -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for workout_type, values in data:
+                homework.main(homework.read_package(workout_type, values))
+    return run
+
+
+CASES: Dict[str, Case] = {
+    'read_package': case_read_package,
+    'show_training_info.Running': case_show_training_info('RUN'),
+    'show_training_info.SportsWalking': case_show_training_info('WLK'),
+    'show_training_info.Swimming': case_show_training_info('SWM'),
+    'get_message': case_get_message,
+    'main': case_main,
+}
+
+
+def measure(case: Case, size: int, repeat: int = REPEAT) -> float:
+    """Число операций в секунду по медиане из `repeat` замеров.
+
+    Как и в `timeit`, на время замера отключается сборщик мусора,
+    а короткие сценарии повторяются, пока замер не займёт
+    `MIN_TIME` секунд. Подбор числа повторов заодно прогревает
+    сценарий. Медиана, в отличие от лучшего замера, не зависит
+    от единичного удачного или неудачного прогона.
+    """
+    run = case(size)
+    loops = 1
+    timings = []
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while True:
+            elapsed = _timed(run, loops)
+            if elapsed >= MIN_TIME:
+                break
+            loops *= 2
+        for _ in range(repeat):
+            timings.append(_timed(run, loops) / loops)
+    finally:
+        if enabled:
+            gc.enable()
+    median = statistics.median(timings)
+    return size / median if median > 0 else float('inf')
+
+
+def _timed(run: Callable[[], None], loops: int) -> float:
+    started = time.perf_counter()
+    for _ in range(loops):
+        run()
+    return time.perf_counter() - started
+
+
+def run_benchmarks(sizes: Sequence[int] = SIZES, repeat: int = REPEAT,
+                   cases: Optional[Sequence[str]] = None
+                   ) -> Dict[str, object]:
+    """Выполнить сценарии и вернуть результаты для сохранения в JSON."""
+    results = {}
+    for name in cases or CASES:
+        for size in sizes:
+            key = '{}[{}]'.format(name, size)
+            results[key] = measure(CASES[name], size, repeat)
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object],
+            threshold: float = THRESHOLD) -> List[str]:
+    """Найти замеры, упавшие относительно эталона больше порога."""
+    regressions = []
+    for field in ('python', 'platform'):
+        if baseline.get(field) != current.get(field):
+            print('WARNING: baseline {} {!r} differs from {!r}'.format(
+                field, baseline.get(field), current.get(field)),
+                file=sys.stderr)
+    for key, expected in baseline['results'].items():
+        actual = current['results'].get(key)
+        if actual is None:
+            continue
+        if actual < expected * (1 - threshold):
+            regressions.append('{}: {:.0f} ops/s, baseline {:.0f} '
+                               '({:+.1%})'.format(key, actual, expected,
+                                                  actual / expected - 1))
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Замеры производительности homework.py.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--case', action='append', choices=sorted(CASES),
+                        help='выполнить только указанные сценарии')
+    parser.add_argument('--output', help='файл для сохранения результатов')
+    parser.add_argument('--baseline',
+                        help='эталон для сравнения, например ' + BASELINE)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='допустимое падение производительности')
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.sizes, args.repeat, args.case)
+    for key, value in current['results'].items():
+        print('{:<45} {:>14,.0f} ops/s'.format(key, value))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(current, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            regressions = compare(current, json.load(file), args.threshold)
+        for line in regressions:
+            print('REGRESSION', line, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
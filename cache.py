@@ -0,0 +1,92 @@
+"""Кэш результатов для повторно переданных пакетов.
+
+Трекеры на нестабильной связи присылают один и тот же пакет несколько
+раз. `ResultCache` запоминает результаты последних `maxsize` пакетов
+и при повторе не создаёт тренировку заново. Ключ - код тренировки
+и значения пакета, приведённые к float, поэтому `[15000, 1, 75]`
+и `[15000.0, 1.0, 75.0]` - один и тот же пакет.
+
+В режиме `dedupe` повторы из окна кэша не выдаются совсем.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, Sequence, Tuple
+
+from homework import InfoMessage, read_package
+
+MAXSIZE = 4096
+
+Key = Tuple[str, Tuple[float, ...]]
+
+
+def package_key(workout_type: str, data: Sequence[float]) -> Key:
+    """Нормализованный ключ пакета."""
+    return workout_type, tuple(map(float, data))
+
+
+class ResultCache:
+    """Ограниченный кэш результатов с вытеснением давно не нужных."""
+
+    def __init__(self, maxsize: int = MAXSIZE, dedupe: bool = False) -> None:
+        if maxsize < 1:
+            raise ValueError("Cache size must be positive: {}".format(
+                maxsize))
+        self.maxsize = maxsize
+        self.dedupe = dedupe
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._results: 'OrderedDict[Key, Tuple[Any, ...]]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def lookup(self, workout_type: str,
+               data: Sequence[float]) -> Tuple[bool, InfoMessage]:
+        """Найти или рассчитать результат; вернуть признак попадания.
+
+        Каждый раз возвращается новый `InfoMessage`, поэтому изменение
+        результата не портит кэш.
+        """
+        key = package_key(workout_type, data)
+        fields = self._results.get(key)
+        if fields is not None:
+            self.hits += 1
+            self._results.move_to_end(key)
+            return True, InfoMessage(*fields)
+        self.misses += 1
+        info = read_package(workout_type, data).show_training_info()
+        self._results[key] = (info.training_type, info.duration,
+                              info.distance, info.speed, info.calories)
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+            self.evictions += 1
+        return False, info
+
+    def calculate(self, workout_type: str,
+                  data: Sequence[float]) -> InfoMessage:
+        """Результат тренировки для пакета."""
+        return self.lookup(workout_type, data)[1]
+
+    def process(self, packages: Iterable[Tuple[str, Sequence[float]]]
+                ) -> Iterator[InfoMessage]:
+        """Рассчитать поток пакетов; в режиме `dedupe` пропустить повторы."""
+        for workout_type, data in packages:
+            hit, info = self.lookup(workout_type, data)
+            if not (hit and self.dedupe):
+                yield info
+
+    def clear(self) -> None:
+        """Очистить кэш, не сбрасывая счётчики."""
+        self._results.clear()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Счётчики кэша."""
+        total = self.hits + self.misses
+        return {
+            'size': len(self._results),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
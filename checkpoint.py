@@ -0,0 +1,307 @@
+"""Обработка длинного файла пакетов с возможностью продолжения.
+
+Каждые `interval` пакетов рассчитанные сообщения дописываются
+в выходной файл и сбрасываются на диск, после чего в файл контрольной
+точки записываются:
+* смещение во входном файле, до которого пакеты уже обработаны;
+* размер выходного файла на этот момент;
+* состояние накопителей (`aggregate.Aggregator`,
+  `sketch.MetricSketches` и т. п.) через их `to_list`;
+* число отклонённых пакетов по причинам и размер отчёта о них.
+
+Пакеты проверяются `validate.check`: неправильные не прерывают
+обработку, а пропускаются и попадают в отчёт JSONL. В отличие от
+отчёта `stream.py --rejects` (поле `index` - номер пакета с 0, см.
+`validate`), запись здесь указывает поле `line` - номер строки
+входного файла с 1, с учётом пустых строк и комментариев.
+
+Контрольная точка сначала пишется во временный файл, а затем
+заменяет старую через `os.replace`, поэтому на диске всегда есть
+целая точка. После сбоя выходной файл обрезается до сохранённого
+размера, чтение продолжается с сохранённого смещения, а накопители
+восстанавливаются - ни один пакет не учитывается и не выводится
+дважды. Объём повторной работы не превышает одного интервала.
+
+    python checkpoint.py packages.csv -o results.txt --rejects bad.jsonl
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+from typing import IO, Any, Dict, List, Optional, Sequence
+
+from homework import read_package
+from render import TEMPLATES, get_renderer
+from stream import detect_format, parse_line
+from validate import check
+
+INTERVAL = 10000
+SUFFIX = '.checkpoint'
+
+
+def load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    """Прочитать контрольную точку; None, если её нет."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_checkpoint(path: str, data: Dict[str, Any]) -> None:
+    """Атомарно заменить контрольную точку."""
+    temporary = path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+class ResumableRun:
+    """Продолжаемая обработка одного файла пакетов в выходной файл.
+
+    `states` - накопители по именам: объекты с методами `add(info)`,
+    `merge(other)`, `to_list()` и методом класса `from_list(rows)`,
+    который восстанавливает состояние без потерь.
+    """
+
+    def __init__(self, source: str, output: str,
+                 checkpoint: Optional[str] = None, fmt: str = 'auto',
+                 template: str = 'ru', interval: int = INTERVAL,
+                 states: Optional[Dict[str, Any]] = None,
+                 rejects: Optional[str] = None) -> None:
+        if interval < 1:
+            raise ValueError("interval must be positive")
+        if fmt == 'binary':
+            raise ValueError("Binary packages cannot be checkpointed")
+        self.render = get_renderer(template)
+        self.source = source
+        self.output = output
+        self.checkpoint = checkpoint or output + SUFFIX
+        self.fmt = fmt
+        self.template = template
+        self.interval = interval
+        self.states = states if states is not None else {}
+        self.rejects = rejects
+        self.rejected: Dict[str, int] = {}
+        self.rejects_size = 0
+        self.offset = 0
+        self.lineno = 0
+        self.output_size = 0
+        self.count = 0
+        self.complete = False
+
+    def _resume(self) -> None:
+        """Восстановить позицию и накопители из контрольной точки."""
+        data = load_checkpoint(self.checkpoint)
+        if data is None:
+            return
+        if (data['source'] != os.path.abspath(self.source)
+                or data['template'] != self.template
+                or data['rejects'] != _abspath(self.rejects)
+                or set(data['states']) != set(self.states)):
+            raise ValueError("Checkpoint {} belongs to another run".format(
+                self.checkpoint))
+        if os.path.getsize(self.source) < data['offset']:
+            raise ValueError("{} is shorter than checkpoint offset {}".format(
+                self.source, data['offset']))
+        for path, size in ((self.output, data['output_size']),
+                           (self.rejects, data['rejects_size'])):
+            if path is not None and os.path.getsize(path) < size:
+                raise ValueError(
+                    "{} is shorter than checkpoint size {}".format(
+                        path, size))
+        self.offset = data['offset']
+        self.lineno = data['lineno']
+        self.output_size = data['output_size']
+        self.count = data['count']
+        self.rejected = data['rejected']
+        self.rejects_size = data['rejects_size']
+        self.complete = data['complete']
+        if data['format'] != 'auto':
+            self.fmt = data['format']
+        for name, state in self.states.items():
+            state.merge(type(state).from_list(data['states'][name]))
+
+    def _save(self) -> None:
+        save_checkpoint(self.checkpoint, {
+            'source': os.path.abspath(self.source),
+            'template': self.template,
+            'format': self.fmt,
+            'offset': self.offset,
+            'lineno': self.lineno,
+            'output_size': self.output_size,
+            'count': self.count,
+            'rejects': _abspath(self.rejects),
+            'rejects_size': self.rejects_size,
+            'rejected': self.rejected,
+            'complete': self.complete,
+            'states': {name: state.to_list()
+                       for name, state in self.states.items()},
+        })
+
+    def _commit(self, out: IO[bytes], lines: List[str],
+                report: Optional[IO[bytes]], rejects: List[str],
+                offset: int, lineno: int) -> None:
+        """Записать сообщения и отчёт на диск, затем сохранить точку."""
+        if lines:
+            out.write(('\n'.join(lines) + '\n').encode('utf-8'))
+            self.count += len(lines)
+            lines.clear()
+        self.output_size = _sync(out)
+        if report is not None:
+            report.write(''.join(rejects).encode('utf-8'))
+            self.rejects_size = _sync(report)
+        rejects.clear()
+        self.offset = offset
+        self.lineno = lineno
+        self._save()
+
+    def _reject(self, lineno: int, workout_type: Any, reason: str,
+                field: Optional[str], rejects: List[str]) -> None:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        if self.rejects is not None:
+            rejects.append(json.dumps(
+                {'line': lineno, 'workout_type': workout_type,
+                 'reason': reason, 'field': field}) + '\n')
+
+    def _process(self, lineno: int, line: str, lines: List[str],
+                 rejects: List[str], states: List[Any]) -> None:
+        """Рассчитать пакет из строки или отправить его в отчёт."""
+        if self.fmt == 'auto':
+            self.fmt = detect_format(self.source, line)
+        try:
+            workout_type, data = parse_line(line, self.fmt, True)
+        except (ValueError, KeyError, TypeError):
+            workout_type, data = None, line
+        problem = check(workout_type, data)
+        if problem is not None:
+            self._reject(lineno, workout_type, *problem, rejects)
+            return
+        info = read_package(workout_type, data).show_training_info()
+        lines.append(self.render(info))
+        for state in states:
+            state.add(info)
+
+    def run(self) -> int:
+        """Обработать файл с последней контрольной точки.
+
+        Возвращает общее число сообщений в выходном файле.
+        """
+        self._resume()
+        if self.complete:
+            return self.count
+        with contextlib.ExitStack() as stack:
+            source = stack.enter_context(open(self.source, 'rb'))
+            out = stack.enter_context(_open_at(self.output,
+                                               self.output_size))
+            report = None
+            if self.rejects is not None:
+                report = stack.enter_context(_open_at(self.rejects,
+                                                      self.rejects_size))
+            source.seek(self.offset)
+            offset = self.offset
+            lineno = self.lineno
+            lines: List[str] = []
+            rejects: List[str] = []
+            pending = 0
+            states = list(self.states.values())
+            for raw in source:
+                offset += len(raw)
+                lineno += 1
+                line = raw.decode('utf-8', 'replace').strip()
+                if not line or line.startswith('#'):
+                    continue
+                self._process(lineno, line, lines, rejects, states)
+                pending += 1
+                if pending >= self.interval:
+                    self._commit(out, lines, report, rejects, offset,
+                                 lineno)
+                    pending = 0
+            self.complete = True
+            self._commit(out, lines, report, rejects, offset, lineno)
+        return self.count
+
+
+def _abspath(path: Optional[str]) -> Optional[str]:
+    return None if path is None else os.path.abspath(path)
+
+
+def _open_at(path: str, size: int) -> IO[bytes]:
+    """Открыть файл для дописывания с позиции `size`, отрезав хвост.
+
+    Без сохранённого размера файл создаётся заново.
+    """
+    file = open(path, 'r+b' if size and os.path.exists(path) else 'wb')
+    file.truncate(size)
+    file.seek(size)
+    return file
+
+
+def _sync(file: IO[bytes]) -> int:
+    """Сбросить файл на диск и вернуть его размер."""
+    file.flush()
+    os.fsync(file.fileno())
+    return file.tell()
+
+
+def run_resumable(source: str, output: str,
+                  checkpoint: Optional[str] = None, fmt: str = 'auto',
+                  template: str = 'ru', interval: int = INTERVAL,
+                  states: Optional[Dict[str, Any]] = None,
+                  rejects: Optional[str] = None) -> int:
+    """Обработать файл, продолжив с контрольной точки, если она есть."""
+    return ResumableRun(source, output, checkpoint, fmt, template,
+                        interval, states, rejects).run()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from aggregate import Aggregator
+
+    parser = argparse.ArgumentParser(
+        description='Продолжаемая обработка файла пакетов.')
+    parser.add_argument('source', help='файл с пакетами')
+    parser.add_argument('-o', '--output', required=True,
+                        help='файл для сообщений')
+    parser.add_argument('--checkpoint',
+                        help='файл контрольной точки, по умолчанию '
+                             'OUTPUT' + SUFFIX)
+    parser.add_argument('-f', '--format', default='auto',
+                        choices=('auto', 'jsonl', 'csv', 'text'),
+                        help='формат входных строк')
+    parser.add_argument('-t', '--template', default='ru',
+                        choices=sorted(TEMPLATES),
+                        help='шаблон выходных сообщений')
+    parser.add_argument('--interval', type=int, default=INTERVAL,
+                        help='число пакетов между контрольными точками')
+    parser.add_argument('--rejects', metavar='FILE',
+                        help='записать отчёт о неправильных пакетах в FILE '
+                             '(JSONL)')
+    parser.add_argument('--totals', metavar='FILE',
+                        help='записать итоги по видам тренировок в FILE '
+                             '(JSON)')
+    args = parser.parse_args(argv)
+    states = {'totals': Aggregator(None)} if args.totals else {}
+    try:
+        run = ResumableRun(args.source, args.output, args.checkpoint,
+                           args.format, args.template, args.interval,
+                           states, args.rejects)
+        run.run()
+        if run.rejected:
+            print('rejected: {}'.format(', '.join(
+                '{} {}'.format(reason, count)
+                for reason, count in sorted(run.rejected.items()))),
+                file=sys.stderr)
+        if args.totals:
+            with open(args.totals, 'w', encoding='utf-8') as file:
+                json.dump(states['totals'].to_list(), file,
+                          ensure_ascii=False, indent=2)
+    except (OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
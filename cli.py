@@ -0,0 +1,81 @@
+"""Быстрый запуск расчёта для небольших входных данных.
+
+    python cli.py RUN,15000,1,75 SWM,720,1,80,25,40
+    echo 'WLK 9000 1 75 180' | python cli.py
+
+Пакеты берутся из аргументов, а без аргументов - из стандартного
+ввода, по одному в строке: `RUN,15000,1,75`, `RUN 15000 1 75` или
+JSON, как в модуле `stream`. При запуске загружаются только `sys`
+и `homework`, модуль json - лишь для строк в формате JSON. Сообщения
+копятся в памяти и выводятся одной записью в конце, поэтому для
+больших файлов, других шаблонов и параллельного расчёта есть
+`stream.py`.
+"""
+from __future__ import annotations
+
+import sys
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterable, List, Optional, Sequence, Tuple
+
+USAGE = 'usage: cli.py [PACKAGE ...]\n  PACKAGE: RUN,15000,1,75'
+ARGV = 'argv'
+STDIN = '-'
+
+
+def parse_package(line: str) -> Tuple[str, List[float]]:
+    """Разобрать пакет из строки в формате CSV, text или JSON."""
+    if line[0] in '[{':
+        import json
+
+        value = json.loads(line)
+        if isinstance(value, dict):
+            return value['workout_type'], value['data']
+        workout_type, data = value
+        return workout_type, data
+    workout_type, *data = line.replace(',', ' ').split()
+    return workout_type, [float(value) for value in data]
+
+
+def run(lines: Iterable[str], source: str = ARGV) -> List[str]:
+    """Рассчитать пакеты из строк и вернуть тексты сообщений."""
+    from homework import read_package
+
+    messages = []
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            workout_type, data = parse_package(line)
+            info = read_package(workout_type, data).show_training_info()
+        except (ArithmeticError, ValueError, KeyError, TypeError) as error:
+            raise ValueError("{}:{}: bad package: {}".format(
+                source, lineno, error)) from error
+        messages.append(info.get_message())
+    return messages
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Точка входа командной строки."""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in ('-h', '--help'):
+        print(USAGE)
+        return 0
+    try:
+        if argv:
+            messages = run(argv, ARGV)
+        else:
+            messages = run(sys.stdin, STDIN)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    if messages:
+        sys.stdout.write('\n'.join(messages) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,16 +1,20 @@
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Type
+from __future__ import annotations
+
+# Модуль загружается при каждом запуске из командной строки, поэтому
+# импортирует только то, что нужно для расчёта. Модуль typing нужен
+# лишь для аннотаций и при выполнении не загружается.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+INFO_FIELDS = ('training_type', 'duration', 'distance', 'speed', 'calories')
 
 
-@dataclass
 class InfoMessage:
     """Информационное сообщение о тренировке."""
-    training_type: str
-    duration: float
-    distance: float
-    speed: float
-    calories: float
-    MESSAGE: str = (
+    __slots__ = INFO_FIELDS
+
+    MESSAGE = (
         "Тип тренировки: {training_type}; "
         "Длительность: {duration:.3f} ч.; "
         "Дистанция: {distance:.3f} км; "
@@ -18,31 +22,83 @@ class InfoMessage:
         "Потрачено ккал: {calories:.3f}."
     )
 
+    def __init__(self, training_type: str, duration: float,
+                 distance: float, speed: float, calories: float) -> None:
+        self.training_type = training_type
+        self.duration = duration
+        self.distance = distance
+        self.speed = speed
+        self.calories = calories
+
+    def __repr__(self) -> str:
+        return ('{}(training_type={!r}, duration={!r}, distance={!r}, '
+                'speed={!r}, calories={!r})'.format(
+                    type(self).__qualname__, self.training_type,
+                    self.duration, self.distance, self.speed,
+                    self.calories))
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return ((self.training_type, self.duration, self.distance,
+                 self.speed, self.calories)
+                == (other.training_type, other.duration, other.distance,
+                    other.speed, other.calories))
+
+    __hash__ = None
+
     def get_message(self):
         """Сообщение о тренировке"""
-        return self.MESSAGE.format(**asdict(self))
+        return self.MESSAGE.format(
+            training_type=self.training_type, duration=self.duration,
+            distance=self.distance, speed=self.speed,
+            calories=self.calories)
 
 
-@dataclass
 class Training:
     """Базовый класс тренировки."""
     LEN_STEP = 0.65
     M_IN_KM = 1000
     MIN_IN_H = 60
+    _single_pass = False
 
     def __init__(self, action: int, duration: float, weight: float):
         self.duration = duration
         self.weight = weight
         self.action = action
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # Однопроходный расчёт возможен, только если класс считает
+        # калории через `calories_from_speed` и не переопределяет
+        # методы get_*, иначе их результат был бы проигнорирован.
+        cls._single_pass = (
+            cls.calories_from_speed is not Training.calories_from_speed
+            and all(getattr(cls, name) is getattr(Training, name)
+                    for name in ('get_distance', 'get_mean_speed',
+                                 'get_spent_calories'))
+        )
+
     def show_training_info(self) -> InfoMessage:
         """Вернуть информационное сообщение о выполненной тренировке."""
-        distance = self.get_distance()
-        speed = self.get_mean_speed()
-        calories = self.get_spent_calories()
+        distance, speed, calories = self.compute_metrics()
         return InfoMessage(self.__class__.__name__, self.duration,
                            distance, speed, calories)
 
+    def compute_metrics(self) -> Tuple[float, float, float]:
+        """Рассчитать дистанцию, скорость и калории.
+
+        Дистанция и скорость вычисляются один раз и передаются
+        в следующие формулы. Для классов, переопределяющих методы
+        get_*, используются сами эти методы.
+        """
+        if not self._single_pass:
+            return (self.get_distance(), self.get_mean_speed(),
+                    self.get_spent_calories())
+        distance = self.get_distance()
+        speed = self.speed_from_distance(distance)
+        return distance, speed, self.calories_from_speed(speed)
+
     def get_distance(self) -> float:
         """Получить дистанцию в км."""
         distance = self.action * self.LEN_STEP / self.M_IN_KM
@@ -50,17 +106,68 @@ class Training:
 
     def get_mean_speed(self) -> float:
         """Получить среднюю скорость движения."""
-        return self.get_distance() / self.duration
+        return self.speed_from_distance(self.get_distance())
 
     def get_spent_calories(self) -> float:
         """Получить количество затраченных калорий."""
+        return self.calories_from_speed(self.get_mean_speed())
+
+    def speed_from_distance(self, distance: float) -> float:
+        """Средняя скорость по уже рассчитанной дистанции."""
+        return distance / self.duration
+
+    def calories_from_speed(self, speed: float) -> float:
+        """Затраченные калории по уже рассчитанной средней скорости."""
         raise NotImplementedError(
             "Метод get_spent_calories должен "
             "быть определен в дочерних классах."
         )
 
 
-@dataclass
+class WorkoutType:
+    """Зарегистрированный вид тренировки."""
+    __slots__ = ('code', 'training_class', 'fields', 'arity')
+
+    def __init__(self, code: str, training_class: Type[Training],
+                 fields: Tuple[str, ...]) -> None:
+        self.code = code
+        self.training_class = training_class
+        self.fields = fields
+        self.arity = len(fields)
+
+    def __repr__(self) -> str:
+        return 'WorkoutType(code={!r}, training_class={}, fields={!r})'.format(
+            self.code, self.training_class.__name__, self.fields)
+
+
+WORKOUT_TYPES: Dict[str, WorkoutType] = {}
+
+# Флаги CO_VARARGS и CO_VARKEYWORDS объекта кода: *args и **kwargs.
+VARIADIC_FLAGS = 0x04 | 0x08
+
+
+def register_workout(code: str,
+                     training_class: Optional[Type[Training]] = None):
+    """Зарегистрировать класс тренировки под кодом пакета.
+
+    Можно использовать как декоратор класса. Параметры пакета
+    берутся из сигнатуры `__init__` класса один раз при регистрации.
+    """
+    if training_class is None:
+        return lambda cls: register_workout(code, cls)
+    if not issubclass(training_class, Training):
+        raise TypeError("{} is not a Training subclass".format(
+            training_class.__name__))
+    init = training_class.__init__.__code__
+    if init.co_flags & VARIADIC_FLAGS:
+        raise TypeError("{}.__init__ must list its parameters".format(
+            training_class.__name__))
+    fields = init.co_varnames[1:init.co_argcount]
+    WORKOUT_TYPES[code] = WorkoutType(code, training_class, fields)
+    return training_class
+
+
+@register_workout('RUN')
 class Running(Training):
     """Тренировка: бег."""
     CALORIES_MEAN_SPEED_MULTIPLIER = 18
@@ -69,17 +176,17 @@ class Running(Training):
     def __init__(self, action: int, duration: float, weight: float) -> None:
         super().__init__(action, duration, weight)
 
-    def get_spent_calories(self) -> float:
+    def calories_from_speed(self, speed: float) -> float:
         duration_minutes = self.duration * self.MIN_IN_H
         calories = (
-            (self.CALORIES_MEAN_SPEED_MULTIPLIER * self.get_mean_speed()
+            (self.CALORIES_MEAN_SPEED_MULTIPLIER * speed
              + self.CALORIES_MEAN_SPEED_SHIFT)
             * self.weight / self.M_IN_KM * duration_minutes
         )
         return calories
 
 
-@dataclass
+@register_workout('WLK')
 class SportsWalking(Training):
     """Тренировка: спортивная ходьба."""
     GRAVITY_CONSTANT = 0.035
@@ -96,8 +203,8 @@ class SportsWalking(Training):
         super().__init__(action, duration, weight)
         self.height = height
 
-    def get_spent_calories(self) -> float:
-        spid_m_s = self.get_mean_speed() * self.SPEED_CONVERSION_CONSTANT
+    def calories_from_speed(self, speed: float) -> float:
+        spid_m_s = speed * self.SPEED_CONVERSION_CONSTANT
         calories = (
             self.GRAVITY_CONSTANT * self.weight
             + (spid_m_s ** 2 / (self.height / self.WEIGHT_CONSTANT))
@@ -106,7 +213,7 @@ class SportsWalking(Training):
         return calories
 
 
-@dataclass
+@register_workout('SWM')
 class Swimming(Training):
     """Тренировка: плавание."""
     LEN_STEP = 1.38
@@ -124,14 +231,16 @@ class Swimming(Training):
         self.length_pool = length_pool
         self.count_pool = count_pool
 
-    def get_mean_speed(self):
+    def speed_from_distance(self, distance: float) -> float:
+        # Скорость плавания считается по длине и числу бассейнов,
+        # а не по дистанции из гребков.
         pool = self.length_pool * self.count_pool
         speed = pool / self.M_IN_KM / self.duration
         return speed
 
-    def get_spent_calories(self):
+    def calories_from_speed(self, speed: float) -> float:
         calories = (
-            (self.get_mean_speed() + self.KONST_1)
+            (speed + self.KONST_1)
             * self.KONST_2
             * self.weight
             * self.duration
@@ -141,24 +250,63 @@ class Swimming(Training):
 
 def read_package(workout_type: str, data: List[float]) -> Training:
     """Прочитать данные, полученные от датчиков."""
-    workout_classes: Dict[str, Type[Training]] = {
-        'SWM': Swimming,
-        'RUN': Running,
-        'WLK': SportsWalking
-    }
+    workout = WORKOUT_TYPES.get(workout_type)
+    if workout is None:
+        raise ValueError("Unknown workout type: {}".format(workout_type))
+    if len(data) != workout.arity:
+        raise ValueError("{} expects {} values, got {}".format(
+            workout_type, workout.arity, len(data)))
+    return workout.training_class(*data)
+
 
-    if workout_type in workout_classes:
-        return workout_classes[workout_type](*data)
-    raise ValueError("Unknown workout type: {}".format(workout_type))
+def read_packages(packages: Iterable[Tuple[str, List[float]]]
+                  ) -> List[Training]:
+    """Прочитать набор пакетов, создавая тренировки по видам.
 
+    Пакеты группируются по коду тренировки, так что объекты одного
+    класса создаются подряд. Результат идёт в порядке входных пакетов.
+    """
+    packages = list(packages)
+    groups: Dict[str, List[int]] = {}
+    for index, (workout_type, data) in enumerate(packages):
+        groups.setdefault(workout_type, []).append(index)
+    trainings: List[Training] = [None] * len(packages)
+    for workout_type, indices in groups.items():
+        workout = WORKOUT_TYPES.get(workout_type)
+        if workout is None:
+            raise ValueError("Unknown workout type: {}".format(
+                workout_type))
+        training_class = workout.training_class
+        arity = workout.arity
+        for index in indices:
+            data = packages[index][1]
+            if len(data) != arity:
+                raise ValueError("{} expects {} values, got {}".format(
+                    workout_type, arity, len(data)))
+            trainings[index] = training_class(*data)
+    return trainings
 
-def main(training: Training) -> None:
-    """Главная функция."""
+
+def main(training: Training, sink: Optional[Any] = None) -> None:
+    """Главная функция.
+
+    Если передан приёмник из модуля `sinks`, сообщение не печатается,
+    а добавляется в его буфер.
+    """
     info = training.show_training_info()
-    print(info.get_message())
+    if sink is None:
+        print(info.get_message())
+    else:
+        sink.write(info)
 
 
 if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) > 1:
+        from stream import main as run_stream
+        sys.exit(run_stream(sys.argv[1:]))
+
     packages = [
         ('SWM', [720, 1, 80, 25, 40]),
         ('RUN', [15000, 1, 75]),
@@ -0,0 +1,281 @@
+"""Замеры времени по этапам обработки пакетов.
+
+Инструментирование включается явно:
+
+    with Instrumentation() as stats:
+        ...
+    print(stats.format_text())
+
+На время работы функции и методы модуля `homework`, а также
+форматирование и вывод в модулях `render`, `sinks`, `parallel`
+и `threaded` подменяются обёртками с замером времени, а после
+выключения возвращаются исходные объекты. Поэтому в выключенном
+состоянии накладных расходов нет совсем.
+
+Этапы:
+* read_package - разбор пакета и создание тренировки;
+* calculate - расчёт дистанции, скорости и калорий;
+* info_message - создание `InfoMessage`;
+* render - форматирование сообщения: `get_message` и шаблоны,
+  полученные через `render.get_renderer`;
+* output - вывод: `print` в `main` и запись в поток вывода
+  в `write_messages`, `write_parallel`, конвейере `threaded`
+  и приёмниках `sinks`.
+
+Каждый этап учитывается отдельно по видам тренировок. Чтение
+и вывод блоками сразу для многих пакетов (`read_packages`, вызовы
+`write`) учитываются с видом тренировки `BLOCK`. При расчёте в пуле
+процессов этапы дочерних процессов не видны.
+"""
+import builtins
+import json
+import sys
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import homework
+
+# Вид тренировки для записи блока сообщений разных видов.
+BLOCK = '*'
+# Верхние границы корзин гистограммы задержек в микросекундах.
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 10000)
+
+
+class StageStats:
+    """Число вызовов, суммарное время и гистограмма одного этапа."""
+
+    __slots__ = ('count', 'total_ns', 'histogram')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ns = 0
+        self.histogram = [0] * (len(BUCKETS) + 1)
+
+    def add(self, elapsed_ns: int) -> None:
+        self.count += 1
+        self.total_ns += elapsed_ns
+        micros = elapsed_ns / 1000
+        for index, bound in enumerate(BUCKETS):
+            if micros <= bound:
+                self.histogram[index] += 1
+                return
+        self.histogram[-1] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        labels = ['<={}us'.format(bound) for bound in BUCKETS]
+        labels.append('>{}us'.format(BUCKETS[-1]))
+        return {
+            'count': self.count,
+            'total_s': self.total_ns / 1e9,
+            'mean_us': self.total_ns / self.count / 1000 if self.count
+            else 0.0,
+            'histogram': dict(zip(labels, self.histogram)),
+        }
+
+
+class TimedOutput:
+    """Поток вывода, учитывающий время `write` как этап `output`."""
+
+    def __init__(self, out: Any,
+                 record: Callable[[str, str, int], None]) -> None:
+        self._out = out
+        self._record = record
+
+    def write(self, data: Any) -> Any:
+        started = time.perf_counter_ns()
+        try:
+            return self._out.write(data)
+        finally:
+            self._record('output', BLOCK,
+                         time.perf_counter_ns() - started)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._out, name)
+
+
+class Instrumentation:
+    """Включаемый сбор статистики по этапам обработки."""
+
+    def __init__(self) -> None:
+        self.stats: Dict[Tuple[str, str], StageStats] = {}
+        self._patches: List[Tuple[Any, str, Any]] = []
+        self._last_type = ''
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._patches)
+
+    def record(self, stage: str, label: str, elapsed_ns: int) -> None:
+        """Учесть один вызов этапа."""
+        key = (stage, label)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = StageStats()
+        stats.add(elapsed_ns)
+
+    def enable(self) -> 'Instrumentation':
+        """Подменить функции `homework` обёртками с замером времени."""
+        if self.enabled:
+            return self
+        # Модули вывода импортируются до подмены функций `homework`:
+        # иначе модуль, импортированный во время замера, сохранил бы
+        # у себя обёртку и после выключения.
+        self._patch_pipelines()
+        workout_names = {code: workout.training_class.__name__
+                         for code, workout in homework.WORKOUT_TYPES.items()}
+
+        def package_label(workout_type, *args, **kwargs):
+            return workout_names.get(workout_type, str(workout_type))
+
+        def message_label(info, training_type='', *args, **kwargs):
+            return kwargs.get('training_type', training_type)
+
+        def render_label(info):
+            self._last_type = info.training_type
+            return info.training_type
+
+        self._patch_function('read_package', 'read_package', package_label)
+        # Блочное чтение в `parallel` и `threaded` создаёт тренировки
+        # разных видов одним вызовом.
+        self._patch_function('read_packages', 'read_package',
+                             lambda *args, **kwargs: BLOCK)
+        self._patch(homework.Training, 'compute_metrics', 'calculate',
+                    lambda training: type(training).__name__)
+        self._patch(homework.InfoMessage, '__init__', 'info_message',
+                    message_label)
+        self._patch(homework.InfoMessage, 'get_message', 'render',
+                    render_label)
+        # `main` вызывает встроенный `print`; глобальное имя в модуле
+        # перекрывает его, пока инструментирование включено.
+        self._patch(homework, 'print', 'output',
+                    lambda *args, **kwargs: self._last_type, builtins.print)
+        return self
+
+    def _patch_pipelines(self) -> None:
+        """Подменить форматирование и вывод потоковой обработки."""
+        import parallel
+        import render
+        import sinks
+        import threaded
+
+        original = render.get_renderer
+        timed = self._timed
+
+        @wraps(original)
+        def get_renderer(*args, **kwargs):
+            return timed('render', lambda info: info.training_type,
+                         original(*args, **kwargs))
+
+        self._replace_everywhere('get_renderer', original, get_renderer)
+        self._replace_everywhere(
+            'write_messages', render.write_messages,
+            self._with_timed_output(render.write_messages, 1))
+        self._replace_everywhere(
+            'write_parallel', parallel.write_parallel,
+            self._with_timed_output(parallel.write_parallel, 1))
+        self._patch_attribute(
+            threaded.Pipeline, 'run',
+            self._with_timed_output(threaded.Pipeline.run, 2))
+        init = sinks.Sink.__init__
+
+        @wraps(init)
+        def sink_init(sink, *args, **kwargs):
+            init(sink, *args, **kwargs)
+            sink.out = TimedOutput(sink.out, self.record)
+
+        self._patch_attribute(sinks.Sink, '__init__', sink_init)
+
+    def _with_timed_output(self, function: Callable,
+                           position: int) -> Callable:
+        """Обёртка, подменяющая аргумент `out` на `TimedOutput`."""
+        record = self.record
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if len(args) > position:
+                args = (args[:position]
+                        + (TimedOutput(args[position], record),)
+                        + args[position + 1:])
+            elif 'out' in kwargs:
+                kwargs['out'] = TimedOutput(kwargs['out'], record)
+            return function(*args, **kwargs)
+        return wrapper
+
+    def disable(self) -> None:
+        """Вернуть исходные функции."""
+        while self._patches:
+            target, name, original = self._patches.pop()
+            if original is None:
+                delattr(target, name)
+            else:
+                setattr(target, name, original)
+
+    def __enter__(self) -> 'Instrumentation':
+        return self.enable()
+
+    def __exit__(self, *args: object) -> None:
+        self.disable()
+
+    def _timed(self, stage: str, label: Callable[..., str],
+               function: Callable) -> Callable:
+        record = self.record
+        clock = time.perf_counter_ns
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            started = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(stage, label(*args, **kwargs), clock() - started)
+        return wrapper
+
+    def _patch(self, target: Any, name: str, stage: str,
+               label: Callable[..., str],
+               function: Optional[Callable] = None) -> None:
+        original = vars(target).get(name)
+        self._patch_attribute(target, name,
+                              self._timed(stage, label, function or original))
+
+    def _patch_function(self, name: str, stage: str,
+                        label: Callable[..., str]) -> None:
+        """Подменить функцию `homework` во всех модулях, где она есть."""
+        original = getattr(homework, name)
+        self._replace_everywhere(name, original,
+                                 self._timed(stage, label, original))
+
+    def _replace_everywhere(self, name: str, original: Any,
+                            wrapper: Any) -> None:
+        """Заменить объект во всех модулях, импортировавших его."""
+        for module in list(sys.modules.values()):
+            if getattr(module, name, None) is original:
+                self._patch_attribute(module, name, wrapper)
+
+    def _patch_attribute(self, target: Any, name: str, value: Any) -> None:
+        self._patches.append((target, name, vars(target).get(name)))
+        setattr(target, name, value)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Статистика в виде словаря: этап -> вид тренировки -> данные."""
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (stage, label), stats in sorted(self.stats.items()):
+            result.setdefault(stage, {})[label] = stats.as_dict()
+        return result
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def format_text(self) -> str:
+        """Таблица статистики для вывода в консоль."""
+        lines = ['{:<14}{:<16}{:>10}{:>12}{:>12}'.format(
+            'stage', 'type', 'count', 'total, s', 'mean, us')]
+        for stage, labels in self.snapshot().items():
+            for label, data in labels.items():
+                lines.append('{:<14}{:<16}{:>10}{:>12.4f}{:>12.2f}'.format(
+                    stage, label, data['count'], data['total_s'],
+                    data['mean_us']))
+        return '\n'.join(lines)
+
+    def reset(self) -> None:
+        self.stats.clear()
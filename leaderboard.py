@@ -0,0 +1,154 @@
+"""Таблицы лидеров по видам тренировок.
+
+Для каждого вида тренировки и показателя (дистанция, средняя скорость,
+калории) хранятся `k` лучших результатов в куче с минимумом в корне.
+Новый результат сравнивается с корнем и попадает в таблицу за
+O(log k), поэтому сортировать всю историю не нужно. Таблицы,
+собранные на разных частях данных, можно объединять.
+"""
+import heapq
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from homework import INFO_FIELDS, WORKOUT_TYPES, InfoMessage
+
+K = 10
+METRICS = ('distance', 'speed', 'calories')
+
+
+class Leader:
+    """Результат в таблице лидеров."""
+
+    __slots__ = ('value', 'user', 'moment', 'info')
+
+    def __init__(self, value: float, user: Hashable, moment: Any,
+                 info: InfoMessage) -> None:
+        self.value = value
+        self.user = user
+        self.moment = moment
+        self.info = info
+
+    def __repr__(self) -> str:
+        return 'Leader({!r}, {!r}, {!r})'.format(
+            self.value, self.user, self.moment)
+
+
+class TopK:
+    """`k` наибольших значений; при равенстве выше более ранний."""
+
+    __slots__ = ('k', '_heap', '_order')
+
+    def __init__(self, k: int = K) -> None:
+        if k < 1:
+            raise ValueError("k must be positive: {}".format(k))
+        self.k = k
+        # Элементы кучи: (значение, -порядковый номер, лидер). Номера
+        # уникальны, поэтому до сравнения лидеров дело не доходит.
+        self._heap: List[Tuple[float, int, Leader]] = []
+        self._order = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def accepts(self, value: float) -> bool:
+        """Попадёт ли в таблицу результат со значением `value`."""
+        # Равный результат не вытесняет более ранний.
+        return len(self._heap) < self.k or value > self._heap[0][0]
+
+    def push(self, leader: Leader) -> bool:
+        """Добавить результат; вернуть True, если он попал в таблицу."""
+        self._order += 1
+        item = (leader.value, -self._order, leader)
+        heap = self._heap
+        if len(heap) < self.k:
+            heapq.heappush(heap, item)
+            return True
+        if leader.value > heap[0][0]:
+            heapq.heapreplace(heap, item)
+            return True
+        return False
+
+    def leaders(self) -> List[Leader]:
+        """Результаты от лучшего к худшему."""
+        return [item[2] for item in sorted(self._heap, reverse=True)]
+
+    def merge(self, other: 'TopK') -> None:
+        """Добавить результаты другой таблицы в порядке их мест."""
+        for leader in other.leaders():
+            self.push(leader)
+
+
+class Leaderboard:
+    """Таблицы лидеров по видам тренировок и показателям."""
+
+    def __init__(self, k: int = K, metrics: Iterable[str] = METRICS) -> None:
+        self.k = k
+        self.metrics = tuple(metrics)
+        unknown = set(self.metrics) - set(INFO_FIELDS[1:])
+        if unknown:
+            raise ValueError("Unknown metrics: {}".format(
+                ', '.join(sorted(unknown))))
+        self.boards: Dict[Tuple[str, str], TopK] = {}
+
+    def _board(self, training_type: str, metric: str) -> TopK:
+        key = (training_type, metric)
+        board = self.boards.get(key)
+        if board is None:
+            board = self.boards[key] = TopK(self.k)
+        return board
+
+    def add(self, info: InfoMessage, user: Hashable = None,
+            moment: Any = None) -> None:
+        """Учесть результат тренировки во всех таблицах её вида.
+
+        Объект `Leader` создаётся, только если результат попадает
+        в таблицу, - для большинства результатов это одно сравнение
+        с корнем кучи.
+        """
+        for metric in self.metrics:
+            value = getattr(info, metric)
+            board = self._board(info.training_type, metric)
+            if board.accepts(value):
+                board.push(Leader(value, user, moment, info))
+
+    def top(self, training_type: str, metric: str,
+            limit: Optional[int] = None) -> List[Leader]:
+        """Лидеры по показателю; вид тренировки - имя класса или код."""
+        workout = WORKOUT_TYPES.get(training_type)
+        if workout is not None:
+            training_type = workout.training_class.__name__
+        board = self.boards.get((training_type, metric))
+        if board is None:
+            if metric not in self.metrics:
+                raise ValueError("Unknown metric: {}".format(metric))
+            return []
+        return board.leaders()[:limit]
+
+    def merge(self, other: 'Leaderboard') -> 'Leaderboard':
+        """Добавить таблицы другого набора и вернуть себя."""
+        for (training_type, metric), board in other.boards.items():
+            self._board(training_type, metric).merge(board)
+        return self
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Таблицы в виде, пригодном для JSON."""
+        return [
+            dict(metric=metric, value=leader.value, user=leader.user,
+                 moment=leader.moment,
+                 **dict(zip(INFO_FIELDS, (
+                     leader.info.training_type, leader.info.duration,
+                     leader.info.distance, leader.info.speed,
+                     leader.info.calories))))
+            for (_, metric), board in self.boards.items()
+            for leader in board.leaders()
+        ]
+
+    @classmethod
+    def from_list(cls, rows: List[Dict[str, Any]], k: int = K,
+                  metrics: Iterable[str] = METRICS) -> 'Leaderboard':
+        """Восстановить таблицы из результата `to_list`."""
+        leaderboard = cls(k, metrics)
+        for row in rows:
+            info = InfoMessage(*(row[name] for name in INFO_FIELDS))
+            leaderboard._board(info.training_type, row['metric']).push(
+                Leader(row['value'], row['user'], row['moment'], info))
+        return leaderboard
@@ -0,0 +1,79 @@
+"""Текущие показатели тренировки, которая ещё идёт.
+
+Трекер присылает приращения: сколько шагов или гребков сделано,
+сколько времени прошло, сколько бассейнов проплыто. `LiveSession`
+прибавляет их к накопленным значениям одной тренировки за O(1)
+и по запросу считает показатели теми же методами, что
+и `show_training_info`, поэтому результат совпадает с расчётом
+по итоговым данным.
+
+    session = LiveSession('SWM', weight=80, length_pool=25)
+    session.update(action=360, duration=0.5, count_pool=20)
+    session.snapshot().get_message()
+"""
+from typing import Dict, Optional, Tuple
+
+from batch import get_workout
+from homework import InfoMessage, Training
+
+# Параметры, которые растут по ходу тренировки; остальные параметры
+# конструктора (вес, рост, длина бассейна) задаются при старте.
+CUMULATIVE = ('action', 'duration', 'count_pool')
+
+
+class LiveSession:
+    """Накопленное состояние одной идущей тренировки."""
+
+    def __init__(self, workout_type: str, **params: float) -> None:
+        workout = get_workout(workout_type)
+        self.workout_type = workout_type
+        self.cumulative: Tuple[str, ...] = tuple(
+            name for name in workout.fields if name in CUMULATIVE)
+        for name in self.cumulative:
+            if name in params:
+                raise TypeError("{} is accumulated by update(), not passed "
+                                "at start".format(name))
+            params[name] = 0
+        self.training: Training = workout.training_class(**params)
+        self._snapshot: Optional[InfoMessage] = None
+
+    def update(self, action: float = 0, duration: float = 0,
+               count_pool: float = 0) -> None:
+        """Прибавить приращения накопительных параметров."""
+        if action < 0 or duration < 0 or count_pool < 0:
+            raise ValueError("Negative delta: action={}, duration={}, "
+                             "count_pool={}".format(action, duration,
+                                                    count_pool))
+        training = self.training
+        if count_pool:
+            if 'count_pool' not in self.cumulative:
+                raise TypeError("{} has no cumulative parameter "
+                                "count_pool".format(self.workout_type))
+            training.count_pool += count_pool
+        training.action += action
+        training.duration += duration
+        self._snapshot = None
+
+    def totals(self) -> Dict[str, float]:
+        """Накопленные значения параметров."""
+        return {name: getattr(self.training, name)
+                for name in self.cumulative}
+
+    def snapshot(self) -> InfoMessage:
+        """Показатели на текущий момент.
+
+        Пока не прошло время тренировки, скорость и калории равны нулю.
+        Результат запоминается до следующего `update`; возвращается
+        копия, чтобы её изменение не влияло на сессию.
+        """
+        if self._snapshot is None:
+            training = self.training
+            if training.duration:
+                self._snapshot = training.show_training_info()
+            else:
+                self._snapshot = InfoMessage(
+                    type(training).__name__, training.duration,
+                    training.get_distance(), 0.0, 0.0)
+        info = self._snapshot
+        return InfoMessage(info.training_type, info.duration, info.distance,
+                           info.speed, info.calories)
@@ -0,0 +1,197 @@
+"""Учёт памяти, выделяемой на обработку одного пакета.
+
+Каждый пакет проходит этапы:
+* read_package - разбор пакета и создание тренировки;
+* show_training_info - расчёт и создание `InfoMessage`;
+* get_message - форматирование сообщения.
+
+Для каждого этапа и вида тренировки с помощью `tracemalloc`
+считаются байты, которые остались занятыми после этапа (размер его
+результата), и пик памяти во время этапа относительно его начала.
+Этап `record` - весь путь пакета целиком. Результаты этапов живут
+до конца обработки пакета, поэтому `retained` у `record` - полная
+цена одной записи.
+
+    python memprofile.py packages.csv
+    python memprofile.py --json packages.csv
+
+Неправильные пакеты (см. `validate.check`) не профилируются, а
+учитываются в `rejected` по причинам.
+
+`tracemalloc` замедляет обработку в разы: режим предназначен для
+поиска лишних выделений памяти, а не для замеров скорости.
+"""
+import argparse
+import json
+import sys
+import tracemalloc
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from homework import WORKOUT_TYPES, read_package
+from validate import check
+
+Package = Tuple[str, List[float]]
+
+STAGES = ('read_package', 'show_training_info', 'get_message', 'record')
+
+
+class AllocStats:
+    """Память, выделенная на одном этапе для одного вида тренировки."""
+
+    __slots__ = ('count', 'retained', 'max_retained', 'max_peak')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.retained = 0
+        self.max_retained = 0
+        self.max_peak = 0
+
+    def add(self, retained: int, peak: int) -> None:
+        self.count += 1
+        self.retained += retained
+        if retained > self.max_retained:
+            self.max_retained = retained
+        if peak > self.max_peak:
+            self.max_peak = peak
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean_bytes': self.retained / self.count if self.count else 0.0,
+            'max_bytes': self.max_retained,
+            'peak_bytes': self.max_peak,
+        }
+
+
+class MemoryProfile:
+    """Память по этапам и видам тренировок."""
+
+    def __init__(self) -> None:
+        self.stats: Dict[Tuple[str, str], AllocStats] = {}
+        self.rejected: Dict[str, int] = {}
+        self.peak = 0
+
+    def record(self, stage: str, label: str, retained: int,
+               peak: int) -> None:
+        """Учесть один вызов этапа."""
+        key = (stage, label)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = AllocStats()
+        stats.add(retained, peak)
+
+    def profile(self, packages: Iterable[Package]) -> 'MemoryProfile':
+        """Обработать пакеты под `tracemalloc` и вернуть себя.
+
+        Если `tracemalloc` уже запущен, он остаётся запущенным.
+        """
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            base = tracemalloc.get_traced_memory()[0]
+            peak = 0
+            for workout_type, data in packages:
+                problem = check(workout_type, data)
+                if problem is not None:
+                    reason = problem[0]
+                    self.rejected[reason] = self.rejected.get(reason, 0) + 1
+                    continue
+                peak = max(peak, self._profile_package(workout_type, data))
+            self.peak = max(self.peak, peak - base)
+        finally:
+            if started:
+                tracemalloc.stop()
+        return self
+
+    def _profile_package(self, workout_type: str,
+                         data: List[float]) -> int:
+        """Провести один пакет по этапам; вернуть пик памяти."""
+        measure = tracemalloc.get_traced_memory
+        reset = tracemalloc.reset_peak
+        label = workout_type
+        workout = WORKOUT_TYPES.get(workout_type)
+        if workout is not None:
+            label = workout.training_class.__name__
+        reset()
+        start = measure()[0]
+        training = read_package(workout_type, data)
+        after_read, peak_read = measure()
+        reset()
+        info = training.show_training_info()
+        after_info, peak_info = measure()
+        reset()
+        message = info.get_message()
+        after_message, peak_message = measure()
+        self.record('read_package', label, after_read - start,
+                    peak_read - start)
+        self.record('show_training_info', label, after_info - after_read,
+                    peak_info - after_read)
+        self.record('get_message', label, after_message - after_info,
+                    peak_message - after_info)
+        self.record('record', label, after_message - start,
+                    max(peak_read, peak_info, peak_message) - start)
+        del training, info, message
+        return max(peak_read, peak_info, peak_message)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Статистика в виде словаря: этап -> вид тренировки -> данные."""
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (stage, label), stats in sorted(
+                self.stats.items(),
+                key=lambda item: (STAGES.index(item[0][0]), item[0][1])):
+            result.setdefault(stage, {})[label] = stats.as_dict()
+        return result
+
+    def to_json(self) -> str:
+        return json.dumps({'peak_bytes': self.peak,
+                           'rejected': self.rejected,
+                           'stages': self.snapshot()},
+                          ensure_ascii=False, indent=2)
+
+    def format_text(self) -> str:
+        """Таблица статистики для вывода в консоль."""
+        lines = ['{:<20}{:<16}{:>10}{:>12}{:>10}{:>10}'.format(
+            'stage', 'type', 'count', 'mean, B', 'max, B', 'peak, B')]
+        for stage, labels in self.snapshot().items():
+            for label, data in labels.items():
+                lines.append('{:<20}{:<16}{:>10}{:>12.1f}{:>10}{:>10}'.format(
+                    stage, label, data['count'], data['mean_bytes'],
+                    data['max_bytes'], data['peak_bytes']))
+        lines.append('peak during run: {} B'.format(self.peak))
+        if self.rejected:
+            lines.append('rejected: {}'.format(', '.join(
+                '{} {}'.format(reason, count)
+                for reason, count in sorted(self.rejected.items()))))
+        return '\n'.join(lines)
+
+
+def profile_packages(packages: Iterable[Package]) -> MemoryProfile:
+    """Профиль памяти для набора пакетов."""
+    return MemoryProfile().profile(packages)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from stream import FORMATS, STDIN, iter_packages
+
+    parser = argparse.ArgumentParser(
+        description='Память на обработку пакета по этапам.')
+    parser.add_argument('sources', nargs='*', default=[STDIN],
+                        help='файлы с пакетами; "-" - стандартный ввод')
+    parser.add_argument('-f', '--format', choices=FORMATS, default='auto',
+                        help='формат входных строк')
+    parser.add_argument('--json', action='store_true',
+                        help='вывести результат в JSON')
+    args = parser.parse_args(argv)
+    try:
+        profile = profile_packages(iter_packages(args.sources, args.format,
+                                                 lenient=True))
+    except (OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    print(profile.to_json() if args.json else profile.format_text())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Параллельная обработка пакетов в пуле процессов.
+
+Поток пакетов делится на блоки по `chunk_size`, каждый блок
+обрабатывается в отдельном процессе через `read_package` и
+`show_training_info`. Процессы возвращают не отдельные `InfoMessage`,
+а компактный `InfoBatch` или готовый текст всего блока. Результаты
+выдаются строго в порядке входных данных; число блоков в работе
+ограничено, поэтому память не растёт с объёмом входа.
+"""
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import (IO, Callable, Deque, Iterable, Iterator, List, Optional,
+                    Tuple, TypeVar)
+
+from batch import InfoBatch
+from homework import read_packages
+from render import get_renderer
+
+Package = Tuple[str, List[float]]
+Result = TypeVar('Result')
+
+CHUNK_SIZE = 10000
+PREFETCH = 2
+
+
+def chunked(packages: Iterable[Package],
+            chunk_size: int = CHUNK_SIZE) -> Iterator[List[Package]]:
+    """Разбить поток пакетов на списки по `chunk_size`."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    iterator = iter(packages)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def process_chunk(chunk: List[Package]) -> InfoBatch:
+    """Рассчитать результаты блока пакетов."""
+    infos = InfoBatch()
+    for training in read_packages(chunk):
+        infos.append(training.show_training_info())
+    return infos
+
+
+def render_chunk(template: str, chunk: List[Package]) -> Tuple[int, str]:
+    """Рассчитать блок пакетов и отформатировать его в текст."""
+    render = get_renderer(template)
+    text = ''.join(render(training.show_training_info()) + '\n'
+                   for training in read_packages(chunk))
+    return len(chunk), text
+
+
+def ordered_map(func: Callable[[List[Package]], Result],
+                packages: Iterable[Package],
+                workers: Optional[int] = None,
+                chunk_size: int = CHUNK_SIZE) -> Iterator[Result]:
+    """Применить `func` к блокам пакетов в пуле процессов.
+
+    Результаты возвращаются в порядке блоков. Одновременно в работе
+    не больше `workers * PREFETCH` блоков.
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Future] = deque()
+        for chunk in chunked(packages, chunk_size):
+            pending.append(executor.submit(func, chunk))
+            if len(pending) >= workers * PREFETCH:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def process_parallel(packages: Iterable[Package],
+                     workers: Optional[int] = None,
+                     chunk_size: int = CHUNK_SIZE) -> Iterator[InfoBatch]:
+    """Рассчитать пакеты параллельно, возвращая результаты блоками."""
+    return ordered_map(process_chunk, packages, workers, chunk_size)
+
+
+def write_parallel(packages: Iterable[Package], out: IO[str],
+                   template: str = 'ru', workers: Optional[int] = None,
+                   chunk_size: int = CHUNK_SIZE) -> int:
+    """Рассчитать и отформатировать пакеты параллельно, записав в `out`.
+
+    Возвращает количество записанных сообщений.
+    """
+    # Неизвестный шаблон должен приводить к ошибке до запуска процессов.
+    get_renderer(template)
+    total = 0
+    for count, text in ordered_map(partial(render_chunk, template),
+                                   packages, workers, chunk_size):
+        out.write(text)
+        total += count
+    return total
@@ -0,0 +1,108 @@
+"""Быстрое пакетное форматирование результатов тренировок.
+
+Шаблоны сообщений компилируются один раз функцией `compile_template`
+и хранятся в реестре по имени. Шаблон по умолчанию (`ru`) даёт тот же
+текст, что и `InfoMessage.get_message`.
+"""
+from operator import attrgetter
+from string import Formatter
+from typing import IO, Callable, Dict, Iterable, List, Union
+
+from homework import INFO_FIELDS, InfoMessage
+
+Renderer = Callable[[InfoMessage], str]
+
+CHUNK_SIZE = 1024
+CONVERSIONS = (None, 'r', 's', 'a')
+
+
+def compile_template(template: str) -> Renderer:
+    """Скомпилировать шаблон сообщения в функцию форматирования.
+
+    Шаблон в синтаксисе `str.format` с полями `InfoMessage` один раз
+    переводится в позиционный (`{duration:.3f}` -> `{1:.3f}`). Функция
+    читает поля сообщения одним `attrgetter` и передаёт их в готовый
+    `str.format`, без промежуточного словаря.
+    """
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        parts.append(literal.replace('{', '{{').replace('}', '}}'))
+        if field is None:
+            continue
+        if field not in INFO_FIELDS:
+            raise ValueError("Unknown message field: {}".format(field))
+        if '{' in spec or '}' in spec:
+            raise ValueError("Unsupported format spec: {}".format(spec))
+        if conversion not in CONVERSIONS:
+            raise ValueError("Unknown conversion: {}".format(conversion))
+        parts.append('{{{}{}{}}}'.format(
+            INFO_FIELDS.index(field),
+            '!' + conversion if conversion else '',
+            ':' + spec if spec else ''))
+    render = ''.join(parts).format
+    fields = attrgetter(*INFO_FIELDS)
+    return lambda info: render(*fields(info))
+
+
+TEMPLATES: Dict[str, Renderer] = {
+    'ru': compile_template(InfoMessage.MESSAGE),
+    'en': compile_template(
+        "Training type: {training_type}; "
+        "Duration: {duration:.3f} h; "
+        "Distance: {distance:.3f} km; "
+        "Mean speed: {speed:.3f} km/h; "
+        "Calories burned: {calories:.3f}."
+    ),
+    'tsv': compile_template(
+        "{training_type}\t{duration:.3f}\t{distance:.3f}\t"
+        "{speed:.3f}\t{calories:.3f}"
+    ),
+}
+
+
+def register_template(name: str, template: str) -> Renderer:
+    """Скомпилировать шаблон и зарегистрировать его под именем `name`."""
+    renderer = compile_template(template)
+    TEMPLATES[name] = renderer
+    return renderer
+
+
+def get_renderer(template: Union[str, Renderer] = 'ru') -> Renderer:
+    """Найти зарегистрированный шаблон или вернуть переданную функцию."""
+    if callable(template):
+        return template
+    if template not in TEMPLATES:
+        raise ValueError("Unknown template: {}".format(template))
+    return TEMPLATES[template]
+
+
+def render_messages(messages: Iterable[InfoMessage],
+                    template: Union[str, Renderer] = 'ru') -> List[str]:
+    """Отформатировать набор сообщений."""
+    return list(map(get_renderer(template), messages))
+
+
+def write_messages(messages: Iterable[InfoMessage], out: IO[str],
+                   template: Union[str, Renderer] = 'ru',
+                   chunk_size: int = CHUNK_SIZE) -> int:
+    """Записать сообщения в `out` блоками по `chunk_size` строк.
+
+    Возвращает количество записанных сообщений. Если `messages`
+    прерывается исключением, уже готовые сообщения всё равно
+    записываются.
+    """
+    render = get_renderer(template)
+    count = 0
+    chunk: List[str] = []
+    try:
+        for info in messages:
+            chunk.append(render(info))
+            if len(chunk) >= chunk_size:
+                out.write('\n'.join(chunk) + '\n')
+                count += len(chunk)
+                chunk.clear()
+    finally:
+        if chunk:
+            out.write('\n'.join(chunk) + '\n')
+            count += len(chunk)
+    return count
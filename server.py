@@ -0,0 +1,237 @@
+"""Асинхронный TCP-сервер приёма пакетов от трекеров.
+
+Клиент отправляет по одному пакету в строке (JSON, CSV или текст,
+как в модуле `stream`) и получает в ответ строки сообщений в том же
+порядке. Пакеты всех соединений собираются в общую очередь
+ограниченного размера и рассчитываются блоками. Если очередь
+заполнена, сервер перестаёт читать из соединений, и TCP сам
+притормаживает отправителей.
+"""
+import argparse
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+from homework import read_package
+from render import get_renderer
+from stream import Package, detect_format, parse_line
+
+BATCH_SIZE = 256
+BATCH_DELAY = 0.002
+QUEUE_SIZE = 4096
+PENDING_SIZE = 1024
+LATENCY_SAMPLES = 10000
+# Сводок закрытых соединений, хранимых для `report`.
+FINISHED_CONNECTIONS = 1000
+
+Job = Tuple[Package, 'asyncio.Future[str]']
+
+
+class ConnectionStats:
+    """Статистика одного соединения."""
+
+    def __init__(self, peer: str) -> None:
+        self.peer = peer
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.count = 0
+        self.errors = 0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def record(self, latency: float, error: bool = False) -> None:
+        """Учесть обработанный пакет."""
+        self.count += 1
+        self.errors += error
+        self.latencies.append(latency)
+
+    @property
+    def throughput(self) -> float:
+        """Пакетов в секунду за время жизни соединения."""
+        end = self.finished or time.perf_counter()
+        elapsed = end - self.started
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def latency_quantile(self, quantile: float) -> float:
+        """Квантиль задержки в секундах по последним пакетам."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(quantile * len(ordered)))
+        return ordered[index]
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            'peer': self.peer,
+            'count': self.count,
+            'errors': self.errors,
+            'throughput': self.throughput,
+            'p50': self.latency_quantile(0.5),
+            'p99': self.latency_quantile(0.99),
+        }
+
+
+class TrainingServer:
+    """Сервер расчёта тренировок с пакетной обработкой."""
+
+    def __init__(self, batch_size: int = BATCH_SIZE,
+                 batch_delay: float = BATCH_DELAY,
+                 queue_size: int = QUEUE_SIZE,
+                 template: str = 'ru') -> None:
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.queue_size = queue_size
+        self.render = get_renderer(template)
+        # Открытые соединения; от закрытых остаются только сводки
+        # последних `FINISHED_CONNECTIONS`, без выборок задержек.
+        self.connections: Set[ConnectionStats] = set()
+        self.finished: Deque[Dict[str, object]] = deque(
+            maxlen=FINISHED_CONNECTIONS)
+        self.batches = 0
+        self._queue: Optional['asyncio.Queue[Job]'] = None
+        self._batcher: Optional['asyncio.Task[None]'] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = '127.0.0.1',
+                    port: int = 0) -> asyncio.AbstractServer:
+        """Запустить сервер; порт 0 выбирает свободный порт."""
+        self._queue = asyncio.Queue(self.queue_size)
+        self._batcher = asyncio.create_task(self._process_batches())
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        """Остановить приём соединений и обработку пакетов."""
+        self._server.close()
+        await self._server.wait_closed()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+
+    def report(self) -> List[Dict[str, object]]:
+        """Статистика закрытых, а затем открытых соединений."""
+        active = sorted(self.connections, key=lambda stats: stats.started)
+        return list(self.finished) + [stats.as_dict() for stats in active]
+
+    def calculate(self, package: Package) -> str:
+        """Рассчитать пакет и вернуть строку ответа."""
+        workout_type, data = package
+        return self.render(read_package(workout_type, data)
+                           .show_training_info())
+
+    async def _process_batches(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            jobs = [await self._queue.get()]
+            deadline = loop.time() + self.batch_delay
+            while len(jobs) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    jobs.append(await asyncio.wait_for(self._queue.get(),
+                                                       timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.batches += 1
+            for package, future in jobs:
+                if future.cancelled():
+                    continue
+                # Любая ошибка расчёта относится только к своему пакету:
+                # задача сборки блоков одна на все соединения.
+                try:
+                    future.set_result(self.calculate(package))
+                except Exception as error:
+                    future.set_exception(error)
+
+    async def _handle(self, reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter) -> None:
+        stats = ConnectionStats(str(writer.get_extra_info('peername')))
+        self.connections.add(stats)
+        pending: 'asyncio.Queue[Optional[Tuple[float, asyncio.Future]]]' = (
+            asyncio.Queue(PENDING_SIZE))
+        responder = asyncio.create_task(
+            self._respond(writer, pending, stats))
+        loop = asyncio.get_running_loop()
+        try:
+            async for raw in reader:
+                if not raw.strip():
+                    continue
+                future = loop.create_future()
+                started = time.perf_counter()
+                try:
+                    # UnicodeDecodeError - тоже ValueError.
+                    line = raw.decode('utf-8').strip()
+                    package = parse_line(line, detect_format('', line))
+                    await self._queue.put((package, future))
+                except (ValueError, KeyError, TypeError) as error:
+                    future.set_exception(ValueError(
+                        'bad package: {}'.format(error)))
+                await pending.put((started, future))
+        finally:
+            await pending.put(None)
+            await responder
+            stats.finished = time.perf_counter()
+            self.connections.discard(stats)
+            self.finished.append(stats.as_dict())
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter,
+                       pending: 'asyncio.Queue', stats: ConnectionStats
+                       ) -> None:
+        while True:
+            item = await pending.get()
+            if item is None:
+                break
+            started, future = item
+            try:
+                line = await future
+                error = False
+            except Exception as exc:
+                line = 'error: {}'.format(exc)
+                error = True
+            stats.record(time.perf_counter() - started, error)
+            if writer.is_closing():
+                continue
+            writer.write(line.encode('utf-8') + b'\n')
+            try:
+                await writer.drain()
+            except ConnectionError:
+                writer.close()
+
+
+async def serve(host: str, port: int, **options: object) -> None:
+    server = TrainingServer(**options)
+    await server.start(host, port)
+    print('Listening on {}:{}'.format(host, server.port), flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+        for stats in server.report():
+            print(stats)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description='TCP-сервер расчёта тренировок.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, batch_size=args.batch_size,
+                          queue_size=args.queue_size))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
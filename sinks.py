@@ -0,0 +1,191 @@
+"""Буферизованный вывод результатов тренировок.
+
+Приёмники принимают результаты по одному или пачками и пишут их
+в файл крупными блоками, а не строкой на каждую тренировку.
+
+* `TextSink` - текстовые сообщения по шаблону (как `main`);
+* `CsvSink` - CSV с заголовком;
+* `JsonlSink` - по объекту JSON в строке;
+* `ColumnarSink` - двоичные блоки столбцов float64, см. `read_columnar`.
+"""
+import json
+import struct
+import sys
+from array import array
+from typing import IO, Any, Iterable, Iterator, List
+
+from batch import InfoBatch
+from homework import INFO_FIELDS, InfoMessage
+from render import compile_template, get_renderer
+
+BUFFER_SIZE = 4096
+
+COLUMNAR_MAGIC = b'HWRS'
+COLUMNAR_VERSION = 1
+COLUMNAR_HEADER = struct.Struct('<4sI')
+COLUMNAR_BLOCK = struct.Struct('<II')
+FLOAT_COLUMNS = INFO_FIELDS[1:]
+
+
+class Sink:
+    """Базовый приёмник: копит результаты и пишет их блоками."""
+
+    def __init__(self, out: IO[Any], buffer_size: int = BUFFER_SIZE) -> None:
+        self.out = out
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._buffer: List[InfoMessage] = []
+
+    def write(self, info: InfoMessage) -> None:
+        """Добавить один результат."""
+        self._buffer.append(info)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def write_batch(self, messages: Iterable[InfoMessage]) -> None:
+        """Добавить пачку результатов, например `InfoBatch`."""
+        for info in messages:
+            self.write(info)
+
+    def flush(self) -> None:
+        """Записать накопленные результаты."""
+        if self._buffer:
+            self.write_block(self._buffer)
+            self.count += len(self._buffer)
+            self._buffer = []
+        self.out.flush()
+
+    def write_block(self, messages: List[InfoMessage]) -> None:
+        raise NotImplementedError(
+            "Метод write_block должен быть определен в дочерних классах.")
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> 'Sink':
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+class TextSink(Sink):
+    """Текстовые сообщения по шаблону из модуля `render`."""
+
+    def __init__(self, out: IO[str], buffer_size: int = BUFFER_SIZE,
+                 template: str = 'ru') -> None:
+        super().__init__(out, buffer_size)
+        self.render = get_renderer(template)
+
+    def write_block(self, messages: List[InfoMessage]) -> None:
+        self.out.write('\n'.join(map(self.render, messages)) + '\n')
+
+
+class CsvSink(Sink):
+    """CSV с полной точностью чисел."""
+
+    render = staticmethod(compile_template(
+        '{training_type},{duration!r},{distance!r},{speed!r},{calories!r}'))
+
+    def __init__(self, out: IO[str], buffer_size: int = BUFFER_SIZE,
+                 header: bool = True) -> None:
+        super().__init__(out, buffer_size)
+        if header:
+            out.write(','.join(INFO_FIELDS) + '\n')
+
+    def write_block(self, messages: List[InfoMessage]) -> None:
+        self.out.write('\n'.join(map(self.render, messages)) + '\n')
+
+
+class JsonlSink(Sink):
+    """Объект JSON на каждый результат."""
+
+    def write_block(self, messages: List[InfoMessage]) -> None:
+        self.out.write(''.join(
+            json.dumps(dict(zip(INFO_FIELDS, (
+                info.training_type, info.duration, info.distance,
+                info.speed, info.calories)))) + '\n'
+            for info in messages))
+
+
+class ColumnarSink(Sink):
+    """Двоичный файл из блоков столбцов.
+
+    Заголовок файла: `HWRS` и версия (uint32). Блок: число записей и
+    длина столбца видов тренировок в байтах (uint32), виды тренировок
+    в UTF-8 через перевод строки, затем столбцы duration, distance,
+    speed и calories в float64 little-endian.
+    """
+
+    def __init__(self, out: IO[bytes],
+                 buffer_size: int = BUFFER_SIZE) -> None:
+        super().__init__(out, buffer_size)
+        out.write(COLUMNAR_HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION))
+
+    def write_batch(self, messages: Iterable[InfoMessage]) -> None:
+        if not isinstance(messages, InfoBatch):
+            super().write_batch(messages)
+            return
+        # Столбцы InfoBatch пишутся как есть, без создания InfoMessage.
+        self.flush()
+        if len(messages):
+            self.write_columns(messages.training_type,
+                               [getattr(messages, name)
+                                for name in FLOAT_COLUMNS])
+            self.count += len(messages)
+
+    def write_block(self, messages: List[InfoMessage]) -> None:
+        self.write_columns(
+            [info.training_type for info in messages],
+            [array('d', [getattr(info, name) for info in messages])
+             for name in FLOAT_COLUMNS])
+
+    def write_columns(self, training_types: List[str],
+                      columns: List['array[float]']) -> None:
+        types = '\n'.join(training_types).encode('utf-8')
+        chunks = [COLUMNAR_BLOCK.pack(len(training_types), len(types)),
+                  types]
+        for column in columns:
+            if sys.byteorder != 'little':
+                column = array('d', column)
+                column.byteswap()
+            chunks.append(column.tobytes())
+        self.out.write(b''.join(chunks))
+
+
+def read_columnar(stream: IO[bytes]) -> Iterator[InfoBatch]:
+    """Прочитать блоки файла `ColumnarSink` как `InfoBatch`."""
+    header = stream.read(COLUMNAR_HEADER.size)
+    if len(header) != COLUMNAR_HEADER.size or (
+            COLUMNAR_HEADER.unpack(header)
+            != (COLUMNAR_MAGIC, COLUMNAR_VERSION)):
+        raise ValueError("Not a columnar results file")
+    while True:
+        raw = stream.read(COLUMNAR_BLOCK.size)
+        if not raw:
+            return
+        if len(raw) != COLUMNAR_BLOCK.size:
+            raise ValueError("Truncated block header")
+        count, types_size = COLUMNAR_BLOCK.unpack(raw)
+        types = stream.read(types_size)
+        infos = InfoBatch()
+        infos.training_type = types.decode('utf-8').split('\n')
+        for name in FLOAT_COLUMNS:
+            column = getattr(infos, name)
+            data = stream.read(count * column.itemsize)
+            if len(data) != count * column.itemsize:
+                raise ValueError("Truncated block")
+            column.frombytes(data)
+            if sys.byteorder != 'little':
+                column.byteswap()
+        if len(infos.training_type) != count:
+            raise ValueError("Corrupted block")
+        yield infos
+
+
+SINKS = {
+    'text': TextSink,
+    'csv': CsvSink,
+    'jsonl': JsonlSink,
+    'columnar': ColumnarSink,
+}
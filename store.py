@@ -0,0 +1,350 @@
+"""Хранилище рассчитанных результатов тренировок для запросов по истории.
+
+Результаты дописываются в конец столбцов на диске и читаются через
+`mmap`, поэтому запрос вроде «все заплывы пользователя за месяц»
+не загружает историю в память и не пересчитывает исходные пакеты.
+
+Каталог хранилища:
+
+    meta.json                 - словари видов тренировок и пользователей;
+    timestamp.f64, duration.f64, distance.f64, speed.f64,
+    calories.f64              - столбцы float64 little-endian;
+    type.u16, user.u32        - номера вида тренировки и пользователя;
+    index/type-N.u32,
+    index/user-N.u32          - возрастающие номера строк (индексы);
+    index/indexed             - число строк, уже внесённых в индексы.
+
+Время записей не убывает, поэтому столбец `timestamp` сам служит
+индексом по времени: границы диапазона находятся двоичным поиском.
+Число строк - длина самого короткого столбца, так что запись,
+прерванная сбоем, не видна после повторного открытия. Если сбой
+случился после записи столбцов, но до записи индексов, при открытии
+недостающие номера строк восстанавливаются по столбцам `type`
+и `user`.
+"""
+import json
+import mmap
+import os
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from batch import InfoBatch
+from homework import INFO_FIELDS, InfoMessage
+
+META = 'meta.json'
+INDEX = 'index'
+FLOAT_COLUMNS = ('timestamp',) + INFO_FIELDS[1:]
+# Столбец и код типа `array` для каждого файла столбца.
+COLUMNS = dict({name: ('{}.f64'.format(name), 'd')
+                for name in FLOAT_COLUMNS},
+               type=('type.u16', 'H'), user=('user.u32', 'I'))
+POSTING = 'I'
+INDEXED = 'indexed'
+
+
+class ResultStore:
+    """Дописываемое хранилище результатов с индексами.
+
+    Добавленные строки копятся в памяти и становятся видны запросам
+    после `flush`.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        os.makedirs(os.path.join(path, INDEX), exist_ok=True)
+        meta = {'types': [], 'users': []}
+        if os.path.exists(self._file(META)):
+            with open(self._file(META), encoding='utf-8') as file:
+                meta = json.load(file)
+        self.types: List[str] = meta['types']
+        self.users: List[Any] = meta['users']
+        self._type_ids = {name: index for index, name
+                          in enumerate(self.types)}
+        self._user_ids = {user: index for index, user
+                          in enumerate(self.users)}
+        self._meta_size = (len(self.types), len(self.users))
+        self._maps: Dict[str, Tuple[mmap.mmap, memoryview]] = {}
+        self._pending = {name: array(typecode) for name, (_, typecode)
+                         in COLUMNS.items()}
+        self._postings: Dict[str, array] = {}
+        self.count = self._recover()
+        self._last_timestamp = (self._column('timestamp')[self.count - 1]
+                                if self.count else float('-inf'))
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _recover(self) -> int:
+        """Число целых строк; недописанные хвосты столбцов отрезаются."""
+        sizes = {}
+        for name, (filename, typecode) in COLUMNS.items():
+            path = self._file(filename)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            sizes[name] = size // array(typecode).itemsize
+        count = min(sizes.values())
+        for name, (filename, typecode) in COLUMNS.items():
+            if sizes[name] != count:
+                with open(self._file(filename), 'r+b') as file:
+                    file.truncate(count * array(typecode).itemsize)
+        self._repair_index(count)
+        return count
+
+    def _indexed(self) -> int:
+        """Число строк, для которых индексы записаны полностью."""
+        path = os.path.join(self.path, INDEX, INDEXED)
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding='utf-8') as file:
+            return int(file.read() or 0)
+
+    def _write_indexed(self, count: int) -> None:
+        path = os.path.join(self.path, INDEX, INDEXED)
+        with open(path + '.tmp', 'w', encoding='utf-8') as file:
+            file.write(str(count))
+        os.replace(path + '.tmp', path)
+
+    def _repair_index(self, count: int) -> None:
+        """Привести индексы в соответствие с `count` строками столбцов.
+
+        Номера строк за пределами столбцов отрезаются, а строки,
+        записанные в столбцы без индексов, дописываются в индексы.
+        """
+        last: Dict[str, int] = {}
+        directory = os.path.join(self.path, INDEX)
+        for name in os.listdir(directory):
+            if name.endswith('.u32'):
+                last[name[:-4]] = _clip_posting(
+                    os.path.join(directory, name), count)
+        indexed = min(self._indexed(), count)
+        if indexed == count:
+            return
+        missing: Dict[str, array] = {}
+        types = self._map(COLUMNS['type'][0], 'H', count)
+        users = self._map(COLUMNS['user'][0], 'I', count)
+        for row in range(indexed, count):
+            for key in ('type-{}'.format(types[row]),
+                        'user-{}'.format(users[row])):
+                if row > last.get(key, -1):
+                    missing.setdefault(key, array(POSTING)).append(row)
+        del types, users
+        for key, rows in missing.items():
+            _append(os.path.join(directory, key + '.u32'), rows)
+        self._write_indexed(count)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, info: InfoMessage, user: Any,
+               timestamp: float) -> None:
+        """Добавить результат тренировки пользователя в момент времени.
+
+        `user` - строка или число (словарь пользователей хранится
+        в JSON), `timestamp` - Unix-время в секундах, не меньше
+        предыдущего.
+        """
+        if timestamp < self._last_timestamp:
+            raise ValueError("Timestamps must not decrease: {} < {}".format(
+                timestamp, self._last_timestamp))
+        if user is None:
+            raise ValueError("User must not be None")
+        self._last_timestamp = timestamp
+        row = self.count + len(self._pending['timestamp'])
+        type_id = self._type_ids.get(info.training_type)
+        if type_id is None:
+            type_id = self._type_ids[info.training_type] = len(self.types)
+            self.types.append(info.training_type)
+        user_id = self._user_ids.get(user)
+        if user_id is None:
+            user_id = self._user_ids[user] = len(self.users)
+            self.users.append(user)
+        pending = self._pending
+        pending['timestamp'].append(timestamp)
+        pending['duration'].append(info.duration)
+        pending['distance'].append(info.distance)
+        pending['speed'].append(info.speed)
+        pending['calories'].append(info.calories)
+        pending['type'].append(type_id)
+        pending['user'].append(user_id)
+        for key in ('type-{}'.format(type_id), 'user-{}'.format(user_id)):
+            posting = self._postings.get(key)
+            if posting is None:
+                posting = self._postings[key] = array(POSTING)
+            posting.append(row)
+
+    def flush(self) -> None:
+        """Записать добавленные строки на диск.
+
+        Сначала пишутся словари, затем столбцы, затем индексы: при сбое
+        на любом шаге после открытия видны только целые строки, а
+        индексы восстанавливаются по столбцам.
+        """
+        added = len(self._pending['timestamp'])
+        if (len(self.types), len(self.users)) != self._meta_size:
+            self._write_meta()
+        for name, (filename, _) in COLUMNS.items():
+            _append(self._file(filename), self._pending[name])
+            del self._pending[name][:]
+        for key, posting in self._postings.items():
+            _append(os.path.join(self.path, INDEX, key + '.u32'), posting)
+        self._postings.clear()
+        self.count += added
+        if added:
+            self._write_indexed(self.count)
+
+    def _write_meta(self) -> None:
+        temporary = self._file(META + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({'types': self.types, 'users': self.users}, file,
+                      ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self._file(META))
+        self._meta_size = (len(self.types), len(self.users))
+
+    def _map(self, filename: str, typecode: str,
+             size: int) -> Sequence[Any]:
+        """Первые `size` значений файла без чтения его в память."""
+        if size == 0:
+            return array(typecode)
+        itemsize = array(typecode).itemsize
+        mapped = self._maps.get(filename)
+        if mapped is None or len(mapped[0]) < size * itemsize:
+            # Старое отображение закроется, когда на него не останется
+            # ссылок: срезы из него могут быть ещё в работе.
+            with open(self._file(filename), 'rb') as file:
+                handle = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            mapped = self._maps[filename] = (handle, memoryview(handle))
+        view = mapped[1][:size * itemsize]
+        if sys.byteorder == 'little':
+            return view.cast(typecode)
+        values = array(typecode, view.tobytes())
+        values.byteswap()
+        return values
+
+    def _column(self, name: str) -> Sequence[Any]:
+        filename, typecode = COLUMNS[name]
+        return self._map(filename, typecode, self.count)
+
+    def _posting(self, key: str) -> Sequence[int]:
+        filename = os.path.join(INDEX, key + '.u32')
+        path = self._file(filename)
+        if not os.path.exists(path):
+            return array(POSTING)
+        size = os.path.getsize(path) // array(POSTING).itemsize
+        rows = self._map(filename, POSTING, size)
+        # Индекс может быть длиннее столбцов после сбоя.
+        return rows[:bisect_left(rows, self.count)]
+
+    def rows(self, user: Any = None, training_type: Optional[str] = None,
+             start: Optional[float] = None,
+             end: Optional[float] = None) -> 'array[int]':
+        """Номера строк, подходящих под условия.
+
+        Время - полуинтервал [start, end). Проверяются только строки
+        из индекса пользователя или вида тренировки и диапазона времени.
+        """
+        timestamps = self._column('timestamp')
+        low = 0 if start is None else bisect_left(timestamps, start)
+        high = self.count if end is None else bisect_left(timestamps, end)
+        filters = []
+        if user is not None:
+            if user not in self._user_ids:
+                return array(POSTING)
+            filters.append(('user', 'user-{}'.format(self._user_ids[user]),
+                            self._user_ids[user]))
+        if training_type is not None:
+            if training_type not in self._type_ids:
+                return array(POSTING)
+            type_id = self._type_ids[training_type]
+            filters.append(('type', 'type-{}'.format(type_id), type_id))
+        if not filters:
+            return array(POSTING, range(low, high))
+        postings = [self._posting(key) for _, key, _ in filters]
+        shortest = min(range(len(filters)),
+                       key=lambda index: len(postings[index]))
+        candidates = postings[shortest]
+        candidates = candidates[bisect_left(candidates, low):
+                                bisect_left(candidates, high)]
+        result = array(POSTING, candidates)
+        for index, (column, _, value) in enumerate(filters):
+            if index != shortest:
+                values = self._column(column)
+                result = array(POSTING, [row for row in result
+                                         if values[row] == value])
+        return result
+
+    def read(self, rows: Sequence[int]) -> InfoBatch:
+        """Результаты тренировок для номеров строк."""
+        infos = InfoBatch()
+        types = self._column('type')
+        infos.training_type = [self.types[types[row]] for row in rows]
+        for name in INFO_FIELDS[1:]:
+            column = self._column(name)
+            getattr(infos, name).extend(column[row] for row in rows)
+        return infos
+
+    def timestamps(self, rows: Sequence[int]) -> 'array[float]':
+        """Время записей для номеров строк."""
+        column = self._column('timestamp')
+        return array('d', [column[row] for row in rows])
+
+    def select(self, user: Any = None, training_type: Optional[str] = None,
+               start: Optional[float] = None,
+               end: Optional[float] = None) -> InfoBatch:
+        """Результаты тренировок, подходящих под условия `rows`."""
+        return self.read(self.rows(user, training_type, start, end))
+
+    def close(self) -> None:
+        """Записать добавленные строки и освободить отображения файлов."""
+        self.flush()
+        for handle, view in self._maps.values():
+            view.release()
+            handle.close()
+        self._maps.clear()
+
+    def __enter__(self) -> 'ResultStore':
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+def _clip_posting(path: str, count: int) -> int:
+    """Отрезать номера строк не меньше `count`; вернуть последний.
+
+    Обычно достаточно прочитать последний номер; файл целиком читается
+    только после сбоя.
+    """
+    itemsize = array(POSTING).itemsize
+    with open(path, 'r+b') as file:
+        size = file.seek(0, os.SEEK_END)
+        if size and size % itemsize == 0:
+            file.seek(size - itemsize)
+            last = _read_rows(file.read(itemsize))[0]
+            if last < count:
+                return last
+        file.seek(0)
+        rows = _read_rows(file.read(size - size % itemsize))
+        kept = bisect_left(rows, count)
+        file.truncate(kept * itemsize)
+        return rows[kept - 1] if kept else -1
+
+
+def _read_rows(data: bytes) -> 'array[int]':
+    rows = array(POSTING, data)
+    if sys.byteorder != 'little':
+        rows.byteswap()
+    return rows
+
+
+def _append(path: str, values: 'array[Any]') -> None:
+    """Дописать значения в файл в порядке байт little-endian."""
+    if not values:
+        return
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    with open(path, 'ab') as file:
+        values.tofile(file)
@@ -0,0 +1,373 @@
+"""Потоковая обработка пакетов данных от датчиков.
+
+Пакеты читаются лениво из файлов или стандартного ввода и проходят
+цепочку генераторов: разбор строки -> `read_package` ->
+`show_training_info` -> текст сообщения. В памяти одновременно
+находится одна входная строка и небольшой блок выходных, поэтому
+объём входа не ограничен.
+
+Поддерживаемые форматы строк:
+* jsonl: `["RUN", [15000, 1, 75]]` или
+  `{"workout_type": "RUN", "data": [15000, 1, 75]}`;
+* csv: `RUN,15000,1,75`;
+* text: `RUN 15000 1 75`.
+
+Файлы с расширением `.hwpk` читаются в двоичном формате модуля `wire`.
+
+Сообщения записываются блоками через `render.write_messages`.
+Повторно переданные пакеты можно не пересчитывать (`--cache-size`)
+или не выводить вовсе (`--dedupe`), см. модуль `cache`. С `--rejects`
+неправильные пакеты пропускаются, а отчёт о них записывается в файл,
+см. модуль `validate`. Без него первый пакет, который не удалось
+разобрать или рассчитать, останавливает обработку с ошибкой
+`источник:строка: bad package`; результаты до него выводятся.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import sys
+from typing import (IO, Dict, Iterable, Iterator, List, Optional, Sequence,
+                    Tuple, Union)
+
+from homework import InfoMessage, read_package
+from render import TEMPLATES, write_messages
+
+Package = Tuple[str, List[float]]
+
+FORMATS = ('auto', 'jsonl', 'csv', 'text', 'binary')
+EXTENSIONS = {'.jsonl': 'jsonl', '.json': 'jsonl', '.csv': 'csv',
+              '.hwpk': 'binary'}
+OUTPUT_FORMATS = ('text', 'csv', 'jsonl', 'columnar')
+STDIN = '-'
+
+
+def read_lines(source: str) -> Iterator[Tuple[int, str]]:
+    """Прочитать непустые строки источника вместе с их номерами."""
+    if source == STDIN:
+        stream = sys.stdin
+        close = False
+    else:
+        stream = open(source, encoding='utf-8')
+        close = True
+    try:
+        for lineno, line in enumerate(stream, 1):
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield lineno, line
+    finally:
+        if close:
+            stream.close()
+
+
+def detect_format(source: str, line: str) -> str:
+    """Определить формат источника по расширению или первой строке."""
+    for extension, fmt in EXTENSIONS.items():
+        if source.endswith(extension):
+            return fmt
+    if line[0] in '[{':
+        return 'jsonl'
+    if ',' in line:
+        return 'csv'
+    return 'text'
+
+
+def parse_json(line: str) -> Package:
+    """Разобрать пакет в формате JSON."""
+    value = json.loads(line)
+    if isinstance(value, dict):
+        return value['workout_type'], value['data']
+    workout_type, data = value
+    return workout_type, data
+
+
+def parse_number(value: str) -> Union[float, str]:
+    """Число из строки или сама строка, если это не число."""
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def parse_fields(fields: Sequence[str], lenient: bool = False) -> Package:
+    """Разобрать пакет из кода тренировки и числовых полей.
+
+    С `lenient` нечисловые поля остаются строками, чтобы
+    `validate.check` отклонил пакет с причиной NOT_NUMBER.
+    """
+    workout_type, *data = fields
+    try:
+        return workout_type.strip(), [float(value) for value in data]
+    except ValueError:
+        if not lenient:
+            raise
+        return workout_type.strip(), [parse_number(value) for value in data]
+
+
+def parse_line(line: str, fmt: str, lenient: bool = False) -> Package:
+    """Разобрать строку с пакетом в заданном формате."""
+    if fmt == 'jsonl':
+        return parse_json(line)
+    if fmt == 'csv':
+        return parse_fields(next(csv.reader([line])), lenient)
+    return parse_fields(line.split(), lenient)
+
+
+class Position:
+    """Источник и номер строки последнего прочитанного пакета."""
+
+    __slots__ = ('source', 'lineno')
+
+    def __init__(self) -> None:
+        self.source = ''
+        self.lineno = 0
+
+    def __str__(self) -> str:
+        return '{}:{}'.format(self.source, self.lineno)
+
+
+def read_binary(source: str,
+                position: Optional[Position] = None) -> Iterator[Package]:
+    """Прочитать пакеты из двоичного файла через `mmap`."""
+    if source == STDIN:
+        raise ValueError("Binary packages cannot be read from stdin")
+    from wire import iter_packages as iter_binary, open_packages
+
+    with open_packages(source) as buffer:
+        for index, package in enumerate(iter_binary(buffer), 1):
+            if position is not None:
+                position.lineno = index
+            yield package
+
+
+def parse_packages(source: str, fmt: str = 'auto',
+                   lenient: bool = False,
+                   position: Optional[Position] = None
+                   ) -> Iterator[Package]:
+    """Лениво прочитать пакеты из одного источника.
+
+    С `lenient` ошибка разбора не прерывает чтение: нечисловые поля
+    остаются строками, а строка, которую не удалось разобрать,
+    передаётся как пакет `(None, строка)` для `validate.check`.
+    В `position` перед выдачей пакета записывается его место:
+    номер строки, а для двоичного файла - номер пакета.
+    """
+    if position is not None:
+        position.source = source
+    if fmt == 'binary' or fmt == 'auto' and source.endswith('.hwpk'):
+        yield from read_binary(source, position)
+        return
+    for lineno, line in read_lines(source):
+        if position is not None:
+            position.lineno = lineno
+        if fmt == 'auto':
+            fmt = detect_format(source, line)
+        try:
+            package = parse_line(line, fmt, lenient)
+        except (ValueError, KeyError, TypeError) as error:
+            if not lenient:
+                raise ValueError("{}:{}: bad package: {}".format(
+                    source, lineno, error)) from error
+            package = None, line
+        yield package
+
+
+def iter_packages(sources: Iterable[str], fmt: str = 'auto',
+                  lenient: bool = False,
+                  position: Optional[Position] = None) -> Iterator[Package]:
+    """Последовательно прочитать пакеты из всех источников."""
+    for source in sources:
+        yield from parse_packages(source, fmt, lenient, position)
+
+
+def process(packages: Iterable[Package],
+            position: Optional[Position] = None) -> Iterator[InfoMessage]:
+    """Рассчитать результаты тренировок для потока пакетов.
+
+    Ошибка расчёта пакета, например деление на нулевую длительность,
+    выбрасывается как ValueError с местом пакета из `position`.
+    """
+    for workout_type, data in packages:
+        try:
+            info = read_package(workout_type, data).show_training_info()
+        except (ArithmeticError, TypeError, ValueError) as error:
+            if position is None:
+                raise
+            raise ValueError("{}: bad package: {}".format(
+                position, error)) from error
+        yield info
+
+
+def run(sources: Iterable[str], out: IO, fmt: str = 'auto',
+        template: str = 'ru', workers: int = 1,
+        chunk_size: Optional[int] = None,
+        output_format: str = 'text', cache_size: Optional[int] = None,
+        dedupe: bool = False, rejects: Optional[List] = None,
+        queue_depth: Optional[int] = None,
+        stages: Optional[Dict] = None) -> int:
+    """Обработать все источники и записать результаты в `out`.
+
+    При `workers` больше одного расчёт выполняется в пуле процессов
+    блоками по `chunk_size` пакетов. Для `output_format`, отличного
+    от `text`, результаты пишутся приёмником из модуля `sinks`;
+    для `columnar` поток `out` должен быть двоичным.
+
+    С `cache_size` или `dedupe` результаты повторов берутся из
+    `cache.ResultCache`; такой расчёт выполняется в одном процессе.
+
+    Если передан список `rejects` или `validate.RejectReport`, пакеты
+    проверяются функцией `validate.iter_valid`: неправильные,
+    в том числе неразобранные строки, не рассчитываются, а попадают
+    в отчёт.
+
+    С `queue_depth` текст выводится конвейером `threaded.Pipeline`:
+    чтение, расчёт и запись идут в отдельных потоках. Если передан
+    словарь `stages`, в него записывается занятость этапов.
+    """
+    position = Position()
+    packages = iter_packages(sources, fmt, rejects is not None, position)
+    if rejects is not None:
+        from validate import iter_valid
+        packages = iter_valid(packages, rejects)
+    if queue_depth:
+        if workers > 1 or cache_size or dedupe or output_format != 'text':
+            raise ValueError("Threaded pipeline supports only text output "
+                             "without workers and cache")
+        return _run_threaded(packages, out, template, queue_depth,
+                             chunk_size, stages)
+    messages = _process_in_process(packages, workers, cache_size, dedupe,
+                                   position)
+    if output_format == 'text':
+        return _write_text(packages, messages, out, template, workers,
+                           chunk_size)
+    return _write_sink(packages, messages, out, output_format, workers,
+                       chunk_size)
+
+
+def _run_threaded(packages: Iterable[Package], out: IO, template: str,
+                  queue_depth: int, chunk_size: Optional[int],
+                  stages: Optional[Dict]) -> int:
+    """Вывести текст конвейером `threaded.Pipeline`."""
+    from threaded import CHUNK_SIZE, Pipeline
+    pipeline = Pipeline(template, queue_depth, chunk_size or CHUNK_SIZE)
+    try:
+        return pipeline.run(packages, out)
+    finally:
+        if stages is not None:
+            stages.update(pipeline.stats)
+
+
+def _process_in_process(packages: Iterable[Package], workers: int,
+                        cache_size: Optional[int], dedupe: bool,
+                        position: Position
+                        ) -> Optional[Iterable[InfoMessage]]:
+    """Результаты расчёта в текущем процессе.
+
+    Возвращает `None`, если расчёт выполняется в пуле процессов.
+    """
+    if cache_size or dedupe:
+        if workers > 1:
+            raise ValueError("Result cache cannot be used with workers")
+        from cache import MAXSIZE, ResultCache
+        return ResultCache(cache_size or MAXSIZE, dedupe).process(packages)
+    if workers <= 1:
+        return process(packages, position)
+    return None
+
+
+def _write_text(packages: Iterable[Package],
+                messages: Optional[Iterable[InfoMessage]], out: IO,
+                template: str, workers: int,
+                chunk_size: Optional[int]) -> int:
+    """Вывести результаты текстом по шаблону."""
+    if messages is not None:
+        return write_messages(messages, out, template)
+    from parallel import CHUNK_SIZE, write_parallel
+    return write_parallel(packages, out, template, workers,
+                          chunk_size or CHUNK_SIZE)
+
+
+def _write_sink(packages: Iterable[Package],
+                messages: Optional[Iterable[InfoMessage]], out: IO,
+                output_format: str, workers: int,
+                chunk_size: Optional[int]) -> int:
+    """Записать результаты приёмником из модуля `sinks`."""
+    from sinks import SINKS
+
+    with SINKS[output_format](out) as sink:
+        if messages is None:
+            from parallel import CHUNK_SIZE, process_parallel
+            for infos in process_parallel(packages, workers,
+                                          chunk_size or CHUNK_SIZE):
+                sink.write_batch(infos)
+        else:
+            sink.write_batch(messages)
+    return sink.count
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Обработка пакетов данных фитнес-трекера.')
+    parser.add_argument('sources', nargs='*', default=[STDIN],
+                        help='файлы с пакетами; "-" - стандартный ввод')
+    parser.add_argument('-f', '--format', choices=FORMATS, default='auto',
+                        help='формат входных строк')
+    parser.add_argument('-t', '--template', default='ru',
+                        choices=sorted(TEMPLATES),
+                        help='шаблон выходных сообщений')
+    parser.add_argument('-o', '--output-format', default='text',
+                        choices=OUTPUT_FORMATS,
+                        help='формат вывода результатов')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='число процессов для расчёта')
+    parser.add_argument('--chunk-size', type=int,
+                        help='число пакетов в блоке для одного процесса')
+    parser.add_argument('--cache-size', type=int,
+                        help='число запоминаемых результатов пакетов')
+    parser.add_argument('--dedupe', action='store_true',
+                        help='не выводить результаты повторных пакетов')
+    parser.add_argument('--rejects', metavar='FILE',
+                        help='пропускать неправильные пакеты и записать '
+                             'отчёт о них в FILE (JSONL)')
+    parser.add_argument('--queue-depth', type=int,
+                        help='читать, считать и писать в отдельных потоках '
+                             'с очередями такой длины')
+    parser.add_argument('--stage-stats', action='store_true',
+                        help='вывести занятость этапов конвейера в stderr')
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Точка входа командной строки."""
+    args = build_parser().parse_args(argv)
+    stages = {} if args.stage_stats else None
+    try:
+        with contextlib.ExitStack() as stack:
+            rejects = None
+            if args.rejects:
+                # Отчёт пишется по мере проверки, а не копится в памяти.
+                from validate import RejectReport
+                rejects = RejectReport(stack.enter_context(
+                    open(args.rejects, 'w', encoding='utf-8')))
+            out = sys.stdout
+            if args.output_format == 'columnar':
+                out = sys.stdout.buffer
+            run(args.sources, out, args.format, args.template,
+                args.workers, args.chunk_size, args.output_format,
+                args.cache_size, args.dedupe, rejects, args.queue_depth,
+                stages)
+        if stages:
+            from threaded import format_stats
+            print(format_stats(stages), file=sys.stderr)
+    except (OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    except ArithmeticError as error:
+        # Пул процессов и кэш результатов не знают места пакета.
+        print('bad package: {}'.format(error), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
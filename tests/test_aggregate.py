@@ -0,0 +1,67 @@
+import json
+import pickle
+import pytest
+from datetime import date, datetime
+
+import aggregate
+import homework
+
+
+def info(package):
+    return homework.read_package(*package).show_training_info()
+
+
+RUN = info(('RUN', [15000, 1, 75]))
+SWM = info(('SWM', [720, 1, 80, 25, 40]))
+
+
+@pytest.mark.parametrize('bucket, moment, expected', [
+    (aggregate.day_bucket, date(2022, 9, 30), '2022-09-30'),
+    (aggregate.day_bucket, 1664582400, '2022-10-01'),
+    (aggregate.week_bucket, datetime(2022, 1, 2, 10), '2021-W52'),
+    (aggregate.month_bucket, date(2022, 9, 30), '2022-09'),
+])
+def test_buckets(bucket, moment, expected):
+    assert bucket(moment) == expected
+
+
+def test_aggregator_totals():
+    aggregator = aggregate.Aggregator()
+    aggregator.add(RUN, 'anna', date(2022, 9, 30))
+    aggregator.add(RUN, 'anna', date(2022, 9, 30))
+    aggregator.add(SWM, 'anna', date(2022, 9, 30))
+    aggregator.add(RUN, 'boris', date(2022, 10, 1))
+    assert len(aggregator) == 3
+    totals = aggregator.total('anna', 'Running')
+    assert totals.count == 2
+    assert totals.distance == pytest.approx(2 * RUN.distance)
+    assert totals.mean_speed == pytest.approx(RUN.speed)
+    assert aggregator.total(period='2022-10-01').count == 1
+    assert aggregator.total().calories == pytest.approx(
+        3 * RUN.calories + SWM.calories)
+
+
+def test_aggregator_merge_matches_single():
+    single = aggregate.Aggregator(aggregate.week_bucket)
+    parts = [aggregate.Aggregator(aggregate.week_bucket) for _ in range(3)]
+    for index in range(30):
+        result = RUN if index % 3 else SWM
+        moment = date(2022, 9, 1 + index)
+        single.add(result, index % 2, moment)
+        parts[index % 3].add(result, index % 2, moment)
+    merged = aggregate.Aggregator(aggregate.week_bucket)
+    for part in parts:
+        merged.merge(pickle.loads(pickle.dumps(part)))
+    assert merged.totals.keys() == single.totals.keys()
+    for key, totals in single.totals.items():
+        assert merged.totals[key].as_dict() == pytest.approx(
+            totals.as_dict())
+
+
+def test_aggregator_serialization():
+    aggregator = aggregate.Aggregator()
+    aggregator.add(RUN, 'anna', date(2022, 9, 30))
+    aggregator.add(SWM)
+    rows = json.loads(json.dumps(aggregator.to_list()))
+    restored = aggregate.Aggregator.from_list(rows)
+    assert restored.to_list() == aggregator.to_list()
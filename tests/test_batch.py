@@ -0,0 +1,119 @@
+import pytest
+import tracemalloc
+from array import array
+
+import batch
+import homework
+
+
+PACKAGES = {
+    'SWM': [[720, 1, 80, 25, 40], [1206, 2.5, 60.3, 50, 12]],
+    'RUN': [[15000, 1, 75], [420, 4, 20], [1206, 12, 6]],
+    'WLK': [[9000, 1, 75, 180], [3000.33, 2.512, 75.8, 180.1]],
+}
+
+
+def to_columns(workout_type, packages):
+    fields = homework.WORKOUT_TYPES[workout_type].fields
+    return {name: [row[i] for row in packages]
+            for i, name in enumerate(fields)}
+
+
+@pytest.mark.parametrize('workout_type', ['SWM', 'RUN', 'WLK'])
+def test_process_batch_matches_objects(workout_type):
+    packages = PACKAGES[workout_type]
+    result = batch.process_batch(workout_type,
+                                 to_columns(workout_type, packages))
+    assert len(result) == len(packages)
+    for info, data in zip(result, packages):
+        expected = homework.read_package(workout_type, data)
+        assert info == expected.show_training_info(), (
+            'Пакетный расчёт должен совпадать с расчётом по объектам.'
+        )
+
+
+def test_process_batch_accepts_arrays():
+    columns = {name: array('d', values) for name, values
+               in to_columns('RUN', PACKAGES['RUN']).items()}
+    result = batch.process_batch('RUN', columns)
+    assert result[2].get_message() == (
+        'Тип тренировки: Running; '
+        'Длительность: 12.000 ч.; '
+        'Дистанция: 0.784 км; '
+        'Ср. скорость: 0.065 км/ч; '
+        'Потрачено ккал: 12.812.'
+    )
+
+
+@pytest.mark.parametrize('workout_type, columns', [
+    ('BIK', {'action': [1], 'duration': [1], 'weight': [1]}),
+    ('RUN', {'action': [1], 'duration': [1]}),
+    ('RUN', {'action': [1, 2], 'duration': [1], 'weight': [1]}),
+])
+def test_process_batch_invalid(workout_type, columns):
+    with pytest.raises(ValueError):
+        batch.process_batch(workout_type, columns)
+
+
+def test_training_batch_matches_objects():
+    trainings = batch.TrainingBatch('WLK', PACKAGES['WLK'])
+    assert len(trainings) == 2
+    assert isinstance(trainings[1], homework.SportsWalking)
+    assert trainings[1].height == 180.1
+    assert list(trainings.show_training_info()) == [
+        homework.read_package('WLK', data).show_training_info()
+        for data in PACKAGES['WLK']
+    ]
+    with pytest.raises(ValueError):
+        trainings.append([9000, 1, 75])
+
+
+def test_info_message_has_no_dict():
+    info = homework.InfoMessage('Running', 1, 2, 3, 4)
+    assert not hasattr(info, '__dict__')
+
+
+def traced_size(factory):
+    tracemalloc.start()
+    try:
+        result = factory()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def test_info_batch_is_compact():
+    size = 10000
+
+    def messages():
+        return [homework.InfoMessage('Running', float(i), 2.5, 3.5, 4.5)
+                for i in range(size)]
+
+    def columns():
+        infos = batch.InfoBatch()
+        for i in range(size):
+            infos.append(
+                homework.InfoMessage('Running', float(i), 2.5, 3.5, 4.5))
+        return infos
+
+    assert traced_size(columns) * 2 < traced_size(messages), (
+        'Колоночное хранение должно занимать заметно меньше памяти.'
+    )
+
+
+def test_process_batch_registered_type():
+    @homework.register_workout('TST')
+    class Test(homework.Training):
+        def calories_from_speed(self, speed):
+            return speed * 2
+
+    try:
+        result = batch.process_batch(
+            'TST', {'action': [1000, 2000], 'duration': [1, 2],
+                    'weight': [70, 80]})
+    finally:
+        del homework.WORKOUT_TYPES['TST']
+    assert list(result.calories) == [1.3, 1.3]
+    assert result.training_type == ['Test', 'Test']
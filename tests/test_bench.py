@@ -0,0 +1,34 @@
+import json
+
+import bench
+
+
+def test_run_benchmarks():
+    result = bench.run_benchmarks(sizes=[3, 6], repeat=1)
+    assert sorted(result['results']) == sorted(
+        '{}[{}]'.format(name, size)
+        for name in bench.CASES for size in (3, 6))
+    assert all(value > 0 for value in result['results'].values())
+    json.dumps(result)
+
+
+def test_compare():
+    baseline = {'results': {'main[10]': 1000.0, 'get_message[10]': 500.0,
+                            'removed[10]': 1.0}}
+    current = {'results': {'main[10]': 850.0, 'get_message[10]': 350.0}}
+    regressions = bench.compare(current, baseline, threshold=0.2)
+    assert len(regressions) == 1
+    assert regressions[0].startswith('get_message[10]')
+    assert bench.compare(current, baseline, threshold=0.5) == []
+
+
+def test_main_baseline(tmp_path):
+    output = tmp_path / 'bench.json'
+    assert bench.main(['--sizes', '2', '--repeat', '1', '--case', 'main',
+                       '--output', str(output)]) == 0
+    saved = json.loads(output.read_text(encoding='utf-8'))
+    saved['results']['main[2]'] *= 1000
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps(saved), encoding='utf-8')
+    assert bench.main(['--sizes', '2', '--repeat', '1', '--case', 'main',
+                       '--baseline', str(baseline)]) == 1
@@ -0,0 +1,71 @@
+import io
+import pytest
+
+import cache
+import homework
+import stream
+
+RUN = ('RUN', [15000, 1, 75])
+SWM = ('SWM', [720, 1, 80, 25, 40])
+WLK = ('WLK', [9000, 1, 75, 180])
+
+
+def fresh(package):
+    return homework.read_package(*package).show_training_info()
+
+
+def test_cached_result_is_identical():
+    results = cache.ResultCache()
+    first = results.calculate(*RUN)
+    second = results.calculate('RUN', [15000.0, 1.0, 75.0])
+    assert first == second == fresh(RUN)
+    assert first is not second, 'Из кэша возвращается новый InfoMessage'
+    assert second.get_message() == fresh(RUN).get_message()
+    second.calories = 0
+    assert results.calculate(*RUN) == fresh(RUN), (
+        'Изменение результата не должно портить кэш')
+    assert (results.hits, results.misses) == (2, 1)
+
+
+def test_lru_eviction():
+    results = cache.ResultCache(maxsize=2)
+    results.calculate(*RUN)
+    results.calculate(*SWM)
+    results.calculate(*RUN)
+    results.calculate(*WLK)
+    assert results.evictions == 1
+    assert len(results) == 2
+    assert results.lookup(*RUN)[0], 'Недавний пакет остаётся в кэше'
+    assert not results.lookup(*SWM)[0], 'Давний пакет вытеснен'
+    assert results.as_dict() == {
+        'size': 2, 'maxsize': 2, 'hits': 2, 'misses': 4, 'evictions': 2,
+        'hit_rate': pytest.approx(1 / 3)}
+
+
+@pytest.mark.parametrize('dedupe, expected', [
+    (False, [RUN, SWM, RUN, RUN, WLK]),
+    (True, [RUN, SWM, WLK]),
+])
+def test_process(dedupe, expected):
+    results = cache.ResultCache(dedupe=dedupe)
+    messages = list(results.process([RUN, SWM, RUN, RUN, WLK]))
+    assert messages == [fresh(package) for package in expected]
+
+
+def test_wrong_size():
+    with pytest.raises(ValueError):
+        cache.ResultCache(0)
+
+
+def test_stream_dedupe(tmp_path):
+    source = tmp_path / 'packages.csv'
+    source.write_text('RUN,15000,1,75\nRUN,15000,1,75\nSWM,720,1,80,25,40\n',
+                      encoding='utf-8')
+    out = io.StringIO()
+    assert stream.run([str(source)], out, dedupe=True) == 2
+    assert out.getvalue().splitlines() == [
+        fresh(RUN).get_message(), fresh(SWM).get_message()]
+    out = io.StringIO()
+    assert stream.run([str(source)], out, cache_size=16) == 3
+    with pytest.raises(ValueError):
+        stream.run([str(source)], io.StringIO(), workers=2, dedupe=True)
@@ -0,0 +1,176 @@
+import json
+
+import pytest
+
+import checkpoint
+from aggregate import Aggregator
+from sketch import MetricSketches
+
+
+PACKAGES = [
+    'SWM,720,1,80,25,40',
+    'RUN,15000,1,75',
+    'WLK,9000,1,75,180',
+    '# комментарий',
+    'RUN,1206,12,6',
+    '',
+    'WLK,3000.33,2.512,75.8,180.1',
+    'RUN,15000,0,75',
+    'XXX,1,2',
+] * 6
+
+
+class Crash(Exception):
+    pass
+
+
+class CrashingAggregator(Aggregator):
+    """Агрегатор, который «падает» на заданном по счёту пакете."""
+
+    def __init__(self, crash_at=None):
+        super().__init__(None)
+        self.crash_at = crash_at
+        self.added = 0
+
+    def add(self, info, user=None, moment=None):
+        self.added += 1
+        if self.added == self.crash_at:
+            raise Crash()
+        super().add(info, user, moment)
+
+    @classmethod
+    def from_list(cls, rows):
+        aggregator = cls()
+        aggregator.merge(Aggregator.from_list(rows, None))
+        return aggregator
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'packages.csv'
+    # Последняя строка без перевода строки.
+    path.write_text('\n'.join(PACKAGES), encoding='utf-8')
+    return str(path)
+
+
+def totals(aggregator):
+    return sorted(json.dumps(row, sort_keys=True)
+                  for row in aggregator.to_list())
+
+
+def read(path):
+    with open(path, encoding='utf-8') as file:
+        return file.read()
+
+
+def reference(source, tmp_path):
+    output = str(tmp_path / 'reference.txt')
+    rejects = str(tmp_path / 'reference.jsonl')
+    states = {'totals': Aggregator(None)}
+    count = checkpoint.run_resumable(source, output, interval=1000,
+                                     states=states, rejects=rejects)
+    return count, read(output), totals(states['totals']), read(rejects)
+
+
+@pytest.mark.parametrize('interval, crash_at', [
+    (1, 2), (4, 7), (4, 8), (5, 30), (100, 10),
+])
+def test_resume_after_crash(source, tmp_path, interval, crash_at):
+    count, text, expected, report = reference(source, tmp_path)
+    output = str(tmp_path / 'results.txt')
+    rejects = str(tmp_path / 'rejects.jsonl')
+    with pytest.raises(Crash):
+        checkpoint.run_resumable(
+            source, output, interval=interval, rejects=rejects,
+            states={'totals': CrashingAggregator(crash_at)})
+    states = {'totals': CrashingAggregator()}
+    assert checkpoint.run_resumable(source, output, interval=interval,
+                                    states=states, rejects=rejects) == count
+    assert read(output) == text, (
+        'После продолжения вывод не должен терять или повторять строки.'
+    )
+    assert read(rejects) == report
+    assert totals(states['totals']) == expected
+    # Повторный запуск законченной обработки ничего не делает.
+    assert checkpoint.run_resumable(source, output, interval=interval,
+                                    states={'totals': Aggregator(None)},
+                                    rejects=rejects) == count
+    assert read(output) == text
+
+
+def test_crash_between_output_and_checkpoint(source, tmp_path, monkeypatch):
+    count, text, _, _ = reference(source, tmp_path)
+    output = str(tmp_path / 'results.txt')
+    save = checkpoint.save_checkpoint
+    calls = []
+
+    def crashing_save(path, data):
+        calls.append(data)
+        if len(calls) == 3:
+            raise Crash()
+        save(path, data)
+
+    monkeypatch.setattr(checkpoint, 'save_checkpoint', crashing_save)
+    with pytest.raises(Crash):
+        checkpoint.run_resumable(source, output, interval=3)
+    monkeypatch.setattr(checkpoint, 'save_checkpoint', save)
+    assert checkpoint.run_resumable(source, output, interval=3) == count
+    assert read(output) == text
+
+
+def test_checkpoint_contents(source, tmp_path):
+    output = str(tmp_path / 'results.txt')
+    states = {'speed': MetricSketches(seed=1)}
+    checkpoint.run_resumable(source, output, interval=10, states=states)
+    data = checkpoint.load_checkpoint(output + checkpoint.SUFFIX)
+    assert data['complete']
+    assert data['count'] == 30
+    assert data['rejected'] == {'ZERO_DIVISOR': 6, 'UNKNOWN_TYPE': 6}
+    assert data['format'] == 'csv'
+    assert data['offset'] == len('\n'.join(PACKAGES).encode('utf-8'))
+    restored = MetricSketches.from_list(data['states']['speed'])
+    assert restored.quantiles('Running', 'speed') == (
+        states['speed'].quantiles('Running', 'speed'))
+
+
+def test_checkpoint_of_another_run(source, tmp_path):
+    output = str(tmp_path / 'results.txt')
+    checkpoint.run_resumable(source, output)
+    with pytest.raises(ValueError):
+        checkpoint.run_resumable(source, output, template='en')
+    with pytest.raises(ValueError):
+        checkpoint.run_resumable(source, output,
+                                 states={'totals': Aggregator(None)})
+
+
+def test_bad_packages_are_reported(tmp_path):
+    source = tmp_path / 'packages.csv'
+    source.write_text('RUN,15000,1,75\nRUN,x,1,75\n\nWLK,1e200,1e-100,75,180'
+                      '\nRUN,15000,0,75\n', encoding='utf-8')
+    rejects = str(tmp_path / 'rejects.jsonl')
+    assert checkpoint.run_resumable(str(source), str(tmp_path / 'out.txt'),
+                                    rejects=rejects) == 1
+    rows = [json.loads(line) for line in read(rejects).splitlines()]
+    assert [(row['line'], row['reason']) for row in rows] == [
+        (2, 'NOT_NUMBER'), (4, 'OUT_OF_RANGE'), (5, 'ZERO_DIVISOR')]
+
+
+def test_bad_arguments(source, tmp_path):
+    output = str(tmp_path / 'results.txt')
+    with pytest.raises(ValueError):
+        checkpoint.ResumableRun(source, output, interval=0)
+    with pytest.raises(ValueError):
+        checkpoint.ResumableRun(source, output, fmt='binary')
+
+
+def test_main(source, tmp_path):
+    output = str(tmp_path / 'results.txt')
+    report = str(tmp_path / 'totals.json')
+    assert checkpoint.main([source, '-o', output, '--totals', report,
+                            '--interval', '7',
+                            '--rejects', str(tmp_path / 'bad.jsonl')]) == 0
+    with open(report, encoding='utf-8') as file:
+        rows = json.load(file)
+    assert sum(row['count'] for row in rows) == 30
+    assert checkpoint.main([str(tmp_path / 'missing.csv'),
+                            '-o', output + '2']) == 1
@@ -0,0 +1,96 @@
+import io
+import subprocess
+import sys
+
+import pytest
+
+import cli
+from conftest import BASE_DIR
+
+# Модули, которые не должны загружаться при быстром запуске.
+HEAVY_MODULES = ('argparse', 'dataclasses', 'inspect', 'json', 're',
+                 'typing')
+# Допустимое время импорта cli вместе с homework, микросекунды.
+# До отказа от dataclasses и typing один homework загружался ~40 мс.
+IMPORT_BUDGET_US = 20000
+
+RUNNING = ('Тип тренировки: Running; Длительность: 1.000 ч.; '
+           'Дистанция: 9.750 км; Ср. скорость: 9.750 км/ч; '
+           'Потрачено ккал: 797.805.')
+SWIMMING = ('Тип тренировки: Swimming; Длительность: 1.000 ч.; '
+            'Дистанция: 0.994 км; Ср. скорость: 1.000 км/ч; '
+            'Потрачено ккал: 336.000.')
+
+
+def run_python(*args, stdin=''):
+    return subprocess.run(
+        [sys.executable, *args], cwd=str(BASE_DIR), input=stdin,
+        capture_output=True, text=True, check=True)
+
+
+@pytest.mark.parametrize('line, expected', [
+    ('RUN,15000,1,75', ('RUN', [15000.0, 1.0, 75.0])),
+    ('RUN 15000 1 75', ('RUN', [15000.0, 1.0, 75.0])),
+    ('["RUN", [15000, 1, 75]]', ('RUN', [15000, 1, 75])),
+    ('{"workout_type": "RUN", "data": [15000, 1, 75]}',
+     ('RUN', [15000, 1, 75])),
+])
+def test_parse_package(line, expected):
+    assert cli.parse_package(line) == expected
+
+
+def test_main_argv(capsys):
+    assert cli.main(['RUN,15000,1,75', 'SWM,720,1,80,25,40']) == 0
+    assert capsys.readouterr().out.splitlines() == [RUNNING, SWIMMING]
+
+
+def test_main_stdin(monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'stdin', io.StringIO(
+        '# комментарий\nRUN 15000 1 75\n\n["SWM", [720, 1, 80, 25, 40]]\n'))
+    assert cli.main([]) == 0
+    assert capsys.readouterr().out.splitlines() == [RUNNING, SWIMMING]
+
+
+@pytest.mark.parametrize('argv, error', [
+    (['RUN,15000,1,75', 'XXX,1,2'], 'argv:2: bad package'),
+    (['RUN,15000,1'], 'argv:1: bad package'),
+    (['RUN,abc,1,75'], 'argv:1: bad package'),
+    (['RUN,15000,0,75'], 'argv:1: bad package: float division by zero'),
+    (['RUN,15000,1,75', 'WLK,9000,1,75,0'], 'argv:2: bad package'),
+    (['WLK,1e200,1e-100,75,180'], 'argv:1: bad package'),
+])
+def test_main_errors(argv, error, capsys):
+    assert cli.main(argv) == 1
+    captured = capsys.readouterr()
+    assert captured.out == '', 'При ошибке сообщения не выводятся'
+    assert error in captured.err
+
+
+def test_cli_does_not_import_heavy_modules():
+    code = ('import sys, cli; cli.main(["RUN,15000,1,75"]); '
+            'print(" ".join(sorted(sys.modules)), file=sys.stderr)')
+    result = run_python('-c', code)
+    assert result.stdout.strip() == RUNNING
+    loaded = set(result.stderr.split())
+    assert not loaded & set(HEAVY_MODULES), (
+        'Быстрый запуск загружает лишние модули: {}'.format(
+            sorted(loaded & set(HEAVY_MODULES))))
+
+
+def test_cli_import_time_budget():
+    best = None
+    for _ in range(3):
+        result = run_python('-X', 'importtime', '-c', 'import cli, homework')
+        cumulative = sum(
+            int(line.split('|')[1])
+            for line in result.stderr.splitlines()
+            if line.rstrip().endswith((' cli', ' homework')))
+        best = cumulative if best is None else min(best, cumulative)
+    assert best < IMPORT_BUDGET_US, (
+        'Импорт cli и homework занял {} мкс, бюджет {} мкс'.format(
+            best, IMPORT_BUDGET_US))
+
+
+def test_cli_script_stdin():
+    result = run_python('cli.py', stdin='RUN,15000,1,75\n')
+    assert result.stdout.splitlines() == [RUNNING]
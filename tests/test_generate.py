@@ -0,0 +1,89 @@
+import io
+from collections import Counter
+
+import pytest
+
+import generate
+import homework
+import stream
+import validate
+
+
+def test_same_seed_same_packages():
+    first = list(generate.generate(5000, seed=3, malformed=0.1))
+    assert first == list(generate.generate(5000, seed=3, malformed=0.1))
+    assert first != list(generate.generate(5000, seed=4, malformed=0.1))
+
+
+def test_valid_packages_compute():
+    packages = list(generate.generate(3000, seed=1))
+    assert validate.validate(packages)[1] == [], (
+        'Без malformed все пакеты правильные')
+    for workout_type, data in packages:
+        info = homework.read_package(workout_type, data).show_training_info()
+        assert 0 < info.speed < 30, 'Скорость в правдоподобных пределах'
+
+
+def test_mix():
+    counts = Counter(code for code, _ in generate.generate(
+        20000, mix={'RUN': 1, 'SWM': 3}))
+    assert set(counts) == {'RUN', 'SWM'}
+    assert counts['SWM'] / 20000 == pytest.approx(0.75, abs=0.02)
+
+
+def test_malformed_fraction():
+    packages = list(generate.generate(20000, seed=2, malformed=0.05))
+    rejects = validate.validate(packages)[1]
+    assert len(rejects) / len(packages) == pytest.approx(0.05, abs=0.005)
+    assert set(validate.summary(rejects)) == {
+        validate.UNKNOWN_TYPE, validate.BAD_ARITY, validate.ZERO_DIVISOR,
+        validate.NEGATIVE, validate.NOT_NUMBER}
+
+
+@pytest.mark.parametrize('fmt, name', [
+    ('csv', 'packages.csv'),
+    ('jsonl', 'packages.jsonl'),
+    ('text', 'packages.txt'),
+    ('binary', 'packages.hwpk'),
+])
+def test_write_matches_iterator(tmp_path, fmt, name):
+    path = tmp_path / name
+    mode = 'wb' if fmt == 'binary' else 'w'
+    with open(str(path), mode) as out:
+        assert generate.Generator(seed=5).write(out, 9000, fmt) == 9000
+    expected = [(code, [float(value) for value in data])
+                for code, data in generate.generate(9000, seed=5)]
+    assert list(stream.iter_packages([str(path)])) == expected
+
+
+def test_write_malformed_matches_iterator():
+    out = io.StringIO()
+    generate.Generator(seed=6, malformed=0.2).write(out, 5000, 'jsonl')
+    expected = [generate.format_line(package, 'jsonl')
+                for package in generate.generate(5000, 6, malformed=0.2)]
+    assert out.getvalue().splitlines() == expected
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'mix': {'XXX': 1}},
+    {'mix': {'RUN': 0}},
+    {'malformed': 1.5},
+])
+def test_bad_arguments(kwargs):
+    with pytest.raises(ValueError):
+        generate.Generator(**kwargs)
+
+
+def test_binary_rejects_malformed():
+    with pytest.raises(ValueError):
+        generate.Generator(malformed=0.1).write(io.BytesIO(), 10, 'binary')
+
+
+def test_main(tmp_path, capsys):
+    assert generate.main(['-n', '3', '--mix', 'WLK=1']) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 3
+    assert all(line.startswith('WLK,') for line in lines)
+    path = tmp_path / 'packages.jsonl'
+    assert generate.main(['-n', '10', '-o', str(path)]) == 0
+    assert len(list(stream.iter_packages([str(path)]))) == 10
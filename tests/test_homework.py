@@ -451,3 +451,96 @@ def test_main_output(input_data, expected):
     assert get_message_output == expected, (
         'Метод `main` должен печатать результат в консоль.\n'
     )
+
+
+@pytest.mark.parametrize('input_data', [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [1206, 12, 6]),
+    ('WLK', [3000.33, 2.512, 75.8, 180.1]),
+])
+def test_compute_metrics(input_data):
+    training = homework.read_package(*input_data)
+    assert training.compute_metrics() == (
+        training.get_distance(),
+        training.get_mean_speed(),
+        training.get_spent_calories(),
+    ), (
+        'Метод `compute_metrics` должен возвращать те же значения, '
+        'что и методы get_*.'
+    )
+
+
+def test_compute_metrics_single_pass(monkeypatch):
+    calls = []
+    get_distance = homework.Training.get_distance
+
+    def counted_get_distance(self):
+        calls.append(self)
+        return get_distance(self)
+
+    monkeypatch.setattr(homework.Training, 'get_distance',
+                        counted_get_distance)
+    homework.Running(9000, 1, 75).show_training_info()
+    assert len(calls) == 1, 'Дистанция должна считаться один раз.'
+
+
+def test_compute_metrics_respects_overrides():
+    class SlowRunning(homework.Running):
+        def get_mean_speed(self):
+            return super().get_mean_speed() / 2
+
+    training = SlowRunning(9000, 1, 75)
+    distance, speed, calories = training.compute_metrics()
+    assert speed == homework.Running(9000, 1, 75).get_mean_speed() / 2
+    assert calories == training.get_spent_calories()
+
+
+@pytest.mark.parametrize('input_data', [
+    ('RUN', [15000, 1]),
+    ('WLK', [9000, 1, 75, 180, 1]),
+    ('SWM', []),
+])
+def test_read_package_wrong_arity(input_data):
+    with pytest.raises(ValueError):
+        homework.read_package(*input_data)
+
+
+@pytest.fixture
+def cycling():
+    @homework.register_workout('CYC')
+    class Cycling(homework.Training):
+        LEN_STEP = 5.0
+
+        def __init__(self, action, duration, weight, cadence):
+            super().__init__(action, duration, weight)
+            self.cadence = cadence
+
+        def calories_from_speed(self, speed):
+            return speed * self.weight * self.duration
+
+    yield Cycling
+    del homework.WORKOUT_TYPES['CYC']
+
+
+def test_register_workout(cycling):
+    workout = homework.WORKOUT_TYPES['CYC']
+    assert workout.fields == ('action', 'duration', 'weight', 'cadence')
+    assert workout.arity == 4
+    training = homework.read_package('CYC', [2000, 0.5, 70, 80])
+    assert isinstance(training, cycling)
+    assert training.show_training_info().calories == 700.0
+
+
+def test_read_packages(cycling):
+    packages = [
+        ('RUN', [15000, 1, 75]),
+        ('CYC', [2000, 0.5, 70, 80]),
+        ('SWM', [720, 1, 80, 25, 40]),
+        ('RUN', [1206, 12, 6]),
+    ]
+    trainings = homework.read_packages(packages)
+    assert [type(training).__name__ for training in trainings] == [
+        'Running', 'Cycling', 'Swimming', 'Running']
+    assert trainings[3].action == 1206
+    with pytest.raises(ValueError):
+        homework.read_packages(packages + [('BIK', [1, 2, 3])])
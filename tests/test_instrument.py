@@ -0,0 +1,105 @@
+import io
+import json
+
+import pytest
+
+import homework
+import instrument
+import stream
+from conftest import Capturing
+
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('RUN', [1206, 12, 6]),
+]
+
+
+def test_instrumentation_counts():
+    with instrument.Instrumentation() as stats:
+        with Capturing() as output:
+            for package in PACKAGES:
+                homework.main(homework.read_package(*package))
+    assert len(output) == 3
+    snapshot = stats.snapshot()
+    for stage in ('read_package', 'calculate', 'info_message', 'render',
+                  'output'):
+        assert snapshot[stage]['Running']['count'] == 2, stage
+        assert snapshot[stage]['Swimming']['count'] == 1, stage
+    running = snapshot['calculate']['Running']
+    assert sum(running['histogram'].values()) == 2
+    assert running['total_s'] > 0
+    json.loads(stats.to_json())
+    assert 'read_package' in stats.format_text()
+
+
+def test_instrumentation_patches_importers():
+    with instrument.Instrumentation() as stats:
+        stream.run([], io.StringIO())
+        list(stream.process(PACKAGES))
+    assert stats.snapshot()['read_package']['Running']['count'] == 2
+
+
+def test_instrumentation_restores_pipelines():
+    import render
+    import sinks
+    import threaded
+
+    originals = (render.get_renderer, sinks.get_renderer,
+                 render.write_messages, stream.write_messages,
+                 sinks.Sink.__init__, threaded.Pipeline.run)
+    with instrument.Instrumentation():
+        assert render.get_renderer is not originals[0]
+        assert stream.write_messages is not originals[3]
+    assert (render.get_renderer, sinks.get_renderer,
+            render.write_messages, stream.write_messages,
+            sinks.Sink.__init__, threaded.Pipeline.run) == originals
+
+
+def test_instrumentation_restores_originals():
+    originals = (homework.read_package, stream.read_package,
+                 homework.Training.compute_metrics,
+                 homework.InfoMessage.__init__,
+                 homework.InfoMessage.get_message)
+    stats = instrument.Instrumentation().enable()
+    assert stats.enabled
+    assert homework.read_package is not originals[0]
+    stats.disable()
+    assert (homework.read_package, stream.read_package,
+            homework.Training.compute_metrics,
+            homework.InfoMessage.__init__,
+            homework.InfoMessage.get_message) == originals
+    assert 'print' not in vars(homework)
+    homework.read_package('RUN', [1, 1, 1]).show_training_info()
+    assert stats.snapshot() == {}
+
+
+STAGES = ('read_package', 'calculate', 'info_message', 'render', 'output')
+
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'output_format': 'csv'},
+    {'output_format': 'jsonl'},
+    {'queue_depth': 2},
+    {'dedupe': True},
+])
+def test_instrumentation_covers_stream_run(tmp_path, options):
+    source = tmp_path / 'packages.csv'
+    source.write_text('RUN,15000,1,75\nSWM,720,1,80,25,40\n',
+                      encoding='utf-8')
+    with instrument.Instrumentation() as stats:
+        stream.run([str(source)], io.StringIO(), template='en', **options)
+    snapshot = stats.snapshot()
+    expected = STAGES
+    if options.get('output_format') in ('csv', 'jsonl'):
+        # Приёмники CSV и JSONL форматируют без шаблонов `render`.
+        expected = tuple(stage for stage in STAGES if stage != 'render')
+    assert set(snapshot) == set(expected), (
+        'Все этапы обработки должны быть видны в stream.run.'
+    )
+    assert snapshot['calculate']['Running']['count'] == 1
+    assert snapshot['output'][instrument.BLOCK]['count'] >= 1
+    if 'render' in snapshot:
+        assert snapshot['render']['Swimming']['count'] == 1
@@ -0,0 +1,93 @@
+import json
+import pickle
+import random
+
+import pytest
+
+import homework
+import leaderboard
+
+RNG = random.Random(20)
+PACKAGES = [
+    (workout_type, [value * RNG.uniform(0.5, 1.5) for value in data])
+    for workout_type, data in [('RUN', [15000, 1, 75]),
+                               ('WLK', [9000, 1, 75, 180]),
+                               ('SWM', [720, 1, 80, 25, 40])] * 200
+]
+RESULTS = [(homework.read_package(*package).show_training_info(), index)
+           for index, package in enumerate(PACKAGES)]
+
+
+def expected(training_type, metric, k):
+    values = sorted((getattr(info, metric) for info, _ in RESULTS
+                     if info.training_type == training_type), reverse=True)
+    return values[:k]
+
+
+def values(leaders):
+    return [leader.value for leader in leaders]
+
+
+@pytest.mark.parametrize('training_type', ['Running', 'SportsWalking',
+                                           'Swimming'])
+@pytest.mark.parametrize('metric', leaderboard.METRICS)
+def test_top_matches_full_sort(training_type, metric):
+    board = leaderboard.Leaderboard(k=5)
+    for info, user in RESULTS:
+        board.add(info, user)
+    assert values(board.top(training_type, metric)) == expected(
+        training_type, metric, 5)
+
+
+def test_top_by_code_and_limit():
+    board = leaderboard.Leaderboard(k=5)
+    for info, user in RESULTS:
+        board.add(info, user)
+    top = board.top('RUN', 'distance', limit=2)
+    assert values(top) == expected('Running', 'distance', 2)
+    assert top[0].info.distance == top[0].value
+    assert board.top('Cycling', 'speed') == []
+    with pytest.raises(ValueError):
+        board.top('Cycling', 'weight')
+
+
+def test_ties_keep_earlier():
+    top = leaderboard.TopK(2)
+    info = RESULTS[0][0]
+    for user in ('first', 'second', 'third'):
+        top.push(leaderboard.Leader(1.0, user, None, info))
+    assert [leader.user for leader in top.leaders()] == ['first', 'second']
+
+
+def test_merge_shards():
+    whole = leaderboard.Leaderboard(k=3)
+    shards = [leaderboard.Leaderboard(k=3) for _ in range(4)]
+    for info, user in RESULTS:
+        whole.add(info, user)
+        shards[user % 4].add(info, user)
+    merged = leaderboard.Leaderboard(k=3)
+    for shard in shards:
+        merged.merge(pickle.loads(pickle.dumps(shard)))
+    for key in whole.boards:
+        assert values(merged.top(*key)) == values(whole.top(*key)), (
+            'Объединение частей совпадает с таблицей по всем данным')
+
+
+def test_to_list_round_trip():
+    board = leaderboard.Leaderboard(k=2)
+    for info, user in RESULTS[:30]:
+        board.add(info, user, moment='2022-10-01')
+    rows = json.loads(json.dumps(board.to_list()))
+    restored = leaderboard.Leaderboard.from_list(rows, k=2)
+    for key in board.boards:
+        assert [(leader.value, leader.user, leader.info)
+                for leader in restored.top(*key)] == [
+            (leader.value, leader.user, leader.info)
+            for leader in board.top(*key)]
+
+
+def test_bad_arguments():
+    with pytest.raises(ValueError):
+        leaderboard.TopK(0)
+    with pytest.raises(ValueError):
+        leaderboard.Leaderboard(3, ('weight',))
@@ -0,0 +1,51 @@
+import random
+import pytest
+
+import homework
+import live
+
+
+@pytest.mark.parametrize('workout_type, params, deltas', [
+    ('RUN', {'weight': 75}, ('action', 'duration')),
+    ('WLK', {'weight': 75, 'height': 180}, ('action', 'duration')),
+    ('SWM', {'weight': 80, 'length_pool': 25},
+     ('action', 'duration', 'count_pool')),
+])
+def test_snapshot_matches_fresh_calculation(workout_type, params, deltas):
+    rng = random.Random(workout_type)
+    session = live.LiveSession(workout_type, **params)
+    for _ in range(50):
+        session.update(**{name: rng.uniform(0, 100) for name in deltas})
+        totals = dict(params, **session.totals())
+        fields = homework.WORKOUT_TYPES[workout_type].fields
+        expected = homework.read_package(
+            workout_type, [totals[name] for name in fields]
+        ).show_training_info()
+        assert session.snapshot() == expected, (
+            'Текущие показатели должны совпадать с расчётом по итогам')
+
+
+def test_snapshot_before_start():
+    session = live.LiveSession('RUN', weight=75)
+    assert session.snapshot() == homework.InfoMessage(
+        'Running', 0, 0.0, 0.0, 0.0)
+    session.update(action=1000)
+    assert session.snapshot().distance == pytest.approx(0.65)
+
+
+def test_snapshot_is_copy():
+    session = live.LiveSession('RUN', weight=75)
+    session.update(action=15000, duration=1)
+    session.snapshot().calories = 0
+    assert session.snapshot().calories == pytest.approx(797.805)
+
+
+@pytest.mark.parametrize('workout_type, params, deltas, error', [
+    ('XXX', {}, {}, ValueError),
+    ('RUN', {'weight': 75, 'action': 5}, {}, TypeError),
+    ('RUN', {'weight': 75}, {'count_pool': 1}, TypeError),
+    ('RUN', {'weight': 75}, {'duration': -1}, ValueError),
+])
+def test_errors(workout_type, params, deltas, error):
+    with pytest.raises(error):
+        live.LiveSession(workout_type, **params).update(**deltas)
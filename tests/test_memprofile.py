@@ -0,0 +1,92 @@
+import json
+import tracemalloc
+
+import pytest
+
+import memprofile
+
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+    ('RUN', [1206, 12, 6]),
+] * 50
+
+# Бюджеты памяти на одну запись в байтах с запасом на различия версий
+# Python. Превышение означает лишние объекты на пути пакета.
+BUDGETS = {
+    'read_package': 320,
+    'show_training_info': 192,
+    'get_message': 512,
+    'record': 1024,
+}
+# Пик за весь прогон не должен расти с числом пакетов.
+RUN_PEAK_BUDGET = 8192
+
+
+@pytest.fixture(scope='module')
+def profile():
+    # Первый прогон заполняет кэши интерпретатора, они не относятся
+    # к цене записи.
+    memprofile.profile_packages(PACKAGES)
+    return memprofile.profile_packages(PACKAGES)
+
+
+@pytest.mark.parametrize('stage', memprofile.STAGES)
+@pytest.mark.parametrize('label', ['Running', 'SportsWalking', 'Swimming'])
+def test_allocation_budget(profile, stage, label):
+    data = profile.snapshot()[stage][label]
+    assert data['count'] > 0
+    assert 0 < data['max_bytes'] <= BUDGETS[stage], (
+        '{} для {} выделяет {} байт на запись, бюджет {}'.format(
+            stage, label, data['max_bytes'], BUDGETS[stage]))
+    assert data['peak_bytes'] >= data['max_bytes']
+
+
+def test_record_is_sum_of_stages(profile):
+    snapshot = profile.snapshot()
+    for label, record in snapshot['record'].items():
+        stages = sum(snapshot[stage][label]['mean_bytes']
+                     for stage in memprofile.STAGES[:-1])
+        assert record['mean_bytes'] == pytest.approx(stages)
+
+
+def test_run_peak_does_not_grow():
+    profile = memprofile.profile_packages(PACKAGES * 20)
+    assert 0 < profile.peak <= RUN_PEAK_BUDGET, (
+        'Обработка не должна накапливать память между пакетами.'
+    )
+
+
+def test_keeps_tracing_state():
+    memprofile.profile_packages(PACKAGES[:4])
+    assert not tracemalloc.is_tracing()
+    tracemalloc.start()
+    try:
+        memprofile.profile_packages(PACKAGES[:4])
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_bad_packages_are_skipped():
+    profile = memprofile.profile_packages(
+        [('XXX', [1, 2]), ('RUN', [15000, 0, 75]), ('RUN', [15000, 1, 75])])
+    assert profile.rejected == {'UNKNOWN_TYPE': 1, 'ZERO_DIVISOR': 1}
+    assert profile.snapshot()['record']['Running']['count'] == 1
+    assert not tracemalloc.is_tracing()
+
+
+def test_main(tmp_path, capsys):
+    source = tmp_path / 'packages.csv'
+    source.write_text('RUN,15000,1,75\nSWM,720,1,80,25,40\n'
+                      'RUN,15000,0,75\nRUN,15000,1,n/a\n', encoding='utf-8')
+    assert memprofile.main(['--json', str(source)]) == 0
+    data = json.loads(capsys.readouterr().out)
+    assert set(data['stages']) == set(memprofile.STAGES)
+    assert data['stages']['record']['Running']['count'] == 1
+    assert data['rejected'] == {'ZERO_DIVISOR': 1, 'NOT_NUMBER': 1}
+    assert memprofile.main([str(source)]) == 0
+    assert 'get_message' in capsys.readouterr().out
+    assert memprofile.main([str(tmp_path / 'missing.csv')]) == 1
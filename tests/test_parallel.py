@@ -0,0 +1,56 @@
+import io
+import pytest
+
+import homework
+import parallel
+import stream
+
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+    ('RUN', [1206, 12, 6]),
+    ('WLK', [3000.33, 2.512, 75.8, 180.1]),
+] * 7
+
+
+def expected_messages():
+    return [homework.read_package(*package).show_training_info()
+            for package in PACKAGES]
+
+
+def test_chunked():
+    chunks = list(parallel.chunked(range(7), 3))
+    assert chunks == [[0, 1, 2], [3, 4, 5], [6]]
+    with pytest.raises(ValueError):
+        list(parallel.chunked(range(7), 0))
+
+
+def test_process_parallel_keeps_order():
+    batches = list(parallel.process_parallel(PACKAGES, workers=2,
+                                             chunk_size=4))
+    assert len(batches) == 9
+    result = [info for infos in batches for info in infos]
+    assert result == expected_messages(), (
+        'Параллельная обработка должна сохранять порядок пакетов.'
+    )
+
+
+def test_write_parallel():
+    out = io.StringIO()
+    count = parallel.write_parallel(PACKAGES, out, workers=3, chunk_size=2)
+    assert count == len(PACKAGES)
+    assert out.getvalue().splitlines() == [
+        info.get_message() for info in expected_messages()]
+
+
+def test_stream_workers(tmp_path):
+    source = tmp_path / 'packages.csv'
+    source.write_text(''.join(
+        '{},{}\n'.format(code, ','.join(map(str, data)))
+        for code, data in PACKAGES), encoding='utf-8')
+    out = io.StringIO()
+    assert stream.run([str(source)], out, workers=2, chunk_size=5) == 35
+    assert out.getvalue().splitlines() == [
+        info.get_message() for info in expected_messages()]
@@ -0,0 +1,79 @@
+import io
+import pytest
+
+import homework
+import render
+
+
+MESSAGES = [
+    homework.InfoMessage('Swimming', 1, 0.9936, 1.0, 336.0),
+    homework.InfoMessage('Running', 12.0, 0.7839, 0.0653, 12.8118),
+    homework.InfoMessage('SportsWalking', 2.512, 1.9502, 0.7763, 408.4291),
+    homework.InfoMessage('Running', -0.0005, 1e20, float('nan'), 1 / 3),
+]
+
+
+@pytest.mark.parametrize('info', MESSAGES)
+def test_get_message_matches_format(info):
+    expected = info.MESSAGE.format(
+        training_type=info.training_type, duration=info.duration,
+        distance=info.distance, speed=info.speed, calories=info.calories)
+    assert info.get_message() == expected, (
+        'Скомпилированный шаблон должен давать тот же текст, '
+        'что и `MESSAGE.format`.'
+    )
+    assert render.get_renderer('ru')(info) == expected
+
+
+def test_write_messages_in_chunks():
+    out = io.StringIO()
+    assert render.write_messages(MESSAGES * 3, out, chunk_size=5) == 12
+    assert out.getvalue() == ''.join(
+        info.get_message() + '\n' for info in MESSAGES * 3)
+
+
+def test_templates():
+    info = MESSAGES[0]
+    assert render.render_messages([info], 'tsv') == [
+        'Swimming\t1.000\t0.994\t1.000\t336.000'
+    ]
+    render.register_template('short', '{training_type}: {calories:.1f}')
+    assert render.render_messages([info], 'short') == ['Swimming: 336.0']
+    with pytest.raises(ValueError):
+        render.get_renderer('missing')
+
+
+def test_message_subclass_template():
+    class ShortMessage(homework.InfoMessage):
+        MESSAGE = '{training_type} {speed!r}'
+
+    assert ShortMessage('Running', 1, 2, 3.5, 4).get_message() == (
+        'Running 3.5'
+    )
+    assert render.compile_template(ShortMessage.MESSAGE)(
+        ShortMessage('Running', 1, 2, 3.5, 4)) == 'Running 3.5'
+
+
+@pytest.mark.parametrize('template', [
+    '{unknown}',
+    '{duration.real}',
+    '{duration:{speed}}',
+    '{duration!x}',
+    '{duration',
+    '{}',
+])
+def test_compile_template_invalid(template):
+    with pytest.raises(ValueError):
+        render.compile_template(template)
+
+
+def test_write_messages_flushes_on_error():
+    def messages():
+        yield from MESSAGES[:2]
+        raise ZeroDivisionError('float division by zero')
+
+    out = io.StringIO()
+    with pytest.raises(ZeroDivisionError):
+        render.write_messages(messages(), out)
+    assert out.getvalue() == ''.join(
+        info.get_message() + '\n' for info in MESSAGES[:2])
@@ -0,0 +1,107 @@
+import asyncio
+
+import homework
+import server
+
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+]
+LINES = [
+    '["SWM", [720, 1, 80, 25, 40]]',
+    'RUN,15000,1,75',
+    'WLK 9000 1 75 180',
+]
+
+
+def expected(repeat):
+    return [homework.read_package(*package).show_training_info()
+            .get_message() for package in PACKAGES] * repeat
+
+
+async def send(port, lines):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    if not isinstance(lines, bytes):
+        lines = ''.join(line + '\n' for line in lines).encode('utf-8')
+    writer.write(lines)
+    await writer.drain()
+    writer.write_eof()
+    responses = [raw.decode('utf-8').rstrip('\n') async for raw in reader]
+    writer.close()
+    return responses
+
+
+def run_clients(clients, lines, **options):
+    async def scenario():
+        training_server = server.TrainingServer(**options)
+        await training_server.start()
+        try:
+            responses = await asyncio.gather(*(
+                send(training_server.port, lines)
+                for _ in range(clients)))
+        finally:
+            await training_server.close()
+        return training_server, responses
+
+    return asyncio.run(scenario())
+
+
+def test_server_responses_in_order():
+    training_server, responses = run_clients(4, LINES * 50)
+    for response in responses:
+        assert response == expected(50), (
+            'Сервер должен отвечать в порядке получения пакетов.'
+        )
+    report = training_server.report()
+    assert [stats['count'] for stats in report] == [150] * 4
+    assert all(stats['p99'] >= stats['p50'] >= 0 for stats in report)
+    assert training_server.batches < 600, (
+        'Пакеты должны обрабатываться блоками.'
+    )
+
+
+def test_server_backpressure():
+    training_server, responses = run_clients(
+        3, LINES * 200, queue_size=2, batch_size=4)
+    assert responses == [expected(200)] * 3
+
+
+def test_server_errors():
+    training_server, [responses] = run_clients(
+        1, ['RUN,1,2', 'BIK 1 2 3', '{bad', 'RUN 15000 1 75'])
+    assert [line.startswith('error:') for line in responses] == [
+        True, True, True, False]
+    assert responses[3] == expected(1)[1]
+    assert training_server.report()[0]['errors'] == 3
+
+
+def test_server_survives_calculation_error():
+    # Скорость в квадрате переполняет float: OverflowError.
+    training_server, [responses] = run_clients(
+        1, ['WLK 1e200 1e-100 75 180', 'RUN 15000 1 75'])
+    assert responses[0].startswith('error:')
+    assert responses[1] == expected(1)[1], (
+        'После ошибки расчёта сервер должен отвечать на следующие пакеты.'
+    )
+    assert training_server.report()[0]['errors'] == 1
+
+
+def test_server_survives_bad_encoding():
+    training_server, [responses] = run_clients(
+        1, b'RUN,15000,1,75\n\xff\xfe\nRUN,15000,1,75\n')
+    assert responses[0] == responses[2] == expected(1)[1]
+    assert responses[1].startswith('error: bad package:'), (
+        'Строка не в UTF-8 - ошибка одного пакета, а не соединения.'
+    )
+    assert training_server.report()[0]['errors'] == 1
+
+
+def test_server_keeps_bounded_history(monkeypatch):
+    monkeypatch.setattr(server, 'FINISHED_CONNECTIONS', 3)
+    training_server, _ = run_clients(5, LINES)
+    assert not training_server.connections
+    report = training_server.report()
+    assert len(report) == 3
+    assert all(stats['count'] == 3 for stats in report)
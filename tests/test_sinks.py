@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+import pytest
+
+import batch
+import homework
+import sinks
+import stream
+
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [3000.33, 2.512, 75.8, 180.1]),
+] * 5
+MESSAGES = [homework.read_package(*package).show_training_info()
+            for package in PACKAGES]
+
+
+def test_text_sink():
+    out = io.StringIO()
+    with sinks.TextSink(out, buffer_size=4) as sink:
+        sink.write(MESSAGES[0])
+        sink.write_batch(MESSAGES[1:])
+    assert sink.count == len(MESSAGES)
+    assert out.getvalue().splitlines() == [
+        info.get_message() for info in MESSAGES]
+
+
+def test_csv_sink():
+    out = io.StringIO()
+    with sinks.CsvSink(out, buffer_size=7) as sink:
+        sink.write_batch(MESSAGES)
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert [homework.InfoMessage(
+        row['training_type'], float(row['duration']),
+        float(row['distance']), float(row['speed']),
+        float(row['calories'])) for row in rows] == MESSAGES
+
+
+def test_jsonl_sink():
+    out = io.StringIO()
+    with sinks.JsonlSink(out) as sink:
+        sink.write_batch(MESSAGES)
+    assert [homework.InfoMessage(**json.loads(line))
+            for line in out.getvalue().splitlines()] == MESSAGES
+
+
+@pytest.mark.parametrize('buffer_size', [1, 4, 100])
+def test_columnar_round_trip(buffer_size):
+    infos = batch.InfoBatch()
+    infos.extend(MESSAGES[:4])
+    out = io.BytesIO()
+    with sinks.ColumnarSink(out, buffer_size) as sink:
+        sink.write_batch(MESSAGES)
+        sink.write_batch(infos)
+        sink.write_batch(batch.InfoBatch())
+    assert sink.count == len(MESSAGES) + 4
+    out.seek(0)
+    restored = [info for block in sinks.read_columnar(out)
+                for info in block]
+    assert restored == MESSAGES + MESSAGES[:4]
+
+
+def test_columnar_invalid():
+    with pytest.raises(ValueError):
+        list(sinks.read_columnar(io.BytesIO(b'HWPK\x01\x00\x00\x00')))
+    out = io.BytesIO()
+    with sinks.ColumnarSink(out) as sink:
+        sink.write_batch(MESSAGES)
+    with pytest.raises(ValueError):
+        list(sinks.read_columnar(io.BytesIO(out.getvalue()[:-1])))
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_stream_output_formats(tmp_path, workers):
+    source = tmp_path / 'packages.jsonl'
+    source.write_text(''.join(json.dumps(package) + '\n'
+                              for package in PACKAGES), encoding='utf-8')
+    out = io.StringIO()
+    assert stream.run([str(source)], out, workers=workers,
+                      output_format='jsonl') == len(MESSAGES)
+    assert len(out.getvalue().splitlines()) == len(MESSAGES)
+    binary = io.BytesIO()
+    stream.run([str(source)], binary, workers=workers,
+               output_format='columnar')
+    binary.seek(0)
+    assert [info for block in sinks.read_columnar(binary)
+            for info in block] == MESSAGES
+
+
+def test_main_with_sink():
+    out = io.StringIO()
+    with sinks.TextSink(out) as sink:
+        for package in PACKAGES:
+            homework.main(homework.read_package(*package), sink)
+        assert out.getvalue() == ''
+    assert out.getvalue().splitlines() == [
+        info.get_message() for info in MESSAGES]
@@ -0,0 +1,93 @@
+import json
+import pickle
+import random
+from bisect import bisect_left
+
+import pytest
+
+import batch
+import homework
+import sketch
+
+FRACTIONS = (0.01, 0.1, 0.5, 0.9, 0.99)
+# Допустимая ошибка ранга для k = 200 (см. документацию модуля).
+RANK_ERROR = 0.0165
+
+
+def rank_errors(estimates, values):
+    ordered = sorted(values)
+    return [abs(bisect_left(ordered, estimate) / len(ordered) - fraction)
+            for fraction, estimate in zip(FRACTIONS, estimates)]
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_rank_error_within_bound(seed):
+    rng = random.Random(seed)
+    values = [rng.lognormvariate(2, 0.5) for _ in range(100000)]
+    estimator = sketch.KLLSketch(seed=seed)
+    for value in values:
+        estimator.update(value)
+    assert len(estimator) == len(values)
+    assert max(rank_errors(estimator.quantiles(FRACTIONS), values)) < (
+        RANK_ERROR)
+    assert sum(map(len, estimator.levels)) < 3 * sketch.K + 100, (
+        'Память скетча не зависит от числа значений')
+    assert estimator.quantiles([0, 1]) == [min(values), max(values)]
+
+
+def test_merge_and_serialization():
+    rng = random.Random(7)
+    values = [rng.gauss(10, 3) for _ in range(50000)]
+    shards = [sketch.KLLSketch(seed=index) for index in range(5)]
+    for index, shard in enumerate(shards):
+        shard.update_many(values[index::5])
+    merged = sketch.KLLSketch(seed=0)
+    for shard in shards:
+        restored = sketch.KLLSketch.from_dict(
+            json.loads(json.dumps(shard.to_dict())))
+        merged.merge(pickle.loads(pickle.dumps(restored)))
+    assert len(merged) == len(values)
+    assert max(rank_errors(merged.quantiles(FRACTIONS), values)) < (
+        RANK_ERROR)
+    assert merged.rank(merged.max) == 1.0
+
+
+def test_small_sketch_is_exact():
+    estimator = sketch.KLLSketch()
+    estimator.update_many(range(1, 101))
+    assert estimator.quantiles([0.5, 0.9, 0.99]) == [50, 90, 99]
+    assert estimator.rank(10) == 0.1
+
+
+@pytest.mark.parametrize('call', [
+    lambda: sketch.KLLSketch(4),
+    lambda: sketch.KLLSketch().quantile(0.5),
+    lambda: sketch.KLLSketch.from_dict(
+        {'k': 200, 'n': 1, 'min': 1, 'max': 1, 'levels': [[1]]}
+    ).quantile(1.5),
+])
+def test_errors(call):
+    with pytest.raises(ValueError):
+        call()
+
+
+def test_metric_sketches():
+    sketches = sketch.MetricSketches(seed=1)
+    rng = random.Random(3)
+    weights = [rng.uniform(50, 100) for _ in range(3000)]
+    columns = {'action': [15000] * 3000, 'duration': [1] * 3000,
+               'weight': weights}
+    sketches.add_batch(batch.process_batch('RUN', columns))
+    sketches.add(homework.read_package('SWM', [720, 1, 80, 25, 40])
+                 .show_training_info())
+    calories = batch.process_batch('RUN', columns).calories
+    assert max(rank_errors(
+        sketches.quantiles('Running', 'calories', FRACTIONS),
+        calories)) < RANK_ERROR
+    assert sketches.quantiles('Swimming', 'speed') == [1.0] * 3
+    restored = sketch.MetricSketches.from_list(
+        json.loads(json.dumps(sketches.to_list())))
+    assert restored.quantiles('Running', 'speed') == sketches.quantiles(
+        'Running', 'speed')
+    with pytest.raises(ValueError):
+        sketches.quantiles('Cycling', 'speed')
@@ -0,0 +1,126 @@
+import os
+
+import pytest
+
+import homework
+import store
+
+RUN = homework.read_package('RUN', [15000, 1, 75]).show_training_info()
+SWM = homework.read_package('SWM', [720, 1, 80, 25, 40]).show_training_info()
+WLK = homework.read_package('WLK', [9000, 1, 75, 180]).show_training_info()
+DAY = 86400
+
+
+def fill(path):
+    results = store.ResultStore(str(path))
+    for day in range(60):
+        for user in ('anna', 'boris'):
+            info = (RUN, SWM, WLK)[(day + len(user)) % 3]
+            results.append(info, user, 1_600_000_000 + day * DAY)
+    results.flush()
+    return results
+
+
+def expected_rows(user=None, training_type=None, start=None, end=None):
+    rows = []
+    row = 0
+    for day in range(60):
+        for name in ('anna', 'boris'):
+            info = (RUN, SWM, WLK)[(day + len(name)) % 3]
+            moment = 1_600_000_000 + day * DAY
+            if ((user is None or name == user)
+                    and (training_type is None
+                         or info.training_type == training_type)
+                    and (start is None or moment >= start)
+                    and (end is None or moment < end)):
+                rows.append(row)
+            row += 1
+    return rows
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'user': 'anna'},
+    {'training_type': 'Swimming'},
+    {'user': 'boris', 'training_type': 'Swimming'},
+    {'user': 'anna', 'start': 1_600_000_000 + 10 * DAY,
+     'end': 1_600_000_000 + 40 * DAY},
+    {'start': 1_600_000_000 + 59 * DAY},
+    {'user': 'nobody'},
+    {'training_type': 'Cycling'},
+])
+def test_rows(tmp_path, filters):
+    with fill(tmp_path) as results:
+        assert list(results.rows(**filters)) == expected_rows(**filters)
+
+
+def test_select_and_reopen(tmp_path):
+    fill(tmp_path).close()
+    with store.ResultStore(str(tmp_path)) as results:
+        assert len(results) == 120
+        swims = results.select('anna', 'Swimming')
+        assert len(swims) == len(expected_rows('anna', 'Swimming'))
+        assert all(info == SWM for info in swims), (
+            'Из хранилища читаются те же результаты, что были записаны')
+        rows = results.rows('anna', 'Swimming')
+        assert results.timestamps(rows[:1])[0] == (
+            1_600_000_000 + rows[0] // 2 * DAY)
+        results.append(RUN, 'carol', 1_600_000_000 + 60 * DAY)
+        assert len(results.rows('carol')) == 0, (
+            'Строки видны запросам только после flush')
+    with store.ResultStore(str(tmp_path)) as results:
+        assert list(results.rows('carol')) == [120]
+        with pytest.raises(ValueError):
+            results.append(RUN, 'carol', 1_600_000_000)
+
+
+def test_recover_after_partial_write(tmp_path):
+    fill(tmp_path).close()
+    with open(os.path.join(str(tmp_path), 'speed.f64'), 'ab') as file:
+        file.write(b'\0' * 12)
+    with open(os.path.join(str(tmp_path), 'user.u32'), 'r+b') as file:
+        file.truncate(119 * 4)
+    with store.ResultStore(str(tmp_path)) as results:
+        assert len(results) == 119, 'Недописанная строка не видна'
+        assert list(results.rows('boris'))[-1] == 117
+        assert os.path.getsize(os.path.join(str(tmp_path), 'speed.f64')) \
+            == 119 * 8
+        results.append(RUN, 'boris', 1_700_000_000)
+    with store.ResultStore(str(tmp_path)) as results:
+        assert list(results.rows('boris'))[-2:] == [117, 119]
+
+
+def test_empty_store(tmp_path):
+    with store.ResultStore(str(tmp_path)) as results:
+        assert len(results) == 0
+        assert list(results.rows()) == []
+        assert len(results.select('anna')) == 0
+
+
+def test_recover_lost_index(tmp_path, monkeypatch):
+    results = store.ResultStore(str(tmp_path))
+    results.append(RUN, 'anna', 1)
+    results.append(SWM, 'boris', 2)
+    results.flush()
+    results.append(WLK, 'anna', 3)
+    append = store._append
+
+    def crash_on_index(path, values):
+        if os.sep + store.INDEX + os.sep in path:
+            raise OSError('crash')
+        append(path, values)
+
+    monkeypatch.setattr(store, '_append', crash_on_index)
+    with pytest.raises(OSError):
+        results.flush()
+    monkeypatch.setattr(store, '_append', append)
+    with store.ResultStore(str(tmp_path)) as results:
+        assert len(results) == 3
+        assert list(results.rows('anna')) == [0, 2], (
+            'Строки, не попавшие в индекс при сбое, восстанавливаются'
+        )
+        assert list(results.rows(training_type='SportsWalking')) == [2]
+        results.append(RUN, 'anna', 4)
+    with store.ResultStore(str(tmp_path)) as results:
+        assert list(results.rows('anna')) == [0, 2, 3]
+        assert list(results.rows(training_type='Running')) == [0, 3]
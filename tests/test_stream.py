@@ -0,0 +1,75 @@
+import io
+import pytest
+
+import stream
+
+
+EXPECTED = [
+    'Тип тренировки: Swimming; '
+    'Длительность: 1.000 ч.; '
+    'Дистанция: 0.994 км; '
+    'Ср. скорость: 1.000 км/ч; '
+    'Потрачено ккал: 336.000.',
+    'Тип тренировки: Running; '
+    'Длительность: 1.000 ч.; '
+    'Дистанция: 9.750 км; '
+    'Ср. скорость: 9.750 км/ч; '
+    'Потрачено ккал: 797.805.',
+    'Тип тренировки: SportsWalking; '
+    'Длительность: 1.000 ч.; '
+    'Дистанция: 5.850 км; '
+    'Ср. скорость: 5.850 км/ч; '
+    'Потрачено ккал: 349.252.',
+]
+
+
+@pytest.mark.parametrize('name, content', [
+    ('packages.jsonl',
+     '["SWM", [720, 1, 80, 25, 40]]\n'
+     '{"workout_type": "RUN", "data": [15000, 1, 75]}\n'
+     '\n'
+     '["WLK", [9000, 1, 75, 180]]\n'),
+    ('packages.csv',
+     'SWM,720,1,80,25,40\nRUN,15000,1,75\nWLK,9000,1,75,180\n'),
+    ('packages.txt',
+     '# комментарий\nSWM 720 1 80 25 40\nRUN 15000 1 75\n'
+     'WLK 9000 1 75 180\n'),
+])
+def test_run_formats(tmp_path, name, content):
+    source = tmp_path / name
+    source.write_text(content, encoding='utf-8')
+    out = io.StringIO()
+    assert stream.run([str(source)], out) == 3
+    assert out.getvalue().splitlines() == EXPECTED
+
+
+def test_iter_packages_is_lazy(tmp_path):
+    source = tmp_path / 'packages.txt'
+    source.write_text('RUN 15000 1 75\nBROKEN LINE\n', encoding='utf-8')
+    packages = stream.iter_packages([str(source)])
+    assert next(packages) == ('RUN', [15000.0, 1.0, 75.0])
+    with pytest.raises(ValueError, match=':2:'):
+        next(packages)
+
+
+def test_main_stdin(monkeypatch, capsys):
+    monkeypatch.setattr('sys.stdin', io.StringIO('RUN,15000,1,75\n'))
+    assert stream.main([]) == 0
+    assert capsys.readouterr().out.splitlines() == EXPECTED[1:2]
+
+
+@pytest.mark.parametrize('bad_line, error', [
+    ('RUN,15000,0,75', '-:3: bad package: float division by zero'),
+    ('WLK,9000,1,75,0', '-:3: bad package: float division by zero'),
+    ('RUN,x,1,75', "-:3: bad package: could not convert string to float"),
+])
+def test_main_bad_package_keeps_results(monkeypatch, capsys, bad_line,
+                                        error):
+    monkeypatch.setattr('sys.stdin', io.StringIO(
+        'RUN,15000,1,75\n\n{}\nSWM,720,1,80,25,40\n'.format(bad_line)))
+    assert stream.main([]) == 1
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == EXPECTED[1:2], (
+        'Результаты до плохого пакета должны быть выведены.'
+    )
+    assert captured.err.startswith(error)
@@ -0,0 +1,97 @@
+import io
+import pytest
+
+import homework
+import stream
+import threaded
+
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+    ('RUN', [1206, 12, 6]),
+    ('WLK', [3000.33, 2.512, 75.8, 180.1]),
+] * 7
+
+
+def expected_lines():
+    return [homework.read_package(*package).show_training_info()
+            .get_message() for package in PACKAGES]
+
+
+@pytest.mark.parametrize('queue_depth, chunk_size', [
+    (1, 1), (2, 3), (4, 1024),
+])
+def test_pipeline_output(queue_depth, chunk_size):
+    out = io.StringIO()
+    pipeline = threaded.Pipeline('ru', queue_depth, chunk_size)
+    assert pipeline.run(PACKAGES, out) == len(PACKAGES)
+    assert out.getvalue().splitlines() == expected_lines(), (
+        'Конвейер должен выводить то же, что и последовательный расчёт.'
+    )
+    for name in threaded.STAGES:
+        assert pipeline.stats[name].items == len(PACKAGES)
+        assert pipeline.stats[name].total >= pipeline.stats[name].waiting
+    assert pipeline.bottleneck() in threaded.STAGES
+    assert set(pipeline.snapshot()) == set(threaded.STAGES)
+    assert pipeline.format_text().splitlines()[0].startswith('stage')
+
+
+def test_empty_input():
+    out = io.StringIO()
+    assert threaded.run_pipeline([], out) == 0
+    assert out.getvalue() == ''
+
+
+def test_bad_arguments():
+    with pytest.raises(ValueError):
+        threaded.Pipeline(queue_depth=0)
+    with pytest.raises(ValueError):
+        threaded.Pipeline(template='unknown')
+
+
+def failing_packages():
+    yield from PACKAGES
+    raise OSError('read failed')
+
+
+class FailingOutput:
+    def __init__(self):
+        self.calls = 0
+
+    def write(self, text):
+        self.calls += 1
+        raise OSError('disk full')
+
+
+@pytest.mark.parametrize('packages', [
+    failing_packages(),
+    PACKAGES[:2] + [('XXX', [1, 2])] + PACKAGES,
+], ids=['read', 'compute'])
+def test_input_errors_propagate(packages):
+    with pytest.raises((OSError, ValueError)):
+        threaded.run_pipeline(packages, io.StringIO(), chunk_size=2)
+
+
+def test_write_error_stops_pipeline():
+    out = FailingOutput()
+    endless = iter(lambda: PACKAGES[0], None)
+    with pytest.raises(OSError, match='disk full'):
+        threaded.run_pipeline(endless, out, queue_depth=1, chunk_size=4)
+    assert out.calls == 1, 'После ошибки записи конвейер должен остановиться.'
+
+
+def test_stream_queue_depth(tmp_path):
+    source = tmp_path / 'packages.csv'
+    source.write_text(''.join(
+        '{},{}\n'.format(code, ','.join(map(str, data)))
+        for code, data in PACKAGES), encoding='utf-8')
+    out = io.StringIO()
+    stages = {}
+    assert stream.run([str(source)], out, queue_depth=2, chunk_size=5,
+                      stages=stages) == len(PACKAGES)
+    assert out.getvalue().splitlines() == expected_lines()
+    assert stages['read'].items == len(PACKAGES)
+    with pytest.raises(ValueError):
+        stream.run([str(source)], io.StringIO(), workers=2, queue_depth=2)
@@ -0,0 +1,74 @@
+import random
+import pytest
+
+import homework
+import timeseries
+
+RNG = random.Random(17)
+TIMESTAMPS = [index * 2.0 + RNG.random() for index in range(1, 2001)]
+COUNTS = [RNG.randint(0, 8) for _ in TIMESTAMPS]
+POOLS = [1 if index % 25 == 0 else 0 for index in range(len(TIMESTAMPS))]
+
+
+@pytest.mark.parametrize('workout_type, params', [
+    ('RUN', {'weight': 75}),
+    ('WLK', {'weight': 75, 'height': 180}),
+    ('SWM', {'weight': 80, 'length_pool': 25, 'pools': POOLS}),
+])
+def test_cumulative_matches_training(workout_type, params):
+    series = timeseries.analyze(workout_type, TIMESTAMPS, COUNTS, **params)
+    assert len(series) == len(TIMESTAMPS)
+    for index in (0, 10, 999, len(TIMESTAMPS) - 1):
+        values = {
+            'action': sum(COUNTS[:index + 1]),
+            'duration': TIMESTAMPS[index] / 3600,
+            'count_pool': sum(POOLS[:index + 1]),
+            **params,
+        }
+        expected = homework.read_package(workout_type, [
+            values[name]
+            for name in homework.WORKOUT_TYPES[workout_type].fields
+        ]).show_training_info()
+        assert series.training_type == expected.training_type
+        assert series.distance[index] == pytest.approx(expected.distance)
+        assert series.speed[index] == pytest.approx(expected.speed)
+        assert series.calories[index] == pytest.approx(expected.calories), (
+            'Накопленные калории должны совпадать с расчётом тренировки')
+
+
+def test_rolling_speed():
+    window = 30.0
+    series = timeseries.analyze('RUN', TIMESTAMPS, COUNTS, window=window,
+                                weight=75)
+    for index, seconds in enumerate(TIMESTAMPS):
+        start = max((number for number, moment in enumerate(TIMESTAMPS)
+                     if moment <= seconds - window), default=-1)
+        steps = sum(COUNTS[start + 1:index + 1])
+        elapsed = seconds - (TIMESTAMPS[start] if start >= 0 else 0.0)
+        expected = steps * homework.Running.LEN_STEP / 1000 / (
+            elapsed / 3600)
+        assert series.rolling_speed[index] == pytest.approx(expected)
+
+
+def test_splits_constant_pace():
+    # 2 шага в секунду по 0.65 м - 1.3 м/с, километр за 769.23 с.
+    timestamps = [float(second) for second in range(1, 3601)]
+    series = timeseries.analyze('RUN', timestamps, [2] * 3600, weight=75)
+    assert len(series.splits) == 4
+    assert series.splits == pytest.approx([1000 / 1.3] * 4)
+
+
+@pytest.mark.parametrize('timestamps, counts', [
+    ([1.0, 2.0], [1]),
+    ([0.0, 1.0], [1, 1]),
+    ([2.0, 1.0], [1, 1]),
+    ([1.0, 2.0], [1, -1]),
+])
+def test_bad_samples(timestamps, counts):
+    with pytest.raises(ValueError):
+        timeseries.analyze('RUN', timestamps, counts, weight=75)
+
+
+def test_bad_window():
+    with pytest.raises(ValueError):
+        timeseries.analyze('RUN', [1.0], [1], window=0, weight=75)
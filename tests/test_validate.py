@@ -0,0 +1,140 @@
+import io
+import json
+from array import array
+
+import pytest
+
+import homework
+import stream
+import validate
+
+RUN = ('RUN', [15000, 1, 75])
+SWM = ('SWM', [720, 1, 80, 25, 40])
+
+
+@pytest.mark.parametrize('package, expected', [
+    (RUN, None),
+    (SWM, None),
+    (('RUN', [0, 1, 75]), None),
+    (('XXX', [1, 2]), (validate.UNKNOWN_TYPE, None)),
+    ((None, [1, 2]), (validate.UNKNOWN_TYPE, None)),
+    (('RUN', [1, 2]), (validate.BAD_ARITY, None)),
+    (('RUN', 5), (validate.BAD_ARITY, None)),
+    (('RUN', ['15000', 1, 75]), (validate.NOT_NUMBER, 'action')),
+    (('RUN', [float('nan'), 1, 75]), (validate.NOT_FINITE, 'action')),
+    (('RUN', [1, float('-inf'), 75]), (validate.NOT_FINITE, 'duration')),
+    (('RUN', [15000, 1, -75]), (validate.NEGATIVE, 'weight')),
+    (('RUN', [15000, 0, 75]), (validate.ZERO_DIVISOR, 'duration')),
+    (('WLK', [9000, 1, 75, 0]), (validate.ZERO_DIVISOR, 'height')),
+    (('WLK', [1e200, 1e-100, 75, 180]), (validate.OUT_OF_RANGE, 'action')),
+    (('WLK', [9000, 1e-100, 75, 180]),
+     (validate.OUT_OF_RANGE, 'duration')),
+    ((None, 'RUN,,'), (validate.BAD_FORMAT, None)),
+])
+def test_check(package, expected):
+    assert validate.check(*package) == expected
+
+
+@pytest.mark.parametrize('package', [
+    ('WLK', [validate.MAX_VALUE, validate.MIN_DIVISOR, validate.MAX_VALUE,
+             validate.MIN_DIVISOR]),
+    ('RUN', [validate.MAX_VALUE, validate.MIN_DIVISOR, validate.MAX_VALUE]),
+    ('SWM', [validate.MAX_VALUE, validate.MIN_DIVISOR, validate.MAX_VALUE,
+             validate.MAX_VALUE, validate.MAX_VALUE]),
+])
+def test_range_limits_compute_without_errors(package):
+    assert validate.check(*package) is None
+    homework.read_package(*package).show_training_info().get_message()
+
+
+def test_validate_valid_rows_compute_without_errors():
+    packages = [RUN, ('RUN', [15000, 0, 75]), SWM, ('XXX', [1])]
+    valid, rejects = validate.validate(packages)
+    assert valid == [RUN, SWM]
+    assert rejects == [
+        validate.Reject(1, 'RUN', validate.ZERO_DIVISOR, 'duration'),
+        validate.Reject(3, 'XXX', validate.UNKNOWN_TYPE),
+    ]
+    assert validate.summary(rejects) == {
+        validate.ZERO_DIVISOR: 1, validate.UNKNOWN_TYPE: 1}
+    for package in valid:
+        homework.read_package(*package).show_training_info()
+
+
+def code(reason):
+    return validate.REASONS.index(reason) + 1
+
+
+@pytest.mark.parametrize('make_column', [list, lambda values: array(
+    'd', values)])
+def test_validate_columns(make_column):
+    columns = {
+        'action': make_column([9000, float('nan'), 9000, 9000]),
+        'duration': make_column([1, 1, 1, -1]),
+        'weight': make_column([75, 75, 75, 75]),
+        'height': make_column([180, 180, 0, 180]),
+    }
+    mask = validate.validate_columns('WLK', columns)
+    assert list(mask) == [0, code(validate.NOT_FINITE),
+                          code(validate.ZERO_DIVISOR),
+                          code(validate.NEGATIVE)]
+    valid = validate.compress_columns(columns, mask)
+    assert valid['height'] == array('d', [180])
+
+
+@pytest.mark.parametrize('workout_type, columns, reason', [
+    ('XXX', {'action': [1, 2]}, validate.UNKNOWN_TYPE),
+    ('RUN', {'action': [1, 2], 'duration': [1, 2]}, validate.BAD_ARITY),
+])
+def test_validate_columns_whole_batch(workout_type, columns, reason):
+    assert list(validate.validate_columns(workout_type, columns)) == [
+        code(reason)] * 2
+
+
+def test_stream_rejects(tmp_path, capsys):
+    source = tmp_path / 'packages.jsonl'
+    source.write_text('["RUN", [15000, 1, 75]]\n["RUN", [15000, 0, 75]]\n'
+                      '["XXX", [1]]\n', encoding='utf-8')
+    report = tmp_path / 'rejects.jsonl'
+    assert stream.main([str(source), '--rejects', str(report)]) == 0
+    assert len(capsys.readouterr().out.splitlines()) == 1
+    rows = [json.loads(line) for line in report.read_text().splitlines()]
+    assert [row['reason'] for row in rows] == [
+        validate.ZERO_DIVISOR, validate.UNKNOWN_TYPE]
+    rejects = []
+    assert stream.run([str(source)], io.StringIO(), rejects=rejects) == 1
+    assert len(rejects) == 2
+
+
+def test_stream_rejects_unparsed_lines(tmp_path, capsys):
+    source = tmp_path / 'packages.csv'
+    source.write_text('RUN,15000,1,75\nRUN,15000,1,n/a\n'
+                      'WLK,1e200,1e-100,75,180\n', encoding='utf-8')
+    report = tmp_path / 'rejects.jsonl'
+    assert stream.main([str(source), '--rejects', str(report)]) == 0
+    assert len(capsys.readouterr().out.splitlines()) == 1
+    rows = [json.loads(line) for line in report.read_text().splitlines()]
+    assert [(row['index'], row['reason'], row['field']) for row in rows] == [
+        (1, validate.NOT_NUMBER, 'weight'),
+        (2, validate.OUT_OF_RANGE, 'action'),
+    ]
+    assert stream.main([str(source)]) == 1, (
+        'Без --rejects ошибка разбора прерывает обработку.'
+    )
+    source = tmp_path / 'packages.jsonl'
+    source.write_text('{bad\n["RUN", [15000, 1, 75]]\n', encoding='utf-8')
+    rejects = []
+    assert stream.run([str(source)], io.StringIO(), rejects=rejects) == 1
+    assert rejects == [validate.Reject(0, None, validate.BAD_FORMAT)]
+
+
+def test_reject_report_is_written_immediately():
+    file = io.StringIO()
+    report = validate.RejectReport(file)
+    packages = iter([RUN, ('XXX', [1]), SWM])
+    valid = validate.iter_valid(packages, report)
+    assert next(valid) == RUN
+    assert next(valid) == SWM
+    assert json.loads(file.getvalue())['reason'] == validate.UNKNOWN_TYPE
+    assert len(report) == 1
+    assert report.counts == {validate.UNKNOWN_TYPE: 1}
@@ -0,0 +1,109 @@
+import io
+import pytest
+
+import generate
+import homework
+import stream
+import wire
+
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('RUN', [1206, 12, 6]),
+    ('WLK', [9000, 1, 75, 180]),
+    ('WLK', [3000.33, 2.512, 75.8, 180.1]),
+    ('RUN', [420, 4, 20]),
+]
+
+
+def encoded(block_size=wire.BLOCK_SIZE):
+    return b''.join(wire.encode(PACKAGES, block_size))
+
+
+@pytest.mark.parametrize('block_size', [1, 2, wire.BLOCK_SIZE])
+def test_round_trip(block_size):
+    decoded = list(wire.iter_packages(encoded(block_size)))
+    assert decoded == [(code, [float(value) for value in data])
+                       for code, data in PACKAGES]
+
+
+def test_size():
+    # 8 байт заголовка файла, 4 блока по 8 байт, 8 байт на дробное
+    # значение и 4 байта на целое с выравниванием столбца до 8 байт.
+    # У WLK дробное число шагов, поэтому все его столбцы - float64.
+    swm = 8 + 8 + 8 + 8 + 8
+    run = 8 + 16 + 16 + 8 + 8 + 8
+    wlk = 4 * 16
+    assert len(encoded()) == 8 + 4 * 8 + swm + run + wlk
+
+
+def test_column_types():
+    types = [(code, {name: column.format for name, column in columns.items()})
+             for code, columns in wire.iter_columns(encoded())]
+    assert types[0] == ('SWM', {'action': 'I', 'duration': 'd',
+                                'weight': 'd', 'length_pool': 'I',
+                                'count_pool': 'I'})
+    assert types[2] == ('WLK', dict.fromkeys(
+        homework.WORKOUT_TYPES['WLK'].fields, 'd'))
+
+
+def test_generated_packages_match_text(tmp_path):
+    packages = list(generate.generate(20000, seed=3))
+    binary = tmp_path / 'packages.hwpk'
+    text = tmp_path / 'packages.csv'
+    with open(binary, 'wb') as file:
+        wire.write_packages(file, packages)
+    text.write_text(''.join(generate.format_line(package, 'csv') + '\n'
+                            for package in packages), encoding='utf-8')
+    binary_out = io.StringIO()
+    text_out = io.StringIO()
+    assert stream.run([str(binary)], binary_out) == len(packages)
+    assert stream.run([str(text)], text_out) == len(packages)
+    assert binary_out.getvalue() == text_out.getvalue(), (
+        'Двоичный формат должен давать те же сообщения, что и текст.'
+    )
+
+
+def test_process_buffer_matches_objects():
+    result = [info for infos in wire.process_buffer(encoded())
+              for info in infos]
+    assert result == [homework.read_package(*package).show_training_info()
+                      for package in PACKAGES]
+
+
+def test_iter_columns_without_copy():
+    buffer = bytearray(encoded())
+    workout_type, columns = next(wire.iter_columns(buffer))
+    assert workout_type == 'SWM'
+    assert isinstance(columns['count_pool'], memoryview)
+    assert columns['count_pool'].obj is not None
+    buffer[-8:] = b'\0' * 8
+    *_, (last_type, last_columns) = wire.iter_columns(buffer)
+    assert last_type == 'RUN' and last_columns['weight'].tolist() == [0.0]
+
+
+def test_mmap_file(tmp_path):
+    path = tmp_path / 'packages.hwpk'
+    with open(path, 'wb') as file:
+        wire.write_packages(file, PACKAGES)
+    with wire.open_packages(str(path)) as buffer:
+        assert len(list(wire.iter_packages(buffer))) == len(PACKAGES)
+    out = io.StringIO()
+    assert stream.run([str(path)], out) == len(PACKAGES)
+
+
+@pytest.mark.parametrize('buffer', [
+    b'',
+    b'XXXX\x01\x00\x00\x00',
+    encoded()[:-1],
+    encoded()[:8] + b'BIK\x00\x01\x00\x00\x00' + b'\0' * 24,
+])
+def test_invalid_buffer(buffer):
+    with pytest.raises(ValueError):
+        list(wire.iter_packages(buffer))
+
+
+def test_encode_wrong_arity():
+    with pytest.raises(ValueError):
+        b''.join(wire.encode([('RUN', [1, 2])]))
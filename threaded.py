@@ -0,0 +1,227 @@
+"""Конвейер из потоков: чтение, расчёт и запись одновременно.
+
+Каждый этап работает в своём потоке и передаёт блоки пакетов
+следующему через очередь ограниченной длины:
+
+    read  -> [очередь parsed]   -> compute -> [очередь rendered] -> write
+
+Пока этап записи ждёт диск или канал, а этап чтения - входной файл,
+расчёт следующего блока продолжается. Расчёт занимает GIL, поэтому
+выигрыш есть, когда заметную долю времени занимает ввод-вывод; для
+загрузки нескольких ядер есть модуль `parallel`.
+
+Ошибка на любом этапе останавливает остальные этапы, а `run`
+выбрасывает исходное исключение. Статистика занятости этапов
+показывает, какой из них ограничивает скорость конвейера.
+"""
+import queue
+import threading
+import time
+from typing import IO, Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from parallel import chunked, render_chunk
+from render import get_renderer
+
+Package = Tuple[str, List[float]]
+
+QUEUE_DEPTH = 4
+CHUNK_SIZE = 1024
+# Как часто ожидающий этап проверяет, не остановлен ли конвейер, с.
+POLL = 0.05
+STAGES = ('read', 'compute', 'write')
+
+_DONE = object()
+
+
+class _Stopped(Exception):
+    """Конвейер остановлен из-за ошибки на другом этапе."""
+
+
+class StageLoad:
+    """Занятость одного этапа конвейера."""
+
+    __slots__ = ('name', 'items', 'total', 'waiting', 'depth_sum',
+                 'depth_samples')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.items = 0
+        self.total = 0.0
+        self.waiting = 0.0
+        self.depth_sum = 0
+        self.depth_samples = 0
+
+    @property
+    def busy(self) -> float:
+        """Время работы без ожидания очередей, с."""
+        return self.total - self.waiting
+
+    @property
+    def utilization(self) -> float:
+        """Доля времени, когда этап был занят работой."""
+        return self.busy / self.total if self.total else 0.0
+
+    @property
+    def mean_depth(self) -> float:
+        """Средняя длина входной очереди этапа."""
+        if not self.depth_samples:
+            return 0.0
+        return self.depth_sum / self.depth_samples
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'items': self.items,
+            'busy_s': self.busy,
+            'waiting_s': self.waiting,
+            'utilization': self.utilization,
+            'mean_queue_depth': self.mean_depth,
+        }
+
+
+class Pipeline:
+    """Трёхэтапный конвейер обработки пакетов в потоках."""
+
+    def __init__(self, template: str = 'ru',
+                 queue_depth: int = QUEUE_DEPTH,
+                 chunk_size: int = CHUNK_SIZE) -> None:
+        if queue_depth < 1:
+            raise ValueError("queue_depth must be positive")
+        get_renderer(template)
+        self.template = template
+        self.queue_depth = queue_depth
+        self.chunk_size = chunk_size
+        self.stats = {name: StageLoad(name) for name in STAGES}
+        self.count = 0
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+
+    def _put(self, target: 'queue.Queue[Any]', item: Any,
+             stats: StageLoad) -> None:
+        started = time.perf_counter()
+        try:
+            while True:
+                if self._stop.is_set():
+                    raise _Stopped()
+                try:
+                    target.put(item, timeout=POLL)
+                    return
+                except queue.Full:
+                    pass
+        finally:
+            stats.waiting += time.perf_counter() - started
+
+    def _get(self, source: 'queue.Queue[Any]', stats: StageLoad) -> Any:
+        stats.depth_sum += source.qsize()
+        stats.depth_samples += 1
+        started = time.perf_counter()
+        try:
+            while True:
+                if self._stop.is_set():
+                    raise _Stopped()
+                try:
+                    return source.get(timeout=POLL)
+                except queue.Empty:
+                    pass
+        finally:
+            stats.waiting += time.perf_counter() - started
+
+    def _read(self, packages: Iterable[Package],
+              parsed: 'queue.Queue[Any]') -> None:
+        stats = self.stats['read']
+        for chunk in chunked(packages, self.chunk_size):
+            stats.items += len(chunk)
+            self._put(parsed, chunk, stats)
+        self._put(parsed, _DONE, stats)
+
+    def _compute(self, parsed: 'queue.Queue[Any]',
+                 rendered: 'queue.Queue[Any]') -> None:
+        stats = self.stats['compute']
+        while True:
+            chunk = self._get(parsed, stats)
+            if chunk is _DONE:
+                break
+            result = render_chunk(self.template, chunk)
+            stats.items += result[0]
+            self._put(rendered, result, stats)
+        self._put(rendered, _DONE, stats)
+
+    def _write(self, rendered: 'queue.Queue[Any]', out: IO[str]) -> None:
+        stats = self.stats['write']
+        while True:
+            result = self._get(rendered, stats)
+            if result is _DONE:
+                break
+            count, text = result
+            out.write(text)
+            stats.items += count
+            self.count += count
+
+    def _stage(self, name: str, target: Callable[..., None],
+               *args: Any) -> None:
+        started = time.perf_counter()
+        try:
+            target(*args)
+        except _Stopped:
+            pass
+        except BaseException as error:
+            self._errors.append(error)
+            self._stop.set()
+        finally:
+            self.stats[name].total = time.perf_counter() - started
+
+    def run(self, packages: Iterable[Package], out: IO[str]) -> int:
+        """Обработать пакеты и записать сообщения в `out`.
+
+        Возвращает количество записанных сообщений. Ошибка любого
+        этапа выбрасывается после остановки всех потоков.
+        """
+        parsed: 'queue.Queue[Any]' = queue.Queue(self.queue_depth)
+        rendered: 'queue.Queue[Any]' = queue.Queue(self.queue_depth)
+        threads = [
+            threading.Thread(target=self._stage, name='pipeline-' + name,
+                             args=(name, target, *args), daemon=True)
+            for name, target, args in (
+                ('read', self._read, (packages, parsed)),
+                ('compute', self._compute, (parsed, rendered)),
+                ('write', self._write, (rendered, out)),
+            )
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if self._errors:
+            raise self._errors[0]
+        return self.count
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Статистика этапов в виде словаря."""
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
+
+    def bottleneck(self) -> Optional[str]:
+        """Этап с наибольшим временем работы."""
+        if not any(stats.total for stats in self.stats.values()):
+            return None
+        return max(self.stats.values(), key=lambda stats: stats.busy).name
+
+    def format_text(self) -> str:
+        """Таблица занятости этапов для вывода в консоль."""
+        return format_stats(self.stats)
+
+
+def format_stats(stats: Dict[str, StageLoad]) -> str:
+    """Таблица занятости этапов: работа, ожидание и длина очереди."""
+    lines = ['{:<10}{:>10}{:>10}{:>10}{:>8}{:>8}'.format(
+        'stage', 'items', 'busy, s', 'wait, s', 'util', 'queue')]
+    for load in stats.values():
+        lines.append('{:<10}{:>10}{:>10.3f}{:>10.3f}{:>8.0%}{:>8.2f}'.format(
+            load.name, load.items, load.busy, load.waiting,
+            load.utilization, load.mean_depth))
+    return '\n'.join(lines)
+
+
+def run_pipeline(packages: Iterable[Package], out: IO[str],
+                 template: str = 'ru', queue_depth: int = QUEUE_DEPTH,
+                 chunk_size: int = CHUNK_SIZE) -> int:
+    """Обработать пакеты конвейером потоков; вернуть число сообщений."""
+    return Pipeline(template, queue_depth, chunk_size).run(packages, out)
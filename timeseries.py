@@ -0,0 +1,152 @@
+"""Показатели тренировки по отдельным замерам датчика.
+
+Вместо итоговых `action` и `duration` трекер может прислать ряд
+замеров: время от начала тренировки в секундах и число шагов или
+гребков с предыдущего замера (для плавания - ещё и число проплытых
+бассейнов). По ряду считаются:
+
+* накопленные дистанция, средняя скорость и калории на каждый замер;
+* скорость в скользящем окне;
+* время каждого полного километра (сплиты).
+
+Накопленные показатели - это результат тренировки, которая длилась
+до очередного замера. Они считаются пакетными формулами модуля
+`batch` над накопленными столбцами, поэтому используют константы
+классов тренировок и совпадают с `show_training_info`.
+"""
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from operator import mul, sub, truediv
+from typing import Dict, List, Optional, Sequence
+
+from batch import get_workout, process_batch
+
+SEC_IN_MIN = 60
+WINDOW = 60.0
+
+
+class Series:
+    """Показатели тренировки на каждый замер."""
+
+    __slots__ = ('training_type', 'elapsed', 'distance', 'speed',
+                 'calories', 'rolling_speed', 'splits')
+
+    def __init__(self, training_type: str, elapsed: 'array[float]',
+                 distance: 'array[float]', speed: 'array[float]',
+                 calories: 'array[float]', rolling_speed: 'array[float]',
+                 splits: List[float]) -> None:
+        self.training_type = training_type
+        self.elapsed = elapsed
+        self.distance = distance
+        self.speed = speed
+        self.calories = calories
+        self.rolling_speed = rolling_speed
+        self.splits = splits
+
+    def __len__(self) -> int:
+        return len(self.elapsed)
+
+
+def cumulative_columns(workout_type: str, timestamps: Sequence[float],
+                       counts: Sequence[float],
+                       pools: Optional[Sequence[float]] = None,
+                       **params: float) -> Dict[str, Sequence[float]]:
+    """Столбцы для `process_batch`: тренировка до каждого замера."""
+    size = len(timestamps)
+    if len(counts) != size or pools is not None and len(pools) != size:
+        raise ValueError("Sample arrays must have the same length")
+    if size and timestamps[0] <= 0 or any(
+            later <= earlier
+            for earlier, later in zip(timestamps, timestamps[1:])):
+        raise ValueError("Timestamps must be positive and increasing")
+    if any(count < 0 for count in counts):
+        raise ValueError("Sample counts must not be negative")
+    training_class = get_workout(workout_type).training_class
+    seconds_in_h = training_class.MIN_IN_H * SEC_IN_MIN
+    columns: Dict[str, Sequence[float]] = {
+        name: [value] * size for name, value in params.items()}
+    columns['action'] = list(accumulate(counts))
+    columns['duration'] = [seconds / seconds_in_h for seconds in timestamps]
+    if pools is not None:
+        columns['count_pool'] = list(accumulate(pools))
+    return columns
+
+
+def rolling_speed(elapsed: Sequence[float], speed: Sequence[float],
+                  duration: Sequence[float],
+                  window: float = WINDOW) -> 'array[float]':
+    """Средняя скорость за последние `window` секунд на каждый замер.
+
+    Пройденное расстояние восстанавливается как средняя скорость,
+    умноженная на длительность, поэтому для плавания используется
+    то же определение скорости, что и в `Swimming`.
+    """
+    if window <= 0:
+        raise ValueError("Window must be positive: {}".format(window))
+    # Нулевой элемент - начало тренировки. Замеры упорядочены
+    # по времени, поэтому начало окна только сдвигается вперёд.
+    times = [0.0, *elapsed]
+    hours = [0.0, *duration]
+    covered = [0.0, *map(mul, speed, duration)]
+    starts = []
+    start = 0
+    for seconds in elapsed:
+        bound = seconds - window
+        while times[start + 1] <= bound:
+            start += 1
+        starts.append(start)
+    return array('d', map(
+        truediv,
+        map(sub, covered[1:], map(covered.__getitem__, starts)),
+        map(sub, hours[1:], map(hours.__getitem__, starts))))
+
+
+def splits(elapsed: Sequence[float], distance: Sequence[float],
+           step: float = 1.0) -> List[float]:
+    """Время в секундах на каждый полный отрезок `step` км.
+
+    Момент прохождения отметки находится линейной интерполяцией
+    между соседними замерами.
+    """
+    times = [0.0, *elapsed]
+    distances = [0.0, *distance]
+    result = []
+    previous = 0.0
+    number = 1
+    mark = step
+    while distances[-1] >= mark:
+        index = bisect_left(distances, mark)
+        before = index - 1
+        passed = times[before] + (
+            (mark - distances[before])
+            / (distances[index] - distances[before])
+            * (times[index] - times[before]))
+        result.append(passed - previous)
+        previous = passed
+        number += 1
+        mark = number * step
+    return result
+
+
+def analyze(workout_type: str, timestamps: Sequence[float],
+            counts: Sequence[float], pools: Optional[Sequence[float]] = None,
+            window: float = WINDOW, **params: float) -> Series:
+    """Рассчитать показатели по ряду замеров.
+
+    `params` - постоянные параметры тренировки: `weight`, `height`,
+    `length_pool`. Для плавания нужен ряд `pools`.
+    """
+    columns = cumulative_columns(workout_type, timestamps, counts, pools,
+                                 **params)
+    infos = process_batch(workout_type, columns)
+    training_type = get_workout(workout_type).training_class.__name__
+    return Series(
+        training_type,
+        array('d', timestamps),
+        infos.distance,
+        infos.speed,
+        infos.calories,
+        rolling_speed(timestamps, infos.speed, infos.duration, window),
+        splits(timestamps, infos.distance),
+    )
@@ -0,0 +1,231 @@
+"""Проверка пакетов до расчёта без исключений на каждую запись.
+
+`read_package` и формулы тренировок сообщают о плохих данных
+исключениями: ValueError для неизвестного кода, TypeError для неверного
+числа параметров, ZeroDivisionError для нулевых `duration` и `height`.
+Если заметная часть потока - мусор, выброс и перехват исключения на
+каждую запись обходится дорого. Здесь все проверки выполняются за
+один проход простыми сравнениями, а отклонённые записи попадают
+в отчёт с кодом причины.
+
+Значения ограничены диапазоном, в котором формулы не переполняются:
+не больше `MAX_VALUE`, а делители - не меньше `MIN_DIVISOR`. Поэтому
+пакет, прошедший проверку, рассчитывается без исключений.
+
+`Reject.index` - номер пакета во входном потоке с 0: пустые строки
+и комментарии пакетами не считаются. Отчёт `checkpoint.py --rejects`
+вместо него указывает поле `line` - номер строки входного файла.
+"""
+import json
+from array import array
+from collections import Counter
+from itertools import compress
+from math import inf
+from typing import (IO, Any, Dict, Iterable, Iterator, List, Mapping,
+                    Optional, Sequence, Tuple, Union)
+
+from homework import WORKOUT_TYPES, WorkoutType
+
+Package = Tuple[str, Sequence[float]]
+
+UNKNOWN_TYPE = 'UNKNOWN_TYPE'
+BAD_ARITY = 'BAD_ARITY'
+NOT_NUMBER = 'NOT_NUMBER'
+NOT_FINITE = 'NOT_FINITE'
+NEGATIVE = 'NEGATIVE'
+ZERO_DIVISOR = 'ZERO_DIVISOR'
+OUT_OF_RANGE = 'OUT_OF_RANGE'
+BAD_FORMAT = 'BAD_FORMAT'
+# Новые причины добавляются в конец: номер причины хранится в масках.
+REASONS = (UNKNOWN_TYPE, BAD_ARITY, NOT_NUMBER, NOT_FINITE, NEGATIVE,
+           ZERO_DIVISOR, OUT_OF_RANGE, BAD_FORMAT)
+
+# Параметры, на которые делят формулы тренировок.
+DIVISORS = ('duration', 'height')
+NUMBER_TYPES = (int, float)
+# Границы значений, при которых квадрат скорости в формуле калорий
+# ходьбы и произведения в остальных формулах остаются конечными.
+MAX_VALUE = 1e9
+MIN_DIVISOR = 1e-9
+
+_lower_bounds: Dict[WorkoutType, Tuple[float, ...]] = {}
+
+
+class Reject:
+    """Отклонённый пакет и причина."""
+
+    __slots__ = ('index', 'workout_type', 'reason', 'field')
+
+    def __init__(self, index: int, workout_type: Any, reason: str,
+                 field: Optional[str] = None) -> None:
+        self.index = index
+        self.workout_type = workout_type
+        self.reason = reason
+        self.field = field
+
+    def __repr__(self) -> str:
+        return 'Reject({!r}, {!r}, {!r}, {!r})'.format(
+            self.index, self.workout_type, self.reason, self.field)
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return ((self.index, self.workout_type, self.reason, self.field)
+                == (other.index, other.workout_type, other.reason,
+                    other.field))
+
+    __hash__ = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'index': self.index, 'workout_type': self.workout_type,
+                'reason': self.reason, 'field': self.field}
+
+
+def check(workout_type: Any,
+          data: Sequence[Any]) -> Optional[Tuple[str, Optional[str]]]:
+    """Причина отклонения пакета и имя параметра или None."""
+    workout = None
+    if isinstance(workout_type, str):
+        workout = WORKOUT_TYPES.get(workout_type)
+    if workout is None:
+        # Строку, которую не удалось разобрать, `stream` передаёт как
+        # пакет без кода тренировки.
+        if workout_type is None and isinstance(data, str):
+            return BAD_FORMAT, None
+        return UNKNOWN_TYPE, None
+    if not hasattr(data, '__len__') or len(data) != workout.arity:
+        return BAD_ARITY, None
+    lows = _lower_bounds.get(workout)
+    if lows is None:
+        lows = _lower_bounds[workout] = tuple(
+            MIN_DIVISOR if name in DIVISORS else 0
+            for name in workout.fields)
+    for name, low, value in zip(workout.fields, lows, data):
+        # Быстрый путь для обычных чисел без вызова функции; NaN
+        # не проходит сравнения и проверяется подробно.
+        if value.__class__ in NUMBER_TYPES and low <= value <= MAX_VALUE:
+            continue
+        problem = _check_value(value, low > 0)
+        if problem is not None:
+            return problem, name
+    return None
+
+
+def _check_value(value: Any, divisor: bool) -> Optional[str]:
+    """Причина, по которой значение параметра не подходит, или None."""
+    if not isinstance(value, NUMBER_TYPES):
+        return NOT_NUMBER
+    # Одно двойное сравнение отсекает отрицательные, бесконечные
+    # значения и NaN; причина уточняется только для плохих записей.
+    if not 0 <= value < inf:
+        return NEGATIVE if -inf < value < 0 else NOT_FINITE
+    if divisor and value == 0:
+        return ZERO_DIVISOR
+    if value > MAX_VALUE or divisor and value < MIN_DIVISOR:
+        return OUT_OF_RANGE
+    return None
+
+
+class RejectReport:
+    """Отчёт об отклонённых пакетах в JSONL, записываемый сразу.
+
+    Заменяет список в `iter_valid`, когда отклонённых пакетов может
+    быть слишком много для памяти; хранит только счётчики причин.
+    """
+
+    def __init__(self, file: IO[str]) -> None:
+        self.file = file
+        self.counts: Counter = Counter()
+
+    def __len__(self) -> int:
+        return sum(self.counts.values())
+
+    def append(self, reject: Reject) -> None:
+        self.file.write(json.dumps(reject.as_dict()) + '\n')
+        self.counts[reject.reason] += 1
+
+
+def iter_valid(packages: Iterable[Package],
+               rejects: Union[List[Reject], RejectReport]
+               ) -> Iterator[Package]:
+    """Пропустить дальше правильные пакеты, остальные - в `rejects`.
+
+    Номер записи в отчёте - позиция пакета во входном потоке с 0.
+    """
+    for index, (workout_type, data) in enumerate(packages):
+        problem = check(workout_type, data)
+        if problem is None:
+            yield workout_type, data
+        else:
+            rejects.append(Reject(index, workout_type, *problem))
+
+
+def validate(packages: Iterable[Package]
+             ) -> Tuple[List[Package], List[Reject]]:
+    """Разделить пакеты на правильные и отклонённые."""
+    rejects: List[Reject] = []
+    valid = list(iter_valid(packages, rejects))
+    return valid, rejects
+
+
+def _column_is_valid(column: Sequence[Any], divisor: bool) -> bool:
+    """Быстрая проверка столбца чисел встроенными функциями.
+
+    Сумма конечна, только если в столбце нет NaN и бесконечностей;
+    минимум и максимум проверяют границы. Для столбцов с нечисловыми
+    значениями возвращает False, не выбрасывая исключений.
+    """
+    if not isinstance(column, array) and not all(
+            isinstance(value, NUMBER_TYPES) for value in column):
+        return False
+    if not column:
+        return True
+    total = sum(column)
+    if total != total or total in (inf, -inf):
+        return False
+    if max(column) > MAX_VALUE:
+        return False
+    return min(column) >= (MIN_DIVISOR if divisor else 0)
+
+
+def validate_columns(workout_type: str,
+                     columns: Mapping[str, Sequence[Any]]) -> bytearray:
+    """Маска причин для столбцов одного вида тренировки.
+
+    Элемент маски - 0 для правильной строки или номер причины
+    в `REASONS`, увеличенный на единицу. Столбцы без плохих значений
+    проверяются целиком встроенными функциями, поэлементно
+    разбираются только столбцы, где они есть.
+    """
+    size = len(next(iter(columns.values()), ()))
+    workout = WORKOUT_TYPES.get(workout_type)
+    if workout is None:
+        return bytearray([REASONS.index(UNKNOWN_TYPE) + 1]) * size
+    if any(len(columns.get(name, ())) != size for name in workout.fields):
+        return bytearray([REASONS.index(BAD_ARITY) + 1]) * size
+    mask = bytearray(size)
+    for name in workout.fields:
+        column = columns[name]
+        divisor = name in DIVISORS
+        if _column_is_valid(column, divisor):
+            continue
+        for index, value in enumerate(column):
+            if mask[index]:
+                continue
+            problem = _check_value(value, divisor)
+            if problem is not None:
+                mask[index] = REASONS.index(problem) + 1
+    return mask
+
+
+def compress_columns(columns: Mapping[str, Sequence[Any]],
+                     mask: bytearray) -> Dict[str, 'array[float]']:
+    """Оставить в столбцах только строки с нулём в маске."""
+    keep = [not code for code in mask]
+    return {name: array('d', compress(column, keep))
+            for name, column in columns.items()}
+
+
+def summary(rejects: Iterable[Reject]) -> Dict[str, int]:
+    """Число отклонённых пакетов по причинам."""
+    return dict(Counter(reject.reason for reject in rejects))
@@ -0,0 +1,195 @@
+"""Компактный двоичный формат пакетов данных от датчиков.
+
+Файл начинается с заголовка `HWPK` и номера версии, за которым идут
+блоки. Блок содержит пакеты одного вида тренировки, идущие подряд:
+
+    заголовок блока: код тренировки (3 байта ASCII), 1 байт - маска
+    целых столбцов, число пакетов (uint32 little-endian);
+    данные: столбцы параметров подряд, в каждом столбце - значения
+    одного параметра всех пакетов блока.
+
+Параметры пакета идут в порядке аргументов конструктора тренировки,
+то есть так же, как в списке `data` для `read_package`. Число шагов
+или гребков, длина бассейна и число бассейнов хранятся в uint32, если
+в блоке все их значения - целые от 0 до 2**32 - 1 (бит столбца
+в маске), иначе, как и остальные параметры, во float64. Значения
+восстанавливаются без потерь, поэтому результаты расчёта совпадают
+с текстовыми форматами. Столбцы выровнены по 8 байтам и при чтении
+из `mmap` - это `memoryview` поверх буфера без копирования.
+"""
+import mmap
+import struct
+import sys
+from array import array
+from contextlib import contextmanager
+from itertools import groupby
+from typing import (IO, Dict, Iterable, Iterator, List, Optional, Sequence,
+                    Tuple, Union)
+
+from batch import InfoBatch, get_workout, process_batch
+
+Package = Tuple[str, Sequence[float]]
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+MAGIC = b'HWPK'
+VERSION = 2
+HEADER = struct.Struct('<4sI')
+BLOCK = struct.Struct('<3sBI')
+BLOCK_SIZE = 4096
+INTEGER = 'I'
+DOUBLE = 'd'
+ALIGNMENT = 8
+# Параметры, которые датчики обычно передают целыми числами.
+INTEGER_FIELDS = frozenset(('action', 'length_pool', 'count_pool'))
+
+
+def _padding(size: int) -> int:
+    return -size % ALIGNMENT
+
+
+def _integers(column: List[float]) -> Optional[List[int]]:
+    """Значения столбца как целые uint32 или `None`, если не подходят."""
+    try:
+        integers = list(map(int, column))
+    except (OverflowError, TypeError, ValueError):
+        return None
+    if integers != column or not all(0 <= value < 1 << 32
+                                     for value in integers):
+        return None
+    return integers
+
+
+def encode_block(workout_type: str, packages: Sequence[Package]) -> bytes:
+    """Закодировать пакеты одного вида тренировки в блок."""
+    workout = get_workout(workout_type)
+    code = workout_type.encode('ascii')
+    if len(code) != 3:
+        raise ValueError("Workout type code must have 3 characters: "
+                         "{}".format(workout_type))
+    for _, data in packages:
+        if len(data) != workout.arity:
+            raise ValueError("{} expects {} values, got {}".format(
+                workout_type, workout.arity, len(data)))
+    mask = 0
+    chunks = []
+    for index, name in enumerate(workout.fields):
+        column = [data[index] for _, data in packages]
+        integers = _integers(column) if name in INTEGER_FIELDS else None
+        if integers is None:
+            values = array(DOUBLE, column)
+        else:
+            values = array(INTEGER, integers)
+            mask |= 1 << index
+        if sys.byteorder != 'little':
+            values.byteswap()
+        data = values.tobytes()
+        chunks.append(data + bytes(_padding(len(data))))
+    return BLOCK.pack(code, mask, len(packages)) + b''.join(chunks)
+
+
+def encode(packages: Iterable[Package],
+           block_size: int = BLOCK_SIZE) -> Iterator[bytes]:
+    """Закодировать поток пакетов, сохраняя их порядок.
+
+    Подряд идущие пакеты одного вида объединяются в блоки не длиннее
+    `block_size` пакетов.
+    """
+    yield HEADER.pack(MAGIC, VERSION)
+    for workout_type, run in groupby(packages, key=lambda item: item[0]):
+        block: List[Package] = []
+        for package in run:
+            block.append(package)
+            if len(block) == block_size:
+                yield encode_block(workout_type, block)
+                block = []
+        if block:
+            yield encode_block(workout_type, block)
+
+
+def write_packages(out: IO[bytes], packages: Iterable[Package],
+                   block_size: int = BLOCK_SIZE) -> int:
+    """Записать пакеты в двоичный поток; вернуть число байт."""
+    size = 0
+    for chunk in encode(packages, block_size):
+        size += out.write(chunk)
+    return size
+
+
+def _column(view: memoryview, typecode: str) -> Sequence[float]:
+    """Представить байты столбца как последовательность значений."""
+    if sys.byteorder == 'little':
+        return view.cast(typecode)
+    values = array(typecode)
+    values.frombytes(view)
+    values.byteswap()
+    return values
+
+
+def iter_blocks(buffer: Buffer
+                ) -> Iterator[Tuple[str, int, List[Sequence[float]]]]:
+    """Перебрать блоки: код тренировки, число пакетов и столбцы.
+
+    Столбцы - это `memoryview` поверх исходного буфера, без копирования.
+    """
+    view = memoryview(buffer)
+    if len(view) < HEADER.size:
+        raise ValueError("Not a package file: too short")
+    magic, version = HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a package file or unsupported version")
+    offset = HEADER.size
+    while offset < len(view):
+        if offset + BLOCK.size > len(view):
+            raise ValueError("Truncated block header at {}".format(offset))
+        code, mask, count = BLOCK.unpack_from(view, offset)
+        workout_type = code.decode('ascii')
+        arity = get_workout(workout_type).arity
+        if mask >> arity:
+            raise ValueError("Bad column mask at {}".format(offset))
+        offset += BLOCK.size
+        columns = []
+        for index in range(arity):
+            typecode = INTEGER if mask >> index & 1 else DOUBLE
+            size = count * struct.calcsize(typecode)
+            end = offset + size
+            if end > len(view):
+                raise ValueError("Truncated block at {}".format(offset))
+            columns.append(_column(view[offset:end], typecode))
+            offset = end + _padding(size)
+        yield workout_type, count, columns
+
+
+def iter_packages(buffer: Buffer) -> Iterator[Package]:
+    """Перебрать пакеты для `read_package` в исходном порядке."""
+    for workout_type, _, columns in iter_blocks(buffer):
+        for data in zip(*[column.tolist() for column in columns]):
+            yield workout_type, list(data)
+
+
+def iter_columns(buffer: Buffer
+                 ) -> Iterator[Tuple[str, Dict[str, Sequence[float]]]]:
+    """Перебрать блоки в виде столбцов для `batch.process_batch`.
+
+    Столбцы - `memoryview` поверх буфера, данные не копируются.
+    """
+    for workout_type, _, columns in iter_blocks(buffer):
+        yield workout_type, dict(zip(get_workout(workout_type).fields,
+                                     columns))
+
+
+def process_buffer(buffer: Buffer) -> Iterator[InfoBatch]:
+    """Рассчитать все блоки буфера пакетным путём."""
+    for workout_type, columns in iter_columns(buffer):
+        yield process_batch(workout_type, columns)
+
+
+@contextmanager
+def open_packages(path: str) -> Iterator[Buffer]:
+    """Отобразить файл пакетов в память только для чтения.
+
+    Срезы, полученные из буфера, нельзя использовать после выхода
+    из блока `with`.
+    """
+    with open(path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped